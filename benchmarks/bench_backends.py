@@ -0,0 +1,57 @@
+# pylint: disable=no-member
+"""
+Sondeo de backends de decodificación: apertura y FPS por códec y resolución
+
+Ejecuta el mismo sondeo que BackendSelector sobre videos sintéticos y
+muestra qué backend ganaría en cada combinación.
+
+Uso: python benchmarks/bench_backends.py [--sizes 1280x720,1920x1080]
+                                         [--codecs mp4v,MJPG] [--frames 60]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic import generate_video
+from wallpaperpuka.core.decode_backends import available_backends, pick_winner, probe
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de backends de decodificación")
+    parser.add_argument('--sizes', default='1280x720,1920x1080')
+    parser.add_argument('--codecs', default='mp4v,MJPG')
+    parser.add_argument('--frames', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Sondeos por video (se queda el mejor FPS de cada backend)")
+    args = parser.parse_args()
+
+    print("Backends disponibles: " + ", ".join(b.name for b in available_backends()))
+    for size in args.sizes.split(','):
+        width, height = (int(v) for v in size.lower().split('x'))
+        for codec in args.codecs.split(','):
+            video = generate_video(width, height, codec, args.frames)
+            if not video:
+                print(f"  {codec} {size}: no se pudo generar")
+                continue
+
+            best = {}
+            for _ in range(args.repeat):
+                for result in probe(video, args.frames):
+                    name = result['backend']
+                    if name not in best or result['fps'] > best[name]['fps']:
+                        best[name] = result
+            results = sorted(best.values(), key=lambda r: r['fps'], reverse=True)
+            winner = pick_winner(results)
+
+            print(f"{codec} {size}:")
+            for result in results:
+                mark = '*' if result is winner else ' '
+                print(f"  {mark} {result['backend']:<14} abrir {result['open_ms']:7.1f} ms  "
+                      f"{result['fps']:7.1f} FPS")
+
+
+if __name__ == "__main__":
+    main()
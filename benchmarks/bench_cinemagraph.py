@@ -0,0 +1,113 @@
+# pylint: disable=no-member,no-name-in-module
+"""
+Repintado por teselas en cinemagraphs: repintar todo frente a solo lo que cambia
+
+Reproduce con DesktopVideoPlayer (QT_QPA_PLATFORM=offscreen) un clip
+sintético con fondo fijo, una zona pequeña en movimiento y pausas con
+frames idénticos, y un clip con todo en movimiento para ver el coste del
+diff cuando no ahorra nada.
+
+Uso: python benchmarks/bench_cinemagraph.py [--size 1920x1080] [--frames 120]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cv2
+import numpy as np
+from PyQt5.QtCore import QRect, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from synthetic import generate_video, make_frame
+from wallpaperpuka.core.desktop_video_player import DesktopVideoPlayer
+from wallpaperpuka.core.frame_diff import TileDiff
+
+
+def cinemagraph_frame(index, width, height):
+    """Fondo fijo con textura, un remolino de 1/16 del área y pausas"""
+    frame = make_frame(0, width, height, moving=False)
+    # Cada 30 frames, 10 se quedan quietos (como la pausa de un GIF)
+    phase = index - (index // 30) * 10 if index % 30 < 20 else (index // 30) * 20 + 19
+    size = min(width, height) // 4
+    left, top = width // 2, height // 3
+    angle = phase * 12
+    center = (left + size // 2, top + size // 2)
+    cv2.rectangle(frame, (left, top), (left + size, top + size), (40, 40, 40), -1)
+    end = (
+        int(center[0] + np.cos(np.radians(angle)) * size * 0.45),
+        int(center[1] + np.sin(np.radians(angle)) * size * 0.45),
+    )
+    cv2.line(frame, center, end, (255, 255, 255), max(2, size // 20))
+    return frame
+
+
+def play(app, video, size, seconds, frame_diff):
+    player = DesktopVideoPlayer()
+    player.move_to(QRect(0, 0, *size))
+    player.frame_diff = frame_diff
+    player.policy = None
+    player.enable_stats(True)
+    player.load_video(video)
+    player.stats.reset()
+
+    cpu = time.process_time()
+    player.play()
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+    cpu = time.process_time() - cpu
+
+    snap = player.stats.snapshot()
+    paint = player.stats.stages.get('paint')
+    diff = player.stats.stages.get('diff')
+    player.stop()
+    player.close()
+    return {
+        'frames': snap['frames'],
+        'paint_ms': paint.total * 1000 if paint else 0.0,
+        'diff_ms': diff.total * 1000 if diff else 0.0,
+        'cpu_ms': cpu * 1000,
+        'counters': snap['counters'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de repintado por teselas")
+    parser.add_argument('--size', default='1920x1080')
+    parser.add_argument('--frames', type=int, default=120)
+    parser.add_argument('--fps', type=int, default=30)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.lower().split('x'))
+
+    app = QApplication(sys.argv)
+    clips = {
+        'cinemagraph': generate_video(
+            width, height, 'MJPG', args.frames, args.fps, cinemagraph_frame,
+            name=f"cinemagraph_{width}x{height}_{args.frames}"
+        ),
+        'todo en movimiento': generate_video(width, height, 'MJPG', args.frames, args.fps),
+    }
+    seconds = args.frames / args.fps
+
+    print(f"{width}x{height}, {args.frames} frames a {args.fps} FPS")
+    for clip, video in clips.items():
+        for name, frame_diff in (('repintar todo', None), ('por teselas', TileDiff())):
+            result = play(app, video, (width, height), seconds, frame_diff)
+            counters = result['counters']
+            print(
+                f"  {clip:<18} {name:<14} {result['frames']:4d} frames  "
+                f"paint {result['paint_ms']:8.1f} ms  diff {result['diff_ms']:6.1f} ms  "
+                f"CPU {result['cpu_ms']:8.1f} ms  "
+                f"omitidos {counters.get('repaint_skipped', 0):3d}  "
+                f"parciales {counters.get('repaint_partial', 0):3d}  "
+                f"completos {counters.get('repaint_full', 0):3d}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# pylint: disable=no-member,no-name-in-module
+"""
+Micro-benchmark de DesktopVideoPlayer.cv_to_qimage: memoria reservada por frame
+
+Uso: python benchmarks/bench_cv_to_qimage.py [--frames 200] [--source 3840x2160]
+                                             [--target 1920x1080]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cv2
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage
+
+from wallpaperpuka.core.desktop_video_player import DesktopVideoPlayer
+
+
+def legacy_cv_to_qimage(cv_frame, width, height):
+    """Conversión anterior: resize + cvtColor + copy por frame"""
+    frame_resized = cv2.resize(
+        cv_frame, (width, height), interpolation=cv2.INTER_LINEAR
+    )
+    rgb_frame = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
+    h, w, ch = rgb_frame.shape
+    return QImage(rgb_frame.copy(), w, h, ch * w, QImage.Format_RGB888)
+
+
+def parse_size(text):
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+def measure(convert, frames, count):
+    """Bytes reservados (pico) y tiempo medio por frame"""
+    # Calentamiento: la primera llamada puede reservar buffers
+    for frame in frames[:2]:
+        convert(frame)
+
+    tracemalloc.start()
+    peak_total = 0
+    start = time.perf_counter()
+    for i in range(count):
+        frame = frames[i % len(frames)]
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        image = convert(frame)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - base
+        del image
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    return peak_total / count, elapsed / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--source', type=parse_size, default=(3840, 2160))
+    parser.add_argument('--target', type=parse_size, default=(1920, 1080))
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+
+    src_w, src_h = args.source
+    dst_w, dst_h = args.target
+    rng = np.random.default_rng(0)
+    frames = [
+        rng.integers(0, 255, (src_h, src_w, 3), dtype=np.uint8)
+        for _ in range(4)
+    ]
+
+    player = DesktopVideoPlayer()
+    player.resize(dst_w, dst_h)
+    # Con un gestor de ventanas el tamaño puede ajustarse a la pantalla
+    dst_w, dst_h = player.width(), player.height()
+
+    results = {
+        'legacy': measure(
+            lambda f: legacy_cv_to_qimage(f, dst_w, dst_h), frames, args.frames
+        ),
+        'cv_to_qimage': measure(player.cv_to_qimage, frames, args.frames),
+    }
+
+    print(f"{src_w}x{src_h} -> {dst_w}x{dst_h}, {args.frames} frames")
+    for name, (alloc, seconds) in results.items():
+        print(
+            f"  {name:<14} {alloc / (1024 * 1024):8.2f} MB/frame "
+            f"{seconds * 1000:8.2f} ms/frame"
+        )
+
+
+if __name__ == "__main__":
+    main()
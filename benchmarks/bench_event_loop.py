@@ -0,0 +1,123 @@
+# pylint: disable=no-member,no-name-in-module
+"""
+Latencia del bucle de eventos de Qt durante la extracción de un .mlw grande:
+en el hilo de la GUI (como antes) frente a TaskRunner
+
+Uso: python benchmarks/bench_event_loop.py [--size-mb 256] [--max-lag-ms 50]
+
+Sale con código 1 si con TaskRunner el retraso máximo supera --max-lag-ms.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+
+from synthetic import bench_dir, generate_video
+from wallpaperpuka.gui.task_runner import EventLoopMonitor, TaskRunner
+from wallpaperpuka.utils.mlw_handler import MLWHandler
+
+
+def make_large_mlw(size_mb):
+    """.mlw con un MP4 embebido y relleno hasta size_mb"""
+    path = bench_dir() / f"large_{size_mb}mb.mlw"
+    if path.exists():
+        return str(path)
+
+    video = generate_video(640, 360, 'mp4v', 60)
+    padding = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        f.write(b'MLW\x00' + b'\x00' * 4096)
+        with open(video, 'rb') as src:
+            f.write(src.read())
+        # Caja 'free' enorme para que el video embebido ocupe todo el archivo
+        remaining = size_mb * 1024 * 1024 - f.tell() - 8
+        f.write((remaining + 8).to_bytes(4, 'big') + b'free')
+        while remaining > 0:
+            chunk = padding[:min(len(padding), remaining)]
+            f.write(chunk)
+            remaining -= len(chunk)
+    return str(path)
+
+
+def run_blocking(app, handler, mlw_path):
+    """Extraer en el hilo de la GUI, como hacía select_file"""
+    monitor = EventLoopMonitor()
+    monitor.start()
+    result = {}
+
+    def work():
+        result['video'] = handler.extract_video(mlw_path)
+        QTimer.singleShot(20, app.quit)
+
+    QTimer.singleShot(20, work)
+    start = time.perf_counter()
+    app.exec_()
+    monitor.stop()
+    return result.get('video'), time.perf_counter() - start, monitor.summary()
+
+
+def run_background(app, handler, mlw_path):
+    """Extraer con TaskRunner mientras el bucle de eventos sigue libre"""
+    monitor = EventLoopMonitor()
+    runner = TaskRunner()
+    result = {}
+
+    def done(video):
+        result['video'] = video
+        QTimer.singleShot(20, app.quit)
+
+    def start():
+        runner.submit(
+            'extract',
+            lambda task, path: handler.extract_video(path, task.report, task.cancelled),
+            mlw_path,
+            on_done=done,
+            on_error=lambda error: done(None)
+        )
+
+    monitor.start()
+    QTimer.singleShot(20, start)
+    begin = time.perf_counter()
+    app.exec_()
+    monitor.stop()
+    runner.wait()
+    return result.get('video'), time.perf_counter() - begin, monitor.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia del bucle de eventos")
+    parser.add_argument('--size-mb', type=int, default=256)
+    parser.add_argument('--max-lag-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    mlw_path = make_large_mlw(args.size_mb)
+    handler = MLWHandler()
+
+    results = {}
+    for name, func in (('hilo GUI', run_blocking), ('TaskRunner', run_background)):
+        handler.cache.evict(0)
+        results[name] = func(app, handler, mlw_path)
+    handler.cache.evict(0)
+
+    print(f"Extracción de {args.size_mb} MB, timer de 5 ms en el hilo de la GUI")
+    for name, (video, elapsed, lag) in results.items():
+        status = 'ok' if video else 'FALLO'
+        print(f"  {name:<11} {elapsed:6.2f} s  retraso medio {lag['mean']:7.2f} ms  "
+              f"p95 {lag['p95']:7.2f} ms  máx {lag['max']:8.2f} ms  {status}")
+
+    max_lag = results['TaskRunner'][2]['max']
+    if max_lag > args.max_lag_ms:
+        print(f"El bucle de eventos se bloqueó {max_lag:.1f} ms (límite {args.max_lag_ms} ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# pylint: disable=no-member
+"""
+Bytes leídos y tiempo por formato al abrir un .mlw: prueba y error frente a
+la detección por cabecera
+
+Uso: python benchmarks/bench_mlw_sniff.py [--size 1280x720] [--frames 120]
+"""
+import argparse
+import shutil
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cv2
+
+from synthetic import bench_dir, generate_video, make_frame
+from wallpaperpuka.utils.container_scan import sniff_format
+from wallpaperpuka.utils.mlw_handler import MLWHandler
+
+
+def read_bytes():
+    """Bytes leídos por el proceso hasta ahora (Linux), o None"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def legacy_extract(handler, mlw_path):
+    """Método anterior: ZIP, copiar como .mp4/.webm y abrir, escanear"""
+    mlw_path = Path(mlw_path)
+    handler.work_dir.mkdir(exist_ok=True)
+    try:
+        video = handler._extract_from_zip(mlw_path)
+        if video:
+            return video
+        for ext in ('.mp4', '.webm'):
+            temp_video = handler.work_dir / f"{mlw_path.stem}{ext}"
+            shutil.copy2(mlw_path, temp_video)
+            cap = cv2.VideoCapture(str(temp_video))
+            if cap.isOpened():
+                cap.release()
+                return str(temp_video)
+        return handler._extract_embedded_video(mlw_path)
+    finally:
+        shutil.rmtree(handler.work_dir, ignore_errors=True)
+
+
+def make_gif(path, width, height, frames):
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    images = [
+        Image.fromarray(cv2.cvtColor(make_frame(i, width, height), cv2.COLOR_BGR2RGB))
+        for i in range(frames)
+    ]
+    images[0].save(path, save_all=True, append_images=images[1:], duration=40, loop=0)
+    return str(path)
+
+
+def make_fixtures(width, height, frames):
+    """Un .mlw por formato: videos renombrados, paquete ZIP y video embebido"""
+    folder = bench_dir() / 'mlw_sniff'
+    folder.mkdir(exist_ok=True)
+    fixtures = {}
+
+    sources = {
+        'mp4': generate_video(width, height, 'mp4v', frames),
+        'avi': generate_video(width, height, 'MJPG', frames),
+        'webm': generate_video(width, height, 'VP80', frames),
+    }
+    mkv = folder / 'source.mkv'
+    if not mkv.exists():
+        writer = cv2.VideoWriter(str(mkv), cv2.VideoWriter_fourcc(*'mp4v'), 30,
+                                 (width, height))
+        if writer.isOpened():
+            for i in range(frames):
+                writer.write(make_frame(i, width, height))
+        writer.release()
+    sources['mkv'] = str(mkv) if mkv.exists() and mkv.stat().st_size else None
+    sources['gif'] = make_gif(folder / 'source.gif', width // 4, height // 4,
+                              min(frames, 30))
+
+    for name, source in sources.items():
+        if source:
+            target = folder / f"{name}.mlw"
+            shutil.copy(source, target)
+            fixtures[name] = target
+
+    if sources['mp4']:
+        package = folder / 'zip.mlw'
+        with zipfile.ZipFile(package, 'w', zipfile.ZIP_STORED) as zip_ref:
+            zip_ref.writestr('preview.jpg', b'\xff\xd8' + b'\x00' * 4096)
+            zip_ref.write(sources['mp4'], 'wallpaper/video.mp4')
+        fixtures['zip'] = package
+
+        embedded = folder / 'embedded.mlw'
+        with open(embedded, 'wb') as f:
+            f.write(b'MLW\x00' + b'\x00' * 65536)
+            with open(sources['mp4'], 'rb') as src:
+                shutil.copyfileobj(src, f)
+            f.write(b'\x00' * 1024)
+        fixtures['embedded'] = embedded
+
+    return fixtures
+
+
+def measure(func, *args):
+    before = read_bytes()
+    start = time.perf_counter()
+    result = func(*args)
+    wall = time.perf_counter() - start
+    after = read_bytes()
+    read = after - before if before is not None and after is not None else None
+    return result, read, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de detección de formato")
+    parser.add_argument('--size', default='1280x720')
+    parser.add_argument('--frames', type=int, default=120)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.lower().split('x'))
+
+    fixtures = make_fixtures(width, height, args.frames)
+    handler = MLWHandler()
+
+    print(f"{'formato':<9} {'detectado':<9} {'MB':>7} {'leídos antes':>13} "
+          f"{'leídos ahora':>13} {'ms antes':>9} {'ms ahora':>9}")
+    for name, path in fixtures.items():
+        handler.cache.evict(0)
+        legacy, legacy_read, legacy_wall = measure(legacy_extract, handler, path)
+        handler.cache.evict(0)
+        current, current_read, current_wall = measure(handler.extract_video, path)
+
+        def mb(value):
+            return f"{value / 1024 / 1024:.2f}" if value is not None else "n/d"
+
+        detected = sniff_format(path) or '-'
+        ok = 'ok' if legacy and current else 'FALLO'
+        print(f"{name:<9} {detected:<9} {mb(path.stat().st_size):>7} "
+              f"{mb(legacy_read):>13} {mb(current_read):>13} "
+              f"{legacy_wall * 1000:9.1f} {current_wall * 1000:9.1f}  {ok}")
+
+    handler.cache.evict(0)
+
+
+if __name__ == "__main__":
+    main()
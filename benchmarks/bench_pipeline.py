@@ -0,0 +1,244 @@
+# pylint: disable=no-member,no-name-in-module
+"""
+Benchmark headless del pipeline decodificar -> escalar -> convertir
+
+Genera videos sintéticos con OpenCV y mide el camino de DesktopVideoPlayer
+sin pantalla (QT_QPA_PLATFORM=offscreen). Cada caso corre en un proceso
+propio para que el pico de RSS sea comparable.
+
+Uso:
+    python benchmarks/bench_pipeline.py --output resultados.json
+    python benchmarks/bench_pipeline.py --compare base.json --output nuevo.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+RESOLUTIONS = {
+    '360p': (640, 360),
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '4k': (3840, 2160),
+}
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Percentiles en milisegundos"""
+    if not samples:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(samples)
+    result = {}
+    for p in points:
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        result[f"p{p}"] = round(ordered[index] * 1000, 3)
+    return result
+
+
+def peak_rss_mb():
+    """Pico de memoria residente del proceso (None si no está disponible)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux devuelve KB, macOS bytes
+    if sys.platform == 'darwin':
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+def run_case(case):
+    """Ejecutar un caso en este proceso y devolver sus métricas"""
+    import cv2
+    import numpy as np
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtGui import QImage
+    from synthetic import generate_video
+    from wallpaperpuka.core.desktop_video_player import DesktopVideoPlayer
+    from wallpaperpuka.core.frame_pipeline import FrameRingBuffer, DecoderThread
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+
+    width, height = RESOLUTIONS[case['resolution']]
+    video = generate_video(width, height, case['codec'], frames=case['frames'])
+    if not video:
+        return {'error': f"códec no disponible: {case['codec']}"}
+
+    target_w, target_h = case['target']
+    player = DesktopVideoPlayer()
+    player.resize(target_w, target_h)
+    if not player.load_video(video):
+        return {'error': "no se pudo abrir el video"}
+    capture = player.video_capture
+
+    # Modo secuencial: cada etapa medida por separado
+    stages = {'decode': [], 'resize': [], 'convert': [], 'qimage': []}
+    buffer = None
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(case['frames']):
+        t0 = time.perf_counter()
+        ret, frame = capture.read()
+        t1 = time.perf_counter()
+        if not ret:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            continue
+        if buffer is None:
+            buffer = np.empty((player.height(), player.width(), 3), np.uint8)
+        cv2.resize(frame, (buffer.shape[1], buffer.shape[0]), dst=buffer,
+                   interpolation=cv2.INTER_LINEAR)
+        t2 = time.perf_counter()
+        cv2.cvtColor(buffer, cv2.COLOR_BGR2RGB, dst=buffer)
+        t3 = time.perf_counter()
+        image = QImage(buffer, buffer.shape[1], buffer.shape[0],
+                       buffer.shape[1] * 3, QImage.Format_RGB888)
+        t4 = time.perf_counter()
+        del image
+
+        stages['decode'].append(t1 - t0)
+        stages['resize'].append(t2 - t1)
+        stages['convert'].append(t3 - t2)
+        stages['qimage'].append(t4 - t3)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    decoded = len(stages['decode'])
+
+    # Modo con hilo: throughput del DecoderThread vaciando el buffer
+    capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    ring = FrameRingBuffer(player.buffer_depth, player.width(), player.height())
+    decoder = DecoderThread(capture, ring, loop=False)
+    threaded_start = time.perf_counter()
+    decoder.start()
+    consumed = 0
+    while not (decoder.finished and ring.fill_level() == 0):
+        if ring.acquire() is not None:
+            consumed += 1
+        else:
+            time.sleep(0.0005)
+    threaded_wall = time.perf_counter() - threaded_start
+    decoder.stop()
+
+    capture.release()
+    return {
+        'source': f"{width}x{height}",
+        'target': f"{player.width()}x{player.height()}",
+        'frames': decoded,
+        'fps': round(decoded / wall, 2) if wall else None,
+        'threaded_fps': round(consumed / threaded_wall, 2) if threaded_wall else None,
+        'cpu_seconds': round(cpu, 3),
+        'cpu_per_frame_ms': round(cpu / decoded * 1000, 3) if decoded else None,
+        'stages_ms': {name: percentiles(values) for name, values in stages.items()},
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def git_revision():
+    """Commit actual para poder comparar resultados"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def case_name(case):
+    return f"{case['resolution']}-{case['codec']}"
+
+
+def compare(previous, current):
+    """Imprimir variación de fps respecto a una ejecución anterior"""
+    old_cases = previous.get('cases', {})
+    print(f"\nComparación con {previous.get('revision') or 'base'}:")
+    for name, result in current['cases'].items():
+        old = old_cases.get(name)
+        if not old or not old.get('fps') or not result.get('fps'):
+            continue
+        delta = (result['fps'] - old['fps']) / old['fps'] * 100
+        marker = "  << REGRESIÓN" if delta < -10 else ""
+        print(f"  {name:<14} {old['fps']:>9.1f} -> {result['fps']:>9.1f} fps "
+              f"({delta:+.1f}%){marker}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de frames")
+    parser.add_argument('--resolutions', default='360p,720p,1080p',
+                        help="lista separada por comas: " + ",".join(RESOLUTIONS))
+    parser.add_argument('--codecs', default='mp4v,MJPG',
+                        help="FourCC separados por comas (mp4v, MJPG, XVID, VP80)")
+    parser.add_argument('--frames', type=int, default=120)
+    parser.add_argument('--target', default='1920x1080',
+                        help="resolución de pantalla simulada")
+    parser.add_argument('--output', help="guardar resultados en JSON")
+    parser.add_argument('--compare', help="JSON de una ejecución anterior")
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return
+
+    target = [int(v) for v in args.target.lower().split('x')]
+    results = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cases': {},
+    }
+
+    for resolution in args.resolutions.split(','):
+        for codec in args.codecs.split(','):
+            case = {
+                'resolution': resolution,
+                'codec': codec,
+                'frames': args.frames,
+                'target': target,
+            }
+            proc = subprocess.run(
+                [sys.executable, __file__, '--run-case', json.dumps(case)],
+                capture_output=True, text=True
+            )
+            lines = proc.stdout.strip().splitlines()
+            try:
+                result = json.loads(lines[-1])
+            except (IndexError, ValueError):
+                result = {'error': proc.stderr.strip()[-500:]}
+            results['cases'][case_name(case)] = result
+
+            if 'error' in result:
+                print(f"{case_name(case):<14} ERROR: {result['error']}")
+                continue
+            stages = result['stages_ms']
+            print(
+                f"{case_name(case):<14} {result['fps']:>8.1f} fps "
+                f"(hilo {result['threaded_fps']:>8.1f}) "
+                f"decode p95 {stages['decode']['p95']:>7.2f} ms "
+                f"resize p95 {stages['resize']['p95']:>7.2f} ms "
+                f"cpu {result['cpu_per_frame_ms']:>6.2f} ms/frame "
+                f"rss {result['peak_rss_mb']} MB"
+            )
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(json.load(f), results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# pylint: disable=no-member
+"""
+Coste por frame reproduciendo la fuente original frente al proxy de pantalla
+
+Uso: python benchmarks/bench_proxy.py [--source 3840x2160] [--target 1920x1080]
+                                      [--codec mp4v] [--frames 90]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cv2
+import numpy as np
+
+from synthetic import generate_video
+from wallpaperpuka.core.frame_pipeline import scale_into
+from wallpaperpuka.core.video_proxy import ProxyTranscoder
+
+
+def parse_size(text):
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+def measure(path, target):
+    """CPU y tiempo real por frame de decodificar + escalar + convertir"""
+    capture = cv2.VideoCapture(path)
+    buffer = np.empty((target[1], target[0], 3), dtype=np.uint8)
+    frames = 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    while True:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        scale_into(frame, buffer)
+        frames += 1
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    capture.release()
+    return frames, cpu / max(frames, 1), wall / max(frames, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de proxies")
+    parser.add_argument('--source', type=parse_size, default=(3840, 2160))
+    parser.add_argument('--target', type=parse_size, default=(1920, 1080))
+    parser.add_argument('--codec', default='mp4v')
+    parser.add_argument('--frames', type=int, default=90)
+    args = parser.parse_args()
+
+    source = generate_video(*args.source, codec=args.codec, frames=args.frames)
+    if not source:
+        print(f"Códec no disponible: {args.codec}")
+        return
+
+    with tempfile.TemporaryDirectory() as proxy_dir:
+        transcoder = ProxyTranscoder(proxy_dir)
+        start = time.perf_counter()
+        proxy = transcoder.transcode(
+            source,
+            transcoder.proxy_path(source, *args.target, 30),
+            *args.target,
+            30
+        )
+        build_time = time.perf_counter() - start
+        if not proxy:
+            print("No se pudo generar el proxy")
+            return
+
+        results = {
+            'original': measure(source, args.target),
+            'proxy': measure(proxy, args.target),
+        }
+
+    print(f"{args.source[0]}x{args.source[1]} {args.codec} -> "
+          f"{args.target[0]}x{args.target[1]} (proxy generado en {build_time:.1f} s)")
+    for name, (frames, cpu, wall) in results.items():
+        print(f"  {name:<9} {frames:4d} frames  cpu {cpu * 1000:7.2f} ms/frame  "
+              f"real {wall * 1000:7.2f} ms/frame")
+
+    original_cpu = results['original'][1]
+    proxy_cpu = results['proxy'][1]
+    if original_cpu > 0:
+        print(f"  Reducción de CPU por frame: {(1 - proxy_cpu / original_cpu) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
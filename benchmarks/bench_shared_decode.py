@@ -0,0 +1,104 @@
+# pylint: disable=no-member
+"""
+Fondo + vista previa del mismo video: dos VideoCapture frente a un
+decodificador compartido que reparte cada frame a ambos destinos
+
+Uso: python benchmarks/bench_shared_decode.py [--size 1920x1080] [--frames 120]
+                                              [--screen 1920x1080] [--preview 320x180]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cv2
+
+from synthetic import generate_video
+from wallpaperpuka.core.frame_pipeline import (
+    FrameRingBuffer, DecoderThread, FrameSink, scale_into
+)
+
+
+def parse_size(text):
+    return tuple(int(v) for v in text.lower().split('x'))
+
+
+def separate_captures(video, frames, screen, preview):
+    """Como antes: el fondo y la vista previa decodifican cada uno su copia"""
+    decoded = 0
+    for size in (screen, preview):
+        cap = cv2.VideoCapture(video)
+        ring = FrameRingBuffer(2, *size)
+        for _ in range(frames):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            decoded += 1
+            scale_into(frame, ring.slots[0], cv2.INTER_AREA)
+        cap.release()
+    return decoded
+
+
+def shared_decoder(video, frames, screen, preview):
+    """Un DecoderThread: el buffer del fondo más un FrameSink para la vista previa"""
+    cap = cv2.VideoCapture(video)
+    ring = FrameRingBuffer(4, *screen)
+    sink = FrameSink(*preview)
+    decoder = DecoderThread(cap, ring, loop=False, sinks=[sink])
+    decoder.start()
+
+    shown = 0
+    previews = 0
+    while shown < frames and (decoder.is_alive() or ring.fill_level()):
+        if ring.acquire() is not None:
+            shown += 1
+            if sink.latest() is not None:
+                previews += 1
+        else:
+            time.sleep(0.0005)
+    decoder.stop()
+    cap.release()
+    return shown, previews, sink.dropped
+
+
+def measure(func, *args):
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    result = func(*args)
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decodificación compartida")
+    parser.add_argument('--size', default='1920x1080')
+    parser.add_argument('--frames', type=int, default=120)
+    parser.add_argument('--screen', default='1920x1080')
+    parser.add_argument('--preview', default='320x180')
+    args = parser.parse_args()
+
+    width, height = parse_size(args.size)
+    screen = parse_size(args.screen)
+    preview = parse_size(args.preview)
+    video = generate_video(width, height, 'mp4v', args.frames)
+
+    decoded, separate_wall, separate_cpu = measure(
+        separate_captures, video, args.frames, screen, preview
+    )
+    (shown, previews, dropped), shared_wall, shared_cpu = measure(
+        shared_decoder, video, args.frames, screen, preview
+    )
+
+    print(f"{width}x{height} mp4v, {args.frames} frames, fondo {args.screen}, "
+          f"vista previa {args.preview}")
+    print(f"  {'dos VideoCapture':<24} {separate_wall * 1000:8.1f} ms  "
+          f"CPU {separate_cpu * 1000:8.1f} ms  {decoded} frames decodificados")
+    print(f"  {'decodificador compartido':<24} {shared_wall * 1000:8.1f} ms  "
+          f"CPU {shared_cpu * 1000:8.1f} ms  {shown} frames decodificados, "
+          f"{previews} en vista previa, {dropped} descartados")
+
+
+if __name__ == "__main__":
+    main()
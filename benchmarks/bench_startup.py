@@ -0,0 +1,119 @@
+# pylint: disable=no-member
+"""
+Arranque de la GUI: tiempo hasta el primer pintado y coste de importación
+
+Lanza un proceso nuevo por medición (con -X importtime) que crea
+QApplication y MainWindow, la muestra y anota cuándo llega el primer
+paintEvent. Informa también de qué módulos pesados estaban cargados en
+ese momento y de las importaciones más caras.
+
+Uso: python benchmarks/bench_startup.py [--runs 5] [--top 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = r'''
+import json, sys, time
+start = float(sys.argv[1])
+from PyQt5.QtCore import QEvent, QObject, QTimer
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv[:1])
+t_qt = time.perf_counter()
+from wallpaperpuka.gui.main_window import MainWindow
+t_import = time.perf_counter()
+window = MainWindow()
+t_construct = time.perf_counter()
+result = {}
+
+class PaintWatcher(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and 'paint' not in result:
+            result['paint'] = time.perf_counter()
+            result['heavy'] = [m for m in ('cv2', 'numpy', 'sqlite3') if m in sys.modules]
+            QTimer.singleShot(0, app.quit)
+        return False
+
+watcher = PaintWatcher()
+window.installEventFilter(watcher)
+window.show()
+QTimer.singleShot(5000, app.quit)
+app.exec_()
+print(json.dumps({
+    'qt': t_qt - start,
+    'import': t_import - t_qt,
+    'construct': t_construct - t_import,
+    'first_paint': result.get('paint', float('nan')) - start,
+    'heavy': result.get('heavy'),
+}))
+'''
+
+
+def run_once():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = str(ROOT) + os.pathsep + env.get('PYTHONPATH', '')
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen' if sys.platform.startswith('linux') else '')
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD, repr(start)],
+        capture_output=True, text=True, env=env, cwd=str(ROOT)
+    )
+    lines = [line for line in proc.stdout.splitlines() if line.startswith('{')]
+    if proc.returncode != 0 or not lines:
+        print(proc.stderr[-2000:])
+        return None, []
+    return json.loads(lines[-1]), parse_importtime(proc.stderr)
+
+
+def parse_importtime(stderr):
+    """(acumulado en ms, módulo) de las líneas 'import time:', de mayor a menor"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative) / 1000, name.strip()))
+    return sorted(imports, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    results = []
+    imports = []
+    for _ in range(args.runs):
+        result, run_imports = run_once()
+        if result:
+            results.append(result)
+            imports = run_imports
+
+    if not results:
+        print("No se pudo medir el arranque")
+        return
+
+    def median(key):
+        return statistics.median(r[key] for r in results) * 1000
+
+    print(f"Arranque de la GUI (mediana de {len(results)} ejecuciones)")
+    print(f"  interprete + Qt         {median('qt'):8.1f} ms")
+    print(f"  importar main_window    {median('import'):8.1f} ms")
+    print(f"  construir MainWindow    {median('construct'):8.1f} ms")
+    print(f"  primer pintado          {median('first_paint'):8.1f} ms")
+    print(f"  módulos pesados cargados al pintar: {', '.join(results[-1]['heavy']) or 'ninguno'}")
+    print(f"Importaciones más caras (-X importtime, acumulado):")
+    for cumulative, name in imports[:args.top]:
+        print(f"  {cumulative:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# pylint: disable=no-member
+"""
+Miniatura + tira de vista previa: un seek por frame frente a una pasada con grab()
+
+Uso: python benchmarks/bench_thumbnails.py [--size 1280x720] [--frames 600]
+                                           [--gop 250] [--strip 8]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cv2
+
+from synthetic import bench_dir, make_frame
+from wallpaperpuka.core.thumbnailer import Thumbnailer, keyframe_indices
+
+
+def generate_long_gop(width, height, frames, gop, fps=30):
+    """Video mp4v con un keyframe cada gop frames (si el backend lo permite)"""
+    path = bench_dir() / f"long_gop_{width}x{height}_{frames}_{gop}.mp4"
+    if path.exists() and path.stat().st_size > 0:
+        return str(path)
+
+    writer = cv2.VideoWriter(
+        str(path), cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*'mp4v'), fps,
+        (width, height), [cv2.VIDEOWRITER_PROP_KEY_INTERVAL, gop]
+    )
+    if not writer.isOpened():
+        # Backend sin parámetros: GOP por defecto del códec
+        writer = cv2.VideoWriter(
+            str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height)
+        )
+    for i in range(frames):
+        writer.write(make_frame(i, width, height))
+    writer.release()
+    return str(path)
+
+
+def legacy_seek(video_path, strip_frames, output_dir):
+    """Método anterior: seek a total // 4 (y otro seek por frame de la tira)"""
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    positions = [total // 4] + [
+        int(total * (i + 0.5) / strip_frames) for i in range(strip_frames)
+    ]
+    for i, position in enumerate(positions):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+        ret, frame = cap.read()
+        if ret:
+            cv2.imwrite(str(Path(output_dir) / f"legacy_{i}.jpg"), frame)
+    cap.release()
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de miniaturas")
+    parser.add_argument('--size', default='1280x720')
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--gop', type=int, default=250)
+    parser.add_argument('--strip', type=int, default=8)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.lower().split('x'))
+
+    video = generate_long_gop(width, height, args.frames, args.gop)
+    with tempfile.TemporaryDirectory() as output_dir:
+        legacy = timed(legacy_seek, video, args.strip, output_dir)
+
+        cases = {
+            'automático': Thumbnailer(Path(output_dir) / 'auto', strip_frames=args.strip),
+            'una pasada con grab()': Thumbnailer(
+                Path(output_dir) / 'grab', strip_frames=args.strip,
+                seek_cost_frames=args.frames
+            ),
+            'seek a keyframes': Thumbnailer(
+                Path(output_dir) / 'seek', strip_frames=args.strip, seek_cost_frames=0
+            ),
+        }
+        results = {name: timed(t.generate, video) for name, t in cases.items()}
+        cached = timed(cases['automático'].generate, video)
+        keyframes = timed(keyframe_indices, video)
+
+    print(f"{width}x{height}, {args.frames} frames, GOP {args.gop}, "
+          f"tira de {args.strip} frames")
+    print(f"  {'seek por frame (anterior)':<26} {legacy * 1000:8.1f} ms")
+    for name, elapsed in results.items():
+        print(f"  {name:<26} {elapsed * 1000:8.1f} ms")
+    print(f"  {'desde caché':<26} {cached * 1000:8.1f} ms")
+    print(f"  {'(leer keyframes)':<26} {keyframes * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# pylint: disable=no-member
+"""
+Generación de videos sintéticos para los benchmarks
+"""
+import tempfile
+from pathlib import Path
+import cv2
+import numpy as np
+
+# Códec -> extensión del contenedor
+CODECS = {
+    'mp4v': '.mp4',
+    'MJPG': '.avi',
+    'XVID': '.avi',
+    'VP80': '.webm',
+}
+
+
+def bench_dir():
+    """Carpeta temporal para los videos generados"""
+    path = Path(tempfile.gettempdir()) / 'wallpaperpuka_bench'
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def make_frame(index, width, height, moving=True):
+    """Frame BGR con degradado y un rectángulo en movimiento"""
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    shift = index * 4 if moving else 0
+
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = (x + shift) % 256
+    frame[..., 1] = (y + shift) % 256
+    frame[..., 2] = 128
+
+    size = max(8, min(width, height) // 6)
+    left = (index * 7) % max(1, width - size)
+    top = height // 2 - size // 2
+    cv2.rectangle(frame, (left, top), (left + size, top + size), (255, 255, 255), -1)
+    return frame
+
+
+def generate_video(width, height, codec='mp4v', frames=60, fps=30,
+                   frame_func=None, name=None):
+    """Crear (o reutilizar) un video sintético y devolver su ruta"""
+    ext = CODECS.get(codec, '.avi')
+    name = name or f"synthetic_{width}x{height}_{codec}_{frames}"
+    path = bench_dir() / f"{name}{ext}"
+    if path.exists() and path.stat().st_size > 0:
+        return str(path)
+
+    writer = cv2.VideoWriter(
+        str(path), cv2.VideoWriter_fourcc(*codec), fps, (width, height)
+    )
+    if not writer.isOpened():
+        return None
+
+    frame_func = frame_func or make_frame
+    for i in range(frames):
+        writer.write(frame_func(i, width, height))
+    writer.release()
+
+    if not path.exists() or path.stat().st_size == 0:
+        return None
+    return str(path)
@@ -0,0 +1,72 @@
+# pylint: disable=no-name-in-module
+"""
+Ciclo de vida de los reproductores de escritorio
+"""
+import gc
+import os
+import weakref
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QRect
+from PyQt5.QtWidgets import QApplication
+from wallpaperpuka.core import desktop_video_player
+from wallpaperpuka.core.desktop_video_player import DesktopVideoPlayer
+from wallpaperpuka.core.video_proxy import ProxyTranscoder
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def test_closed_players_are_not_kept_alive_for_shutdown(app):
+    before = len(desktop_video_player._live_players)
+    players = [DesktopVideoPlayer(QRect(0, 0, 64, 36)) for _ in range(3)]
+    assert len(desktop_video_player._live_players) == before + 3
+
+    players[0].close()  # Los demás se destruyen sin cerrarse
+    del players
+    gc.collect()
+    assert len(desktop_video_player._live_players) == before
+
+
+def test_shutdown_stops_live_players(app, monkeypatch):
+    player = DesktopVideoPlayer(QRect(0, 0, 64, 36))
+    stopped = []
+    monkeypatch.setattr(player, 'stop_decoder', lambda: stopped.append(player))
+    desktop_video_player.shutdown_players()
+    assert stopped == [player]
+    player.close()
+
+
+class Settings(dict):
+    """Config mínima: opciones en memoria y directorio propio"""
+
+    def __init__(self, config_dir, **options):
+        super().__init__(options)
+        self.config_dir = config_dir
+
+
+def test_toggling_proxies_does_not_keep_old_transcoders(app, tmp_path, monkeypatch):
+    player = DesktopVideoPlayer(QRect(0, 0, 64, 36))
+    cancelled = []
+    monkeypatch.setattr(ProxyTranscoder, 'cancel', lambda self: cancelled.append(self))
+
+    old = []
+    for _ in range(3):
+        player.apply_config(Settings(tmp_path, frame_cache=False, proxy_enabled=True))
+        old.append(weakref.ref(player.proxies))
+        player.apply_config(Settings(tmp_path, frame_cache=False, proxy_enabled=False))
+        assert player.proxies is None
+    assert len(cancelled) == 3
+    del cancelled[:]
+    gc.collect()
+    assert all(ref() is None for ref in old)
+
+    # Al salir solo se cancela el transcodificador en uso
+    player.apply_config(Settings(tmp_path, frame_cache=False, proxy_enabled=True))
+    desktop_video_player.shutdown_players()
+    assert cancelled == [player.proxies]
+    player.close()
@@ -0,0 +1,97 @@
+"""
+Caché de frames en disco compartida entre reproductores y procesos
+"""
+import os
+import time
+from wallpaperpuka.core import frame_cache
+from wallpaperpuka.core.frame_cache import FrameCache, shared_frame_cache
+
+
+def record(cache, key, count=3):
+    store = cache.create(key, count, 8, 4, 24)
+    for _ in range(count):
+        store.record(store.frames[0])
+    store.complete = True
+    return store
+
+
+def test_shared_instance_per_directory(tmp_path):
+    first = shared_frame_cache(tmp_path / 'cache', 1024 * 1024)
+    second = shared_frame_cache(tmp_path / 'cache', 2 * 1024 * 1024)
+    assert first is second
+    assert first.max_bytes == 2 * 1024 * 1024
+
+
+def test_new_instance_keeps_recording_in_progress(tmp_path):
+    recorder = FrameCache(tmp_path)
+    store = recorder.create('a', 3, 8, 4, 24)
+
+    # Otro reproductor (u otro proceso) abre la misma carpeta a mitad de grabación
+    FrameCache(tmp_path)
+    assert os.path.exists(store.path)
+
+    for _ in range(3):
+        store.record(store.frames[0])
+    store.complete = True
+    assert recorder.commit(store)
+    assert FrameCache(tmp_path).open('a') is not None
+
+
+def test_old_orphans_are_removed(tmp_path):
+    store = FrameCache(tmp_path).create('a', 3, 8, 4, 24)
+    old = time.time() - frame_cache.ORPHAN_AGE_SECONDS - 60
+    os.utime(store.path, (old, old))
+
+    FrameCache(tmp_path)
+    assert not os.path.exists(store.path)
+
+
+def test_save_index_merges_other_instances(tmp_path):
+    first = FrameCache(tmp_path)
+    second = FrameCache(tmp_path)
+    assert first.commit(record(first, 'a'))
+    assert second.commit(record(second, 'b'))
+
+    entries = FrameCache(tmp_path).entries
+    assert set(entries) == {'a', 'b'}
+
+    first.remove('a')
+    second.save_index()
+    assert set(FrameCache(tmp_path).entries) == {'b'}
+
+
+def test_same_key_is_recorded_once(tmp_path):
+    cache = FrameCache(tmp_path)
+    store = cache.create('a', 3, 8, 4, 24)
+    assert cache.create('a', 3, 8, 4, 24) is None
+
+    # Una grabación abandonada deja grabar de nuevo
+    store.release()
+    assert cache.create('a', 3, 8, 4, 24) is not None
+
+
+def test_duplicate_recording_does_not_evict(tmp_path):
+    cache = FrameCache(tmp_path, max_bytes=3 * 8 * 4 * 3)  # Una sola entrada
+    assert cache.create('b', 3, 8, 4, 24) is not None
+    assert cache.commit(record(cache, 'old'))
+    # Ya se está grabando 'b': la segunda petición no debe expulsar nada
+    assert cache.create('b', 3, 8, 4, 24) is None
+    assert 'old' in cache.entries
+
+
+def test_eviction_skips_open_entries(tmp_path):
+    cache = FrameCache(tmp_path, max_bytes=3 * 8 * 4 * 3 * 2)
+    for key in ('a', 'b'):
+        store = record(cache, key)
+        assert cache.commit(store)
+        store.release()
+    showing = cache.open('a')
+    cache.open('b').release()  # 'a' queda como la menos usada, pero en pantalla
+
+    assert cache.create('c', 3, 8, 4, 24) is not None
+    assert 'a' in cache.entries and 'b' not in cache.entries
+    assert os.path.exists(showing.path)
+
+    showing.release()
+    cache.evict(0)
+    assert 'a' not in cache.entries
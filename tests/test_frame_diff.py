@@ -0,0 +1,94 @@
+"""
+Detección de teselas cambiadas para el repintado parcial
+"""
+import numpy as np
+import pytest
+from wallpaperpuka.core.frame_diff import TileDiff
+
+
+def dark_frame(width=1920, height=1080):
+    frame = np.full((height, width, 3), 12, dtype=np.uint8)
+    frame[::7, ::5] = 20  # Textura fija
+    return frame
+
+
+def covers(rects, x, y):
+    return any(rx <= x < rx + w and ry <= y < ry + h for rx, ry, w, h in rects)
+
+
+def test_small_moving_dot_is_always_repainted():
+    diff = TileDiff()
+    assert diff.changed(dark_frame()) == [(0, 0, 1920, 1080)]
+
+    for index in range(40):
+        frame = dark_frame()
+        x, y = 100 + index * 37, 200 + index * 13
+        frame[y:y + 6, x:x + 6] = (240, 240, 200)
+        rects = diff.changed(frame)
+        assert rects, f"frame {index} sin repintar"
+        assert covers(rects, x, y) and covers(rects, x + 5, y + 5)
+        # Solo las teselas del punto nuevo y del anterior
+        assert sum(w * h for _, _, w, h in rects) <= 4 * 2 * 64 * 64
+
+
+def test_identical_frame_is_skipped():
+    diff = TileDiff()
+    frame = dark_frame()
+    diff.changed(frame)
+    assert diff.changed(frame.copy()) == []
+
+
+def test_single_pixel_change():
+    diff = TileDiff()
+    frame = dark_frame()
+    diff.changed(frame)
+    frame = frame.copy()
+    frame[1079, 1919, 2] += 1  # Último píxel, un canal, un nivel
+    assert diff.changed(frame) == [(1856, 1024, 64, 56)]
+
+
+@pytest.mark.parametrize('width', [1366, 1365, 1000, 50])
+def test_widths_not_multiple_of_word(width):
+    diff = TileDiff()
+    frame = dark_frame(width, 100)
+    diff.changed(frame)
+    frame = frame.copy()
+    frame[50, width - 1] = 255
+    rects = diff.changed(frame)
+    assert covers(rects, width - 1, 50)
+    assert all(x + w <= width for x, _, w, _ in rects)
+
+
+def test_threshold_accumulates_slow_changes():
+    diff = TileDiff(threshold=4)
+    frame = dark_frame(640, 360)
+    diff.changed(frame)
+    frame = frame.copy()
+    frame[10:20, 10:20] += 3
+    assert diff.changed(frame) == []  # Por debajo del umbral
+    frame[10:20, 10:20] += 3
+    assert covers(diff.changed(frame), 10, 10)  # Acumulado: 6 > 4
+
+
+def test_backoff_after_full_repaints():
+    diff = TileDiff()
+    diff.changed(dark_frame(640, 360))
+    for level in range(diff.full_streak):
+        diff.changed(np.full((360, 640, 3), level * 10, dtype=np.uint8))
+    assert diff.skip == diff.backoff
+    # Durante la pausa del diff todo se repinta, aunque no cambie nada
+    assert diff.changed(dark_frame(640, 360)) == [(0, 0, 640, 360)]
+
+
+@pytest.mark.parametrize('height', [48, 1, 100, 130])
+def test_heights_below_or_not_multiple_of_tile(height):
+    diff = TileDiff()
+    frame = dark_frame(200, height)
+    assert diff.changed(frame) == [(0, 0, 200, height)]
+    assert diff.changed(frame.copy()) == []
+
+    frame = frame.copy()
+    frame[height - 1, 150] = 255
+    rects = diff.changed(frame)
+    assert covers(rects, 150, height - 1)
+    assert all(y + h <= height for _, y, _, h in rects)
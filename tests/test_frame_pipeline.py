@@ -0,0 +1,110 @@
+"""
+Buffer circular y destinos extra de frames
+"""
+import threading
+import cv2
+import numpy as np
+from wallpaperpuka.core.frame_pipeline import DecoderThread, FrameRingBuffer, FrameSink
+
+
+def frame(value, width=32, height=16):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_ring_clear_keeps_held_slot():
+    ring = FrameRingBuffer(3, 4, 2)
+    for t in (0.0, 0.1):
+        ring.begin_write()[:] = int(t * 100)
+        ring.end_write(t)
+    held = ring.acquire()
+    ring.begin_write()[:] = 50
+    ring.end_write(0.2)
+
+    ring.clear()
+    assert ring.fill_level() == 0
+    assert ring.next_time() is None
+    assert held[0, 0, 0] == 0  # El slot en pantalla no se reutiliza aún
+
+    # Se puede volver a escribir hasta llenar el buffer (menos el retenido)
+    for t in (0.0, 0.04):
+        assert ring.begin_write(timeout=0) is not None
+        ring.end_write(t)
+    assert ring.begin_write(timeout=0) is None
+
+
+def test_sink_reset_after_timeline_restart():
+    sink = FrameSink(8, 4, depth=3)
+    for t in (4.0, 4.033, 4.066):
+        sink.offer(frame(200), t, rgb=True)
+    # El reproductor cambia de video y su reloj vuelve a empezar
+    assert sink.acquire_at(0.0) is None
+
+    sink.reset()
+    sink.offer(frame(10), 0.0, rgb=True)
+    slot = sink.acquire_at(0.0)
+    assert slot is not None and slot[0, 0, 0] == 10
+
+
+class SlowCapture:
+    """Captura cuyo grab() se queda bloqueado hasta que se libera"""
+
+    def __init__(self):
+        self.release_grab = threading.Event()
+        self.grabbing = threading.Event()
+
+    def get(self, prop):
+        return 0 if prop == cv2.CAP_PROP_POS_FRAMES else 24
+
+    def grab(self):
+        self.grabbing.set()
+        self.release_grab.wait(5)
+        return True
+
+    def retrieve(self):
+        return True, frame(0)
+
+
+class Recorder:
+    def __init__(self):
+        self.released = threading.Event()
+        self.writing_after_release = False
+
+    def record(self, slot):
+        if self.released.is_set():
+            self.writing_after_release = True
+        return True
+
+    def finalize(self):
+        return False
+
+    def release(self):
+        self.released.set()
+
+
+def test_recorder_released_by_thread_still_decoding():
+    capture, recorder = SlowCapture(), Recorder()
+    decoder = DecoderThread(capture, FrameRingBuffer(32, 16, 3), recorder=recorder)
+    decoder.start()
+    assert capture.grabbing.wait(5)
+
+    decoder.stop(timeout=0.05)
+    assert decoder.is_alive()  # Sigue dentro de grab()
+    decoder.discard_recorder()
+    assert not recorder.released.is_set()
+
+    capture.release_grab.set()
+    decoder.join(5)
+    assert recorder.released.is_set()
+    assert not recorder.writing_after_release
+    assert decoder.recorder is None
+
+
+def test_recorder_released_at_once_when_thread_ended():
+    capture, recorder = SlowCapture(), Recorder()
+    capture.release_grab.set()
+    decoder = DecoderThread(capture, FrameRingBuffer(32, 16, 3), recorder=recorder)
+    decoder.start()
+    decoder.stop()
+    assert not decoder.is_alive()
+    decoder.discard_recorder()
+    assert recorder.released.is_set()
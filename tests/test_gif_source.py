@@ -0,0 +1,63 @@
+"""
+Retardos y composición de frames de GIF animados
+"""
+import pytest
+from wallpaperpuka.core.gif_source import GifFrameStore, frame_delay, is_gif
+
+Image = pytest.importorskip('PIL.Image')
+
+
+@pytest.mark.parametrize('duration, seconds', [
+    (None, 0.1),
+    (0, 0.1),
+    (10, 0.1),  # Como los navegadores: 0-10 ms se reproducen a 100 ms
+    (11, 0.011),
+    (15, 0.015),
+    (20, 0.02),
+    (40, 0.04),
+])
+def test_frame_delay(duration, seconds):
+    info = {} if duration is None else {'duration': duration}
+    assert frame_delay(info) == pytest.approx(seconds)
+
+
+def make_gif(path, durations, size=(16, 8)):
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0)]
+    frames = [Image.new('RGB', size, colors[i % len(colors)]) for i in range(len(durations))]
+    frames[0].save(path, save_all=True, append_images=frames[1:],
+                   duration=list(durations), loop=0, disposal=1)
+    return path
+
+
+def test_frames_follow_their_own_delays(tmp_path):
+    store = GifFrameStore.load(make_gif(tmp_path / 'a.gif', [20, 60, 20]))
+    assert store.count == 3
+    assert store.duration == pytest.approx(0.1)
+
+    frame, start = store.frame_at(0.03)
+    assert tuple(frame[0, 0]) == (0, 255, 0)
+    assert start == pytest.approx(0.02)
+
+    # Segunda vuelta
+    frame, start = store.frame_at(0.19)
+    assert tuple(frame[0, 0]) == (0, 0, 255)
+    assert start == pytest.approx(0.18)
+
+
+def test_load_scales_down_to_max_size(tmp_path):
+    store = GifFrameStore.load(make_gif(tmp_path / 'a.gif', [40, 40], (64, 32)), (32, 16))
+    assert store.frames.shape == (2, 16, 32, 3)
+
+
+def test_load_respects_budget(tmp_path):
+    assert GifFrameStore.load(make_gif(tmp_path / 'a.gif', [40, 40]), budget=100) is None
+
+
+def test_is_gif_sniffs_renamed_mlw(tmp_path):
+    gif = make_gif(tmp_path / 'a.gif', [40, 40])
+    renamed = tmp_path / 'a.mlw'
+    renamed.write_bytes(gif.read_bytes())
+    other = tmp_path / 'b.mlw'
+    other.write_bytes(b'\x00' * 64)
+    assert is_gif(gif) and is_gif(renamed)
+    assert not is_gif(other)
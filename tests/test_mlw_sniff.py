@@ -0,0 +1,182 @@
+"""
+Detección de formato por cabecera y localización de videos dentro de .mlw
+
+Los videos son estructuras mínimas construidas a mano (cajas MP4 y
+cabecera EBML): basta con que el escáner las reconozca, no hace falta
+decodificarlas.
+"""
+import io
+import tempfile
+import zipfile
+import pytest
+from wallpaperpuka.utils.container_scan import (
+    find_embedded_video, sniff_format, sniff_header, zip_member_range
+)
+from wallpaperpuka.utils.mlw_handler import MLWHandler
+
+
+def box(box_type, payload=b''):
+    return (8 + len(payload)).to_bytes(4, 'big') + box_type + payload
+
+
+def make_mp4(payload_size=4000, brand=b'isom'):
+    return (
+        box(b'ftyp', brand + b'\x00\x00\x02\x00' + brand)
+        + box(b'mdat', bytes(range(256)) * (payload_size // 256))
+        + box(b'moov', b'\x00' * 64)
+    )
+
+
+def make_ebml(doctype=b'webm', payload_size=4000):
+    doctype_element = b'\x42\x82' + bytes([0x80 | len(doctype)]) + doctype
+    header = b'\x1A\x45\xDF\xA3' + bytes([0x80 | len(doctype_element)]) + doctype_element
+    segment = b'\xAB' * payload_size
+    # Tamaño del segmento en 4 bytes (vint con marcador 0x10)
+    size = (0x10 << 24 | len(segment)).to_bytes(4, 'big')
+    return header + b'\x18\x53\x80\x67' + size + segment
+
+
+def make_zip(members, compression=zipfile.ZIP_STORED):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression) as zip_ref:
+        for name, data in members.items():
+            zip_ref.writestr(name, data)
+    return buffer.getvalue()
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+@pytest.mark.parametrize('header, expected', [
+    (make_mp4(), '.mp4'),
+    (make_mp4(brand=b'qt  '), '.mov'),
+    (box(b'moov', b'\x00' * 16), '.mov'),
+    (make_ebml(b'webm'), '.webm'),
+    (make_ebml(b'matroska'), '.mkv'),
+    (b'RIFF\x00\x00\x00\x00AVI LIST', '.avi'),
+    (b'GIF89a\x01\x00\x01\x00', '.gif'),
+    (b'GIF87a\x01\x00\x01\x00', '.gif'),
+    (make_zip({'a.txt': b'x'}), '.zip'),
+    (b'PK\x05\x06' + b'\x00' * 18, '.zip'),
+    (b'MLW\x00 formato propio' + make_mp4(), None),
+    (b'', None),
+])
+def test_sniff_header(header, expected):
+    assert sniff_header(header[:4096]) == expected
+
+
+def test_sniff_format_ignores_extension(tmp_path):
+    assert sniff_format(write(tmp_path, 'video.mlw', make_mp4())) == '.mp4'
+    assert sniff_format(write(tmp_path, 'clip.mp4', make_ebml())) == '.webm'
+
+
+@pytest.mark.parametrize('make, ext', [(make_mp4, '.mp4'), (make_ebml, '.webm')])
+@pytest.mark.parametrize('split', range(1, 4))
+def test_embedded_signature_across_chunks(tmp_path, make, ext, split):
+    video = make()
+    chunk_size = 256
+    # La firma (ftyp en el byte 4, EBML en el 0) queda partida entre dos bloques
+    signature_at = 4 if ext == '.mp4' else 0
+    prefix = b'\x00' * (chunk_size * 3 - signature_at - split)
+    path = write(tmp_path, 'embedded.mlw', prefix + video + b'\xFF' * 300)
+
+    payload = find_embedded_video(path, chunk_size=chunk_size)
+    assert payload is not None
+    assert payload.ext == ext
+    assert payload.offset == len(prefix)
+    assert payload.length == len(video)
+
+
+def test_embedded_skips_false_signature(tmp_path):
+    # 'ftyp' suelto sin cajas válidas detrás no es un video
+    data = b'\x00' * 100 + b'\x00\x00\x00\x10ftypbasura' + b'\x00' * 50 + make_mp4()
+    path = write(tmp_path, 'embedded.mlw', data)
+    payload = find_embedded_video(path, chunk_size=64)
+    assert payload.offset == len(data) - len(make_mp4())
+
+
+def test_embedded_not_found(tmp_path):
+    assert find_embedded_video(write(tmp_path, 'empty.mlw', b'\x00' * 5000)) is None
+
+
+def read_range(payload):
+    with open(payload.path, 'rb') as f:
+        f.seek(payload.offset)
+        return f.read(payload.length)
+
+
+def test_zip_member_range_stored(tmp_path):
+    video = make_mp4()
+    path = write(tmp_path, 'pack.mlw', make_zip({'preview.png': b'png', 'wall.mp4': video}))
+    with zipfile.ZipFile(path) as zip_ref:
+        info = zip_ref.getinfo('wall.mp4')
+    payload = zip_member_range(path, info, '.mp4')
+    assert read_range(payload) == video
+
+
+def test_zip_member_range_deflated(tmp_path):
+    path = write(tmp_path, 'pack.mlw', make_zip({'wall.mp4': make_mp4()}, zipfile.ZIP_DEFLATED))
+    with zipfile.ZipFile(path) as zip_ref:
+        info = zip_ref.getinfo('wall.mp4')
+    assert zip_member_range(path, info, '.mp4') is None
+
+
+def test_zip_member_range_with_prepended_data(tmp_path):
+    video = make_mp4()
+    path = write(tmp_path, 'pack.mlw', b'CABECERA' * 64 + make_zip({'wall.mp4': video}))
+    with zipfile.ZipFile(path) as zip_ref:
+        info = zip_ref.getinfo('wall.mp4')
+    assert read_range(zip_member_range(path, info, '.mp4')) == video
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path / 'temp'))
+    (tmp_path / 'temp').mkdir()
+    return MLWHandler()
+
+
+def test_handler_renamed_video_in_place(handler, tmp_path):
+    path = write(tmp_path, 'renamed.mlw', make_ebml())
+    assert handler.extract_video(path) == str(path)
+
+
+@pytest.mark.parametrize('compression', [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_handler_zip(handler, tmp_path, compression):
+    video = make_mp4()
+    small = make_mp4(500)
+    path = write(tmp_path, 'pack.mlw', make_zip(
+        {'thumb.mp4': small, 'wall.mp4': video, 'info.json': b'{}'}, compression
+    ))
+    extracted = handler.extract_video(path)
+    assert extracted.endswith('.mp4')
+    with open(extracted, 'rb') as f:
+        assert f.read() == video  # El miembro de video más grande
+
+
+def test_handler_zip_member_without_extension(handler, tmp_path):
+    video = make_ebml()
+    path = write(tmp_path, 'pack.mlw', make_zip({'payload.bin': video}))
+    extracted = handler.extract_video(path)
+    assert extracted.endswith('.webm')
+
+
+def test_handler_embedded(handler, tmp_path):
+    video = make_mp4()
+    path = write(tmp_path, 'custom.mlw', b'MLW1' + b'\x00' * 1000 + video + b'\x00' * 100)
+    extracted = handler.extract_video(path)
+    with open(extracted, 'rb') as f:
+        assert f.read() == video
+    assert handler.locate_embedded_video(path).offset == 1004
+
+    # Segunda apertura: desde la caché, sin volver a extraer
+    assert handler.extract_video(path) == extracted
+
+
+def test_handler_unknown(handler, tmp_path):
+    path = write(tmp_path, 'broken.mlw', b'\x01\x02' * 2000)
+    assert handler.extract_video(path) is None
+    assert handler.locate_embedded_video(path) is None
@@ -0,0 +1,108 @@
+"""
+Política de pausa automática con lecturas del sistema sustituidas por valores fijos
+"""
+import pytest
+from wallpaperpuka.core.playback_policy import (
+    BatteryProbe, CpuLoadProbe, IdleProbe, PlaybackPolicy, PolicyProbe,
+    WindowCoverageProbe
+)
+
+SCREEN = (0, 0, 1920, 1080)
+
+
+def values(*readings):
+    """Lector que devuelve las lecturas en orden (la última se repite)"""
+    readings = list(readings)
+
+    def read():
+        return readings.pop(0) if len(readings) > 1 else readings[0]
+    return read
+
+
+class FixedProbe(PolicyProbe):
+    name = "fixed"
+
+    def __init__(self, *states):
+        self.read = values(*states)
+
+    def active(self):
+        return self.read()
+
+
+@pytest.mark.parametrize('window, covered', [
+    ((0, 0, 1920, 1080), True),  # Maximizada
+    ((-8, -8, 1928, 1088), True),  # Bordes fuera de la pantalla
+    ((0, 0, 1920, 1030), True),  # Deja ver la barra de tareas (95.4 %)
+    ((0, 0, 1920, 1000), False),  # 92.6 %
+    ((100, 100, 900, 700), False),
+    ((1920, 0, 3840, 1080), False),  # En otra pantalla
+    (None, False),
+])
+def test_coverage_ratio_threshold(window, covered):
+    probe = WindowCoverageProbe(lambda: SCREEN, lambda: window)
+    assert probe.active() is covered
+
+
+def test_coverage_custom_ratio():
+    probe = WindowCoverageProbe(lambda: SCREEN, lambda: (0, 0, 1920, 540), ratio=0.5)
+    assert probe.active()
+    probe.ratio = 0.6
+    assert not probe.active()
+
+
+def test_cpu_hysteresis():
+    probe = CpuLoadProbe(0.9, 0.7, values(0.85, 0.95, 0.8, 0.64, 0.62))
+    assert not probe.active()  # Por debajo del umbral
+    assert probe.active()  # Lo supera
+    assert probe.active()  # 0.8 sigue por encima de 0.9 * 0.7
+    assert probe.active()  # 0.64 también
+    assert not probe.active()  # 0.62 ya permite reanudar
+
+
+def test_cpu_unknown_keeps_state():
+    probe = CpuLoadProbe(0.9, read_load=values(0.95, None))
+    assert probe.active()
+    assert probe.active()
+
+
+@pytest.mark.parametrize('status, below, paused', [
+    ((True, 10), None, False),  # Conectado a corriente
+    ((False, 80), None, True),  # Con batería
+    ((False, 80), 30, False),  # Con batería pero por encima del umbral
+    ((False, 30), 30, False),
+    ((False, 29), 30, True),
+    ((False, None), 30, True),  # Porcentaje desconocido
+    (None, None, False),  # Sin batería
+])
+def test_battery_thresholds(status, below, paused):
+    assert BatteryProbe(below, lambda: status).active() is paused
+
+
+def test_idle_threshold():
+    assert not IdleProbe(600, lambda: 599).active()
+    assert IdleProbe(600, lambda: 600).active()
+    assert not IdleProbe(600, lambda: None).active()
+
+
+def test_resume_after_clean_checks():
+    policy = PlaybackPolicy([FixedProbe(True, False, True, False)], resume_checks=2)
+    assert policy.evaluate()
+    assert policy.reasons == ['fixed']
+    assert policy.evaluate()  # Una evaluación limpia no basta
+    assert policy.evaluate()  # Vuelve a activarse: la cuenta empieza de nuevo
+    assert policy.evaluate()
+    assert not policy.evaluate()
+    assert policy.reasons == []
+
+
+def test_failing_probe_is_ignored(capsys):
+    class BrokenProbe(PolicyProbe):
+        name = "broken"
+
+        def active(self):
+            raise OSError("sin acceso")
+
+    policy = PlaybackPolicy([BrokenProbe(), FixedProbe(True)])
+    assert policy.evaluate()
+    assert policy.reasons == ['fixed']
+    assert "broken" in capsys.readouterr().out
@@ -0,0 +1,77 @@
+# pylint: disable=no-name-in-module
+"""
+Superficies de otras pantallas que pintan los frames del reproductor
+"""
+import os
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QRect
+from PyQt5.QtWidgets import QApplication
+from wallpaperpuka.core.desktop_video_player import DesktopVideoPlayer
+from wallpaperpuka.core.frame_store import FrameStore
+from wallpaperpuka.core.screen_layout import ScreenLayout
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def player(app, tmp_path, monkeypatch):
+    monkeypatch.setattr('tempfile.tempdir', str(tmp_path))
+    player = DesktopVideoPlayer(QRect(0, 0, 160, 90))
+    player.resize(160, 90)
+    player.frame_diff = None
+    yield player
+    player.stop()
+    player.close()
+
+
+def store_with_frames(width, height, count=4):
+    store = FrameStore.allocate(count, width, height, 24, use_mmap=True)
+    for index in range(count):
+        store.record(np.full((height, width, 3), 40 * index, dtype=np.uint8))
+    store.finalize()
+    return store
+
+
+def test_mirror_drops_frame_when_provider_releases_store(player):
+    size = QRect(0, 0, player.width(), player.height())
+    screens = lambda: [('A', size), ('B', size.translated(player.width(), 0))]
+    layout = ScreenLayout(player, 'duplicate', screens=screens)
+    layout.apply('clip.mp4')
+    surface = layout.surfaces[0]
+    assert surface.sink is None  # Misma resolución: comparte el QImage
+
+    player.frame_store = store_with_frames(player.width(), player.height())
+    player.show_stored_frame()
+    assert surface.current_frame is player.current_frame is not None
+
+    # La memoria del almacén (memmap) se libera: nadie debe seguir pintándola
+    player.release_frame_store()
+    assert player.current_frame is None
+    assert surface.current_frame is None
+    surface.repaint()
+    layout.release()
+
+
+def test_scaled_mirror_keeps_its_own_frame(player):
+    screens = lambda: [('A', QRect(0, 0, player.width(), player.height())),
+                       ('B', QRect(0, 0, 80, 45))]
+    layout = ScreenLayout(player, 'duplicate', screens=screens)
+    layout.apply('clip.mp4')
+    surface = layout.surfaces[0]
+    assert surface.sink is not None
+
+    player.frame_store = store_with_frames(player.width(), player.height())
+    player.show_stored_frame()
+    assert surface.current_frame is not None
+    # Su QImage apunta al buffer de su FrameSink, que sigue vivo
+    player.release_frame_store()
+    assert surface.current_frame is not None
+    surface.repaint()
+    layout.release()
@@ -0,0 +1,115 @@
+# pylint: disable=no-name-in-module
+"""
+TaskRunner: la GUI sigue respondiendo durante una extracción y los
+resultados descartados se liberan
+"""
+import os
+import tempfile
+import threading
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+from wallpaperpuka.gui.task_runner import EventLoopMonitor, TaskRunner
+from wallpaperpuka.utils.mlw_handler import MLWHandler
+
+# Retraso máximo aceptable del bucle de eventos (un frame a 20 FPS)
+MAX_LAG_MS = 50.0
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def run_until(app, condition, timeout_ms=30000):
+    """Procesar eventos hasta que condition() se cumpla"""
+    timer = QTimer()
+    timer.timeout.connect(lambda: condition() and app.quit())
+    timer.start(5)
+    QTimer.singleShot(timeout_ms, app.quit)
+    app.exec_()
+    timer.stop()
+    return condition()
+
+
+def make_large_mlw(path, size_mb):
+    """.mlw con un MP4 embebido (cajas mínimas) de size_mb"""
+    with open(path, 'wb') as f:
+        f.write(b'MLW\x00' + b'\x00' * 4096)
+        f.write((16).to_bytes(4, 'big') + b'ftypisom\x00\x00\x02\x00')
+        f.write((72).to_bytes(4, 'big') + b'moov' + b'\x00' * 64)
+        remaining = size_mb * 1024 * 1024 - f.tell() - 8
+        f.write((remaining + 8).to_bytes(4, 'big') + b'mdat')
+        block = os.urandom(1024 * 1024)
+        while remaining > 0:
+            chunk = block[:min(len(block), remaining)]
+            f.write(chunk)
+            remaining -= len(chunk)
+
+
+def test_event_loop_lag_during_extraction(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    mlw_path = tmp_path / 'large.mlw'
+    make_large_mlw(mlw_path, 128)
+    handler = MLWHandler()
+
+    runner = TaskRunner()
+    monitor = EventLoopMonitor()
+    result = {}
+    runner.submit(
+        'extract',
+        lambda task, path: handler.extract_video(path, task.report, task.cancelled),
+        mlw_path,
+        on_done=lambda video: result.setdefault('video', video),
+        on_error=lambda error: result.setdefault('error', error)
+    )
+    monitor.start()
+    assert run_until(app, lambda: result)
+    monitor.stop()
+    runner.wait()
+
+    assert result.get('video')
+    assert os.path.getsize(result['video']) > 100 * 1024 * 1024
+    lag = monitor.summary()
+    assert lag['count'] > 0
+    assert lag['max'] < MAX_LAG_MS, lag
+
+
+def test_replaced_task_result_is_discarded(app):
+    runner = TaskRunner()
+    release = threading.Event()
+    delivered, discarded = [], []
+
+    def slow(task, value):
+        release.wait(5)
+        return value
+
+    runner.submit('preview', slow, 'vieja', on_done=delivered.append,
+                  on_discard=discarded.append)
+    # La nueva cancela la anterior, que aun así termina y devuelve su resultado
+    runner.submit('preview', lambda task, value: value, 'nueva',
+                  on_done=delivered.append, on_discard=discarded.append)
+    release.set()
+
+    assert run_until(app, lambda: len(delivered) + len(discarded) == 2)
+    runner.wait()
+    assert delivered == ['nueva']
+    assert discarded == ['vieja']
+
+
+def test_stale_finished_result_is_discarded(app):
+    runner = TaskRunner()
+    delivered, discarded = [], []
+    task = runner.submit('preview', lambda task: 'resultado',
+                         on_done=delivered.append, on_discard=discarded.append)
+    runner.wait()
+    # Terminó pero su señal aún no se ha entregado: otra tarea la sustituye
+    runner.tasks['preview'] = object()
+
+    assert run_until(app, lambda: discarded)
+    assert task.result == 'resultado'
+    assert delivered == []
+    assert discarded == ['resultado']
@@ -0,0 +1,71 @@
+# pylint: disable=no-member
+"""
+Miniaturas y tira de vista previa
+"""
+import cv2
+import numpy as np
+import pytest
+from wallpaperpuka.core import thumbnailer
+from wallpaperpuka.core.thumbnailer import Thumbnailer, grab_frames
+
+
+@pytest.fixture
+def video(tmp_path):
+    """Clip MJPG corto: cada frame tiene un gris distinto (índice * 8)"""
+    path = tmp_path / 'clip.avi'
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), 24, (64, 48))
+    if not writer.isOpened():
+        pytest.skip("OpenCV sin escritor MJPG")
+    for index in range(30):
+        writer.write(np.full((48, 64, 3), index * 8, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_sequential_pass_skips_keyframe_scan(video, monkeypatch):
+    def keyframe_indices(*args, **kwargs):
+        raise AssertionError("la pasada secuencial no debe leer keyframes")
+    monkeypatch.setattr(thumbnailer, 'keyframe_indices', keyframe_indices)
+
+    frames = grab_frames(video, [0.0, 0.5, 0.9])
+    assert [int(round(f.mean() / 8)) for f in frames] == [0, 15, 27]
+
+
+def test_seek_scan_stops_after_last_target(video, monkeypatch):
+    calls = []
+
+    def keyframe_indices(path, stop_after=None):
+        calls.append(stop_after)
+        return list(range(30))
+    monkeypatch.setattr(thumbnailer, 'keyframe_indices', keyframe_indices)
+
+    frames = grab_frames(video, [0.1, 0.5], seek_cost_frames=1)
+    assert calls == [15]
+    assert all(frame is not None for frame in frames)
+
+
+def test_seek_without_keyframe_property(video, monkeypatch):
+    # OpenCV anteriores a CAP_PROP_LRF_HAS_KEY_FRAME: posiciones repartidas
+    monkeypatch.setattr(thumbnailer, 'KEY_FRAME_PROP', None)
+    assert thumbnailer.keyframe_indices(video) is None
+
+    frames = grab_frames(video, [0.1, 0.5], seek_cost_frames=1)
+    assert [int(round(f.mean() / 8)) for f in frames] == [3, 15]
+
+
+def test_strip_skipped_when_no_frame_decodes(video, tmp_path, monkeypatch):
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    monkeypatch.setattr(
+        thumbnailer, 'grab_frames',
+        lambda path, fractions, *args: [frame] + [None] * (len(fractions) - 1)
+    )
+    result = Thumbnailer(tmp_path / 'thumbs').generate(video)
+    assert result['strip'] is None
+    assert cv2.imread(result['thumbnail']).shape[1] == 320
+
+
+def test_generate_thumbnail_and_strip(video, tmp_path):
+    result = Thumbnailer(tmp_path / 'thumbs', strip_frames=4, strip_width=32).generate(video)
+    strip = cv2.imread(result['strip'])
+    assert strip.shape[1] == 4 * 32
+    assert cv2.imread(result['thumbnail']) is not None
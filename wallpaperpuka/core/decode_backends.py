@@ -0,0 +1,299 @@
+# pylint: disable=no-member
+"""
+Backends de decodificación intercambiables y sondeo del más rápido por video
+
+Todos devuelven un objeto con la parte de la interfaz de cv2.VideoCapture
+que usa el reproductor (isOpened, grab, retrieve, read, get, set,
+release). El primer video de cada códec y resolución se sondea: se mide
+la apertura y los FPS de decodificación de los primeros frames con cada
+backend disponible y el ganador queda en el índice de la biblioteca.
+
+Los frames ya decodificados (caché de bucle y caché de frames en disco)
+no pasan por aquí: el reproductor los usa directamente antes de abrir
+ningún backend.
+"""
+import os
+import time
+import cv2
+
+try:
+    import av
+except ImportError:
+    av = None
+
+DEFAULT_BACKEND = 'opencv'
+
+
+def codec_name(capture):
+    """FOURCC del video como texto (None si el backend no lo da)"""
+    fourcc = int(capture.get(cv2.CAP_PROP_FOURCC))
+    codec = ''.join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4)).strip('\x00 ')
+    return codec or None
+
+
+class OpenCVBackend:
+    """cv2.VideoCapture con el backend que elija OpenCV"""
+
+    name = 'opencv'
+
+    def available(self):
+        return True
+
+    def open(self, path):
+        return cv2.VideoCapture(str(path))
+
+
+class OpenCVFFmpegBackend(OpenCVBackend):
+    """OpenCV forzando FFmpeg con un hilo de decodificación por núcleo"""
+
+    name = 'ffmpeg-threads'
+
+    def __init__(self, threads=None):
+        self.threads = threads or os.cpu_count() or 1
+
+    def available(self):
+        return hasattr(cv2, 'CAP_PROP_N_THREADS')
+
+    def open(self, path):
+        return cv2.VideoCapture(
+            str(path), cv2.CAP_FFMPEG, [cv2.CAP_PROP_N_THREADS, self.threads]
+        )
+
+
+class PyAVCapture:
+    """Interfaz de cv2.VideoCapture sobre PyAV (solo lo que usa el reproductor)"""
+
+    def __init__(self, path):
+        self.container = None
+        self.frame = None
+        self.index = -1
+        try:
+            self.container = av.open(str(path))
+            self.stream = self.container.streams.video[0]
+            self.stream.thread_type = 'AUTO'
+            self.frames = self.container.decode(self.stream)
+        except Exception as e:
+            print(f"PyAV no puede abrir {path}: {e}")
+            self.release()
+
+    def isOpened(self):
+        return self.container is not None
+
+    def grab(self):
+        # PyAV decodifica al avanzar; retrieve() solo convierte a BGR
+        if self.container is None:
+            return False
+        try:
+            self.frame = next(self.frames, None)
+        except Exception:
+            self.frame = None
+        if self.frame is None:
+            return False
+        self.index += 1
+        return True
+
+    def retrieve(self):
+        if self.frame is None:
+            return False, None
+        return True, self.frame.to_ndarray(format='bgr24')
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def get(self, prop):
+        if self.container is None:
+            return 0.0
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            if self.frame is None or self.frame.time is None:
+                return 0.0
+            return self.frame.time * 1000.0
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.index + 1)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.stream.average_rate or 0)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.stream.frames or 0)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.stream.codec_context.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.stream.codec_context.height)
+        return 0.0
+
+    def set(self, prop, value):
+        """Solo se admite volver al principio (el bucle del reproductor)"""
+        if self.container is None or prop != cv2.CAP_PROP_POS_FRAMES or value != 0:
+            return False
+        self.container.seek(0)
+        self.frames = self.container.decode(self.stream)
+        self.frame = None
+        self.index = -1
+        return True
+
+    def release(self):
+        if self.container is not None:
+            self.container.close()
+            self.container = None
+
+
+class PyAVBackend:
+    """Decodificación con PyAV (opcional: pip install av)"""
+
+    name = 'pyav'
+
+    def available(self):
+        return av is not None
+
+    def open(self, path):
+        return PyAVCapture(path)
+
+
+BACKENDS = {}
+
+
+def register_backend(backend):
+    """Añadir un backend a los candidatos del sondeo"""
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+for _backend in (OpenCVBackend(), OpenCVFFmpegBackend(), PyAVBackend()):
+    register_backend(_backend)
+
+
+def available_backends():
+    return [backend for backend in BACKENDS.values() if backend.available()]
+
+
+def probe_backend(backend, path, frames=30):
+    """Latencia de apertura y FPS de decodificación de los primeros frames
+
+    read() incluye la conversión a BGR, como en el reproductor. Devuelve
+    None si el backend no puede con el archivo.
+    """
+    start = time.perf_counter()
+    capture = backend.open(path)
+    open_seconds = time.perf_counter() - start
+    if not capture.isOpened():
+        capture.release()
+        return None
+
+    decoded = 0
+    start = time.perf_counter()
+    while decoded < frames:
+        ret, _ = capture.read()
+        if not ret:
+            break
+        decoded += 1
+    decode_seconds = time.perf_counter() - start
+    capture.release()
+
+    if decoded == 0:
+        return None
+    return {
+        'backend': backend.name,
+        'open_ms': round(open_seconds * 1000, 2),
+        'fps': round(decoded / decode_seconds, 1) if decode_seconds > 0 else 0.0,
+        'frames': decoded,
+    }
+
+
+def probe(path, frames=30, backends=None):
+    """Sondear todos los backends disponibles, el más rápido primero"""
+    results = []
+    for backend in backends or available_backends():
+        result = probe_backend(backend, path, frames)
+        if result:
+            results.append(result)
+    return sorted(results, key=lambda r: r['fps'], reverse=True)
+
+
+def pick_winner(results, max_open_ms=500):
+    """Más FPS entre los que abren en menos de max_open_ms"""
+    fast_open = [r for r in results if r['open_ms'] <= max_open_ms]
+    candidates = fast_open or results
+    return candidates[0] if candidates else None
+
+
+class BackendSelector:
+    """Elige el backend de cada video y recuerda el ganador por códec y resolución
+
+    index es un LibraryIndex (o None para no recordar nada); con forced
+    se usa siempre ese backend sin sondear.
+    """
+
+    def __init__(self, index=None, probe_frames=30, max_open_ms=500, forced=None):
+        self.index = index
+        self.probe_frames = probe_frames
+        self.max_open_ms = max_open_ms
+        self.forced = forced if forced in BACKENDS else None
+
+    @classmethod
+    def from_config(cls, config):
+        choice = config.get('decode_backend', 'auto')
+        index = None
+        if choice == 'auto':
+            from wallpaperpuka.core.library import LibraryIndex
+            index = LibraryIndex(config.config_dir / 'library.db')
+        return cls(
+            index,
+            config.get('decode_probe_frames', 30),
+            config.get('decode_max_open_ms', 500),
+            None if choice == 'auto' else choice
+        )
+
+    def signature(self, path, capture):
+        """(códec, ancho, alto) del índice de la biblioteca o de la captura"""
+        record = self.index.get(str(path)) if self.index is not None else None
+        if record and record.get('codec') and record.get('width'):
+            return record['codec'], record['width'], record['height']
+        return (
+            codec_name(capture) or '?',
+            int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        )
+
+    def choose(self, path, capture):
+        """Nombre del backend para este video (sondea la primera vez)"""
+        if self.forced:
+            return self.forced
+        if self.index is None:
+            return DEFAULT_BACKEND
+
+        codec, width, height = self.signature(path, capture)
+        cached = self.index.decode_backend(codec, width, height)
+        if cached and cached['backend'] in BACKENDS and (
+            BACKENDS[cached['backend']].available()
+        ):
+            return cached['backend']
+
+        results = probe(path, self.probe_frames)
+        winner = pick_winner(results, self.max_open_ms)
+        if not winner:
+            return DEFAULT_BACKEND
+
+        self.index.set_decode_backend(codec, width, height, winner)
+        self.index.save()
+        summary = ', '.join(f"{r['backend']} {r['fps']:.0f} FPS" for r in results)
+        print(f"Backend para {codec} {width}x{height}: {winner['backend']} ({summary})")
+        return winner['backend']
+
+    def open(self, path):
+        """Abrir el video con el backend elegido: (captura, nombre)"""
+        capture = cv2.VideoCapture(str(path))
+        if not capture.isOpened() and not self.forced:
+            return capture, DEFAULT_BACKEND
+
+        name = self.choose(path, capture)
+        if name == DEFAULT_BACKEND:
+            return capture, name
+
+        capture.release()
+        chosen = BACKENDS[name].open(path)
+        if chosen.isOpened():
+            return chosen, name
+
+        # El backend elegido falla con este archivo: volver al de siempre
+        chosen.release()
+        return cv2.VideoCapture(str(path)), DEFAULT_BACKEND
@@ -2,203 +2,1043 @@
 """
 Reproductor de video que se coloca detrás del escritorio de Windows
 """
+import math
 import sys
+import time
+import weakref
 import cv2
 import numpy as np
 from PyQt5.QtWidgets import QWidget, QApplication
-from PyQt5.QtCore import QTimer, Qt, QRect
-from PyQt5.QtGui import QImage, QPainter, QPixmap
+from PyQt5.QtCore import QTimer, Qt, QRect, QPoint
+from PyQt5.QtGui import QImage, QPainter, QPixmap, QColor, QFont, QRegion
 import ctypes
 from ctypes import wintypes
+from wallpaperpuka.core.frame_pipeline import (
+    FrameRingBuffer, DecoderThread, FrameSink, CallbackSink, scale_into
+)
+from wallpaperpuka.core.frame_store import FrameStore
+from wallpaperpuka.core.frame_cache import shared_frame_cache
+from wallpaperpuka.core.gif_source import GifFrameStore, is_gif
+from wallpaperpuka.core.frame_stats import PipelineStats
+from wallpaperpuka.core.frame_diff import TileDiff
+from wallpaperpuka.core.frame_scheduler import (
+    FrameScheduler, TimestampTracker, RESYNC_THRESHOLD
+)
+from wallpaperpuka.core.quality_governor import QualityGovernor
+from wallpaperpuka.core.playback_policy import PlaybackPolicy
+from wallpaperpuka.core.video_proxy import ProxyTranscoder
+
+# Reproductores vivos (principal, otras pantallas, vistas previas): una sola
+# conexión a aboutToQuit los detiene sin mantener vivos los ya cerrados
+_live_players = weakref.WeakSet()
+_shutdown_app = None
+
+
+def register_player(player):
+    """Detener los hilos de player cuando la aplicación se cierre"""
+    global _shutdown_app
+    app = QApplication.instance()
+    if app is not _shutdown_app:
+        app.aboutToQuit.connect(shutdown_players)
+        _shutdown_app = app
+    _live_players.add(player)
+
+
+def shutdown_players():
+    """No dejar hilos de decodificación dentro de OpenCV al salir"""
+    for player in list(_live_players):
+        player.shutdown()
+
+
+def prepare_desktop_window(widget, geometry=None):
+    """Ventana sin marco, con fondo negro, detrás de los iconos del escritorio
+    
+    Devuelve True si quedó incrustada en el escritorio de Windows.
+    """
+    # Por defecto, la pantalla principal
+    geometry = geometry or QApplication.primaryScreen().geometry()
+    widget.setGeometry(geometry)
+    
+    # Sin marco ni barra de título
+    widget.setWindowFlags(
+        Qt.FramelessWindowHint |
+        Qt.WindowStaysOnBottomHint |
+        Qt.Tool
+    )
+    
+    # Fondo negro
+    widget.setStyleSheet("background-color: black;")
+    
+    # Hacer que la ventana esté detrás del escritorio
+    embedded = send_to_desktop_background(widget)
+    if embedded:
+        widget.setGeometry(desktop_geometry(geometry))
+    return embedded
+
+
+def desktop_geometry(geometry):
+    """Geometría relativa a WorkerW, que cubre todo el escritorio virtual
+    
+    Con monitores a la izquierda o encima del principal el origen del
+    escritorio virtual es negativo.
+    """
+    origin = QApplication.primaryScreen().virtualGeometry().topLeft()
+    return geometry.translated(-origin.x(), -origin.y())
+
+
+def send_to_desktop_background(widget):
+    """Enviar ventana detrás del escritorio usando WinAPI (True si lo consigue)"""
+    try:
+        # Obtener handle de la ventana
+        hwnd = int(widget.winId())
+        
+        # Encontrar el "Progman" (Program Manager)
+        progman = ctypes.windll.user32.FindWindowW("Progman", None)
+        
+        # Enviar mensaje para crear WorkerW
+        result = ctypes.c_int()
+        ctypes.windll.user32.SendMessageTimeoutW(
+            progman,
+            0x052C,  # WM_SPAWN_WORKER
+            0,
+            0,
+            0x0000,
+            1000,
+            ctypes.byref(result)
+        )
+        
+        # Encontrar WorkerW que está detrás del escritorio
+        workerw = None
+        
+        def enum_windows_callback(hwnd_enum, lparam):
+            nonlocal workerw
+            shelldll = ctypes.windll.user32.FindWindowExW(
+                hwnd_enum, 0, "SHELLDLL_DefView", None
+            )
+            if shelldll:
+                workerw = ctypes.windll.user32.FindWindowExW(
+                    0, hwnd_enum, "WorkerW", None
+                )
+            return True
+        
+        WNDENUMPROC = ctypes.WINFUNCTYPE(
+            wintypes.BOOL,
+            wintypes.HWND,
+            wintypes.LPARAM
+        )
+        
+        ctypes.windll.user32.EnumWindows(
+            WNDENUMPROC(enum_windows_callback),
+            0
+        )
+        
+        # Establecer nuestra ventana como hijo de WorkerW
+        if workerw:
+            ctypes.windll.user32.SetParent(hwnd, workerw)
+        else:
+            ctypes.windll.user32.SetParent(hwnd, progman)
+        return True
+            
+    except Exception as e:
+        print(f"Error al colocar ventana en escritorio: {e}")
+        return False
 
 
 class DesktopVideoPlayer(QWidget):
     """Ventana que reproduce video detrás del escritorio"""
     
-    def __init__(self):
+    def __init__(self, geometry=None):
         super().__init__()
+        self.target_geometry = geometry  # None: pantalla principal
+        self.embedded = False
         self.video_capture = None
         self.current_frame = None
         self.is_playing = False
         self.video_path = None
+        self.open_path = None  # Archivo abierto realmente (original o proxy)
         
         # Timer para actualizar frames
         self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self.update_frame)
         self.fps = 24  # Reducir FPS para menor consumo
+        self.max_fps = 30
+        self.source_fps = 24
+        self.video_fps = 24  # FPS del video limitados a max_fps
         
-        # Cache de frames para optimización
-        self.frame_skip = 1  # Saltar frames si es necesario
+        # Reloj monotónico + timestamps del contenedor (sin deriva)
+        self.scheduler = FrameScheduler(self.fps)
+        self.timestamps = TimestampTracker(self.source_fps)
+        self.presented_time = None
         
-        self.init_window()
+        # Calidad de render (la ajusta el gobernador bajo carga)
+        self.render_scale = 1.0
+        self.interpolation = cv2.INTER_LINEAR
+        self.fps_limit = None
+        self.governor = None
+        self.governor_timer = QTimer()
+        self.governor_timer.timeout.connect(self.sample_governor)
+        self.governor_interval = 2.0
         
-    def init_window(self):
-        """Inicializar ventana detrás del escritorio"""
-        # Obtener tamaño de la pantalla
-        screen = QApplication.primaryScreen().geometry()
-        self.setGeometry(screen)
+        # Pausa automática cuando el fondo no se ve (ventanas, bloqueo...)
+        self.policy = None
+        self.policy_interval = 1.0
+        self.policy_timer = QTimer()
+        self.policy_timer.timeout.connect(self.check_policy)
+        self.suspended = False
         
-        # Sin marco ni barra de título
-        self.setWindowFlags(
-            Qt.FramelessWindowHint |
-            Qt.WindowStaysOnBottomHint |
-            Qt.Tool
-        )
+        # Decodificación en segundo plano con buffer circular
+        self.use_decoder_thread = True
+        self.buffer_depth = 4
+        self.ring_buffer = None
+        self.decoder = None
+        
+        # Otros destinos del mismo video (vista previa, miniaturas): cada
+        # frame se decodifica una vez y se escala a la resolución de cada uno
+        self.sinks = []
+        
+        # Superficies en otras pantallas que muestran estos mismos frames
+        self.mirrors = []
+        
+        # Repintar solo las teselas que cambian (se configura con apply_config)
+        self.frame_diff = TileDiff()
+        
+        # Fundido desde el último frame del fondo anterior (switch_to)
+        self.current_rgb = None  # Array detrás de current_frame
+        self.fade_from = None
+        self.fade_start = 0.0
+        self.fade_duration = 0.0
+        self.fade_buffer = None
+        
+        # Buffer reutilizado por cv_to_qimage
+        self.convert_buffer = None
+        
+        # Caché de bucle: clips cortos se decodifican una sola vez
+        self.loop_cache_enabled = False
+        self.loop_cache_budget = 512 * 1024 * 1024
+        self.loop_cache_mmap = False
+        self.frame_store = None
         
-        # Fondo negro
-        self.setStyleSheet("background-color: black;")
+        # Caché persistente de frames en disco (se activa con apply_config)
+        self.frame_cache = None
         
-        # Hacer que la ventana esté detrás del escritorio
-        self.send_to_desktop_background()
+        # Proxies a resolución de pantalla (se activan con apply_config)
+        self.proxies = None
         
+        # Backend de decodificación por video (BackendSelector; None: OpenCV)
+        self.backends = None
+        self.backend_name = None
+        
+        # Instrumentación por etapa (desactivada por defecto)
+        self.stats = PipelineStats()
+        self.show_osd = False
+        self.stats_timer = QTimer()
+        self.stats_timer.timeout.connect(self.log_stats)
+        
+        # No dejar el hilo de decodificación dentro de OpenCV al salir
+        register_player(self)
+        
+        self.init_window()
+        
+    def init_window(self):
+        """Inicializar ventana detrás del escritorio"""
+        self.embedded = prepare_desktop_window(self, self.target_geometry)
+        
+    def move_to(self, geometry):
+        """Cubrir otra zona del escritorio (una pantalla o todas)"""
+        self.target_geometry = geometry
+        self.setGeometry(desktop_geometry(geometry) if self.embedded else geometry)
+    
     def send_to_desktop_background(self):
         """Enviar ventana detrás del escritorio usando WinAPI"""
-        try:
-            # Obtener handle de la ventana
-            hwnd = int(self.winId())
-            
-            # Encontrar el "Progman" (Program Manager)
-            progman = ctypes.windll.user32.FindWindowW("Progman", None)
-            
-            # Enviar mensaje para crear WorkerW
-            result = ctypes.c_int()
-            ctypes.windll.user32.SendMessageTimeoutW(
-                progman,
-                0x052C,  # WM_SPAWN_WORKER
-                0,
-                0,
-                0x0000,
-                1000,
-                ctypes.byref(result)
+        send_to_desktop_background(self)
+    
+    def apply_config(self, config):
+        """Aplicar opciones de rendimiento guardadas en Config"""
+        self.loop_cache_enabled = config.get('loop_cache', False)
+        self.loop_cache_budget = int(
+            config.get('loop_cache_budget_mb', 512) * 1024 * 1024
+        )
+        self.loop_cache_mmap = config.get('loop_cache_mmap', False)
+        
+        if config.get('frame_cache', True):
+            self.frame_cache = shared_frame_cache(
+                config.config_dir / 'frame_cache',
+                int(config.get('frame_cache_max_mb', 2048) * 1024 * 1024)
             )
-            
-            # Encontrar WorkerW que está detrás del escritorio
-            workerw = None
-            
-            def enum_windows_callback(hwnd_enum, lparam):
-                nonlocal workerw
-                shelldll = ctypes.windll.user32.FindWindowExW(
-                    hwnd_enum, 0, "SHELLDLL_DefView", None
-                )
-                if shelldll:
-                    workerw = ctypes.windll.user32.FindWindowExW(
-                        0, hwnd_enum, "WorkerW", None
-                    )
-                return True
-            
-            WNDENUMPROC = ctypes.WINFUNCTYPE(
-                wintypes.BOOL,
-                wintypes.HWND,
-                wintypes.LPARAM
+        else:
+            self.frame_cache = None
+        
+        if config.get('proxy_enabled', False) and not self.proxies:
+            self.proxies = ProxyTranscoder(
+                config.config_dir / 'proxies',
+                int(config.get('proxy_max_mb', 4096) * 1024 * 1024)
             )
-            
-            ctypes.windll.user32.EnumWindows(
-                WNDENUMPROC(enum_windows_callback),
-                0
+        elif not config.get('proxy_enabled', False) and self.proxies:
+            # Cortar las generaciones en curso del transcodificador que se descarta
+            self.proxies.cancel()
+            self.proxies = None
+        
+        if config.get('governor_enabled', False):
+            self.governor = QualityGovernor.from_config(config, self.max_fps)
+            self.governor_interval = config.get('governor_interval', 2.0)
+        else:
+            self.governor = None
+        
+        if config.get('auto_pause', True):
+            self.policy = PlaybackPolicy.from_config(config, self.screen_rect)
+            self.policy_interval = config.get('auto_pause_interval', 1.0)
+        else:
+            self.policy = None
+        
+        if config.get('dirty_repaint', True):
+            self.frame_diff = TileDiff(
+                config.get('dirty_tile', 64),
+                config.get('dirty_threshold', 0)
             )
-            
-            # Establecer nuestra ventana como hijo de WorkerW
-            if workerw:
-                ctypes.windll.user32.SetParent(hwnd, workerw)
-            else:
-                ctypes.windll.user32.SetParent(hwnd, progman)
-                
-        except Exception as e:
-            print(f"Error al colocar ventana en escritorio: {e}")
+        else:
+            self.frame_diff = None
+        
+        self.enable_stats(
+            config.get('stats_enabled', False),
+            log_interval=config.get('stats_log_interval', 0),
+            osd=config.get('stats_osd', False)
+        )
     
-    def load_video(self, video_path):
-        """Cargar video"""
+    def load_video(self, video_path, source=None):
+        """Cargar video
+        
+        source es el resultado de open_source(); si se pasa, la apertura
+        (lenta con archivos grandes) ya se hizo fuera del hilo de la GUI.
+        """
+        if source is None:
+            source = self.open_source(video_path, (self.width(), self.height()))
+        if source is None:
+            return False
+        
         self.video_path = video_path
         
+        self.stop_decoder()
+        self.release_frame_store()
         if self.video_capture:
             self.video_capture.release()
         
-        self.video_capture = cv2.VideoCapture(video_path)
+        # Los frames en cola llevan tiempos del video anterior: con el reloj
+        # de vuelta a 0 los destinos esperarían a que el nuevo los alcanzara
+        for sink in self.sinks:
+            sink.reset()
+        
+        self.video_capture = source['capture']
+        self.open_path = source['open_path']
+        self.frame_store = source.get('frames')
+        self.backend_name = source.get('backend')
+        
+        # FPS del video limitados (máximo 30 FPS)
+        if source['fps'] > 0:
+            self.source_fps = source['fps']
+            self.video_fps = source['video_fps']
+        self.update_rate()
+        
+        # Cada video empieza con calidad máxima
+        if self.governor:
+            self.governor.reset()
+            self.apply_quality(self.governor.current)
+        
+        self.scheduler.stop()
+        self.timestamps = TimestampTracker(self.source_fps)
+        self.presented_time = None
+        if self.frame_diff:
+            self.frame_diff.reset()
+        
+        backend = f", {self.backend_name}" if self.backend_name else ""
+        print(f"Video cargado: {video_path} ({self.fps} FPS{backend})")
+        
+        # Frames ya escalados de una ejecución anterior: no hay que decodificar
+        if not self.frame_store and self.frame_cache and source['cache_key']:
+            self.frame_store = self.frame_cache.open(source['cache_key'])
+            if self.frame_store:
+                print(f"Frames cargados desde caché ({self.frame_store.count})")
+        
+        return True
+    
+    def open_source(self, video_path, target_size):
+        """Abrir el video, elegir proxy y calcular la clave de caché
+        
+        No toca el estado del reproductor, así que puede ejecutarse en un
+        hilo de trabajo; load_video() aplica el resultado.
+        """
+        if is_gif(video_path):
+            source = self.open_gif(video_path, target_size)
+            if source:
+                return source
         
-        if not self.video_capture.isOpened():
+        backend = 'opencv'
+        if self.backends:
+            capture, backend = self.backends.open(video_path)
+        else:
+            capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
             print(f"Error al abrir video: {video_path}")
-            return False
+            return None
         
-        # Obtener FPS del video y limitarlo
-        fps = self.video_capture.get(cv2.CAP_PROP_FPS)
-        if fps > 0:
-            self.fps = min(int(fps), 30)  # Máximo 30 FPS
+        open_path = video_path
+        if self.proxies:
+            proxy_capture, proxy = self.open_proxy(capture, video_path, target_size)
+            if proxy_capture:
+                capture.release()
+                capture, open_path, backend = proxy_capture, proxy, 'opencv'
         
         # Configurar para menor calidad pero mejor rendimiento
-        self.video_capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        video_fps = min(int(round(fps)), self.max_fps) if fps > 0 else self.video_fps
+        
+        cache_key = None
+        if self.frame_cache:
+            cache_key = self.frame_cache.make_key(open_path, *target_size, video_fps)
+        
+        return {
+            'capture': capture,
+            'open_path': open_path,
+            'fps': fps,
+            'video_fps': video_fps,
+            'cache_key': cache_key,
+            'backend': backend,
+        }
+    
+    def open_gif(self, video_path, target_size):
+        """Componer el GIF entero de una vez (None: reproducirlo con OpenCV)"""
+        store = GifFrameStore.load(video_path, target_size, self.loop_cache_budget)
+        if not store:
+            return None
+        
+        return {
+            'capture': None,
+            'open_path': video_path,
+            'fps': store.fps,
+            'video_fps': min(max(1, int(round(1.0 / min(store.delays)))), self.max_fps),
+            'cache_key': None,
+            'frames': store,
+        }
+    
+    def prefetch(self, video_path, source):
+        """Preparar el siguiente fondo mientras se reproduce el actual
+        
+        source es el resultado de open_source(). Si hay que decodificar,
+        el hilo de decodificación arranca ya y llena su buffer, así que
+        switch_to() tiene frames listos desde el primer tick.
+        """
+        prefetched = {
+            'video_path': video_path,
+            'source': dict(source),
+            'decoder': None,
+            'ring': None,
+            'timestamps': TimestampTracker(source['fps'] if source['fps'] > 0 else self.source_fps),
+        }
+        
+        # GIF compuesto o frames ya en la caché de disco: nada que decodificar
+        if not source.get('frames') and self.frame_cache and source['cache_key']:
+            prefetched['source']['frames'] = self.frame_cache.open(source['cache_key'])
+        if prefetched['source'].get('frames') or not self.use_decoder_thread:
+            return prefetched
+        
+        ring = FrameRingBuffer(self.buffer_depth, *self.render_size())
+        prefetched['ring'] = ring
+        prefetched['decoder'] = DecoderThread(
+            source['capture'],
+            ring,
+            interpolation=self.interpolation,
+            recorder=self.create_loop_store(source),
+            stats=self.stats,
+            timestamps=prefetched['timestamps'],
+            sinks=[]  # Los destinos actuales pasan al nuevo video en switch_to()
+        )
+        prefetched['decoder'].start()
+        return prefetched
+    
+    def switch_to(self, prefetched, crossfade_ms=0):
+        """Cambiar al fondo preparado con prefetch() sin hueco en negro"""
+        fade_from = None
+        if crossfade_ms > 0 and self.current_frame is not None and self.current_rgb is not None:
+            fade_from = self.current_rgb.copy()
+        
+        was_playing = self.is_playing
+        decoder = prefetched['decoder']
+        if not self.load_video(prefetched['video_path'], prefetched['source']):
+            self.cancel_prefetch(prefetched)
+            return False
+        
+        if decoder:
+            self.timestamps = prefetched['timestamps']
+            self.ring_buffer = prefetched['ring']
+            self.decoder = decoder
+            decoder.sinks = self.sinks
         
-        print(f"Video cargado: {video_path} ({self.fps} FPS)")
+        self.fade_from = fade_from
+        self.fade_start = time.perf_counter()
+        self.fade_duration = crossfade_ms / 1000.0
+        
+        # Suspendido (fondo tapado): el nuevo video espera a que se reanude
+        if was_playing:
+            self.is_playing = False
+            self.play()
         return True
     
+    def cancel_prefetch(self, prefetched):
+        """Descartar un fondo preparado que no se va a mostrar"""
+        if prefetched['decoder']:
+            prefetched['decoder'].stop()
+            prefetched['decoder'].discard_recorder()
+        if prefetched['source']['capture']:
+            prefetched['source']['capture'].release()
+        store = prefetched['source'].get('frames')
+        if store:
+            store.release()
+    
+    def fade_frame(self, rgb_frame):
+        """Mezclar el frame con el último del fondo anterior durante el fundido"""
+        progress = (time.perf_counter() - self.fade_start) / self.fade_duration
+        if progress >= 1.0:
+            self.fade_from = None
+            self.fade_buffer = None
+            return rgb_frame
+        
+        height, width = rgb_frame.shape[:2]
+        if self.fade_from.shape[:2] != (height, width):
+            self.fade_from = cv2.resize(self.fade_from, (width, height))
+        if self.fade_buffer is None or self.fade_buffer.shape != rgb_frame.shape:
+            self.fade_buffer = np.empty_like(rgb_frame)
+        cv2.addWeighted(
+            rgb_frame, progress, self.fade_from, 1.0 - progress, 0.0,
+            dst=self.fade_buffer
+        )
+        return self.fade_buffer
+    
+    def open_proxy(self, capture, video_path, target):
+        """Proxy a resolución de pantalla si la fuente es mayor: (captura, ruta)"""
+        source_size = (
+            int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        )
+        if not ProxyTranscoder.needs_proxy(
+            source_size, target, capture.get(cv2.CAP_PROP_FPS), self.max_fps
+        ):
+            return None, None
+        
+        proxy = self.proxies.lookup(video_path, *target, self.max_fps)
+        if not proxy:
+            # Mientras tanto se reproduce el original
+            self.proxies.schedule(video_path, *target, self.max_fps)
+            print("Generando proxy a resolución de pantalla en segundo plano")
+            return None, None
+        
+        proxy_capture = cv2.VideoCapture(proxy)
+        if not proxy_capture.isOpened():
+            return None, None
+        
+        print(f"Usando proxy: {proxy}")
+        return proxy_capture, proxy
+    
     def play(self):
         """Iniciar reproducción"""
-        if self.video_capture and not self.is_playing:
+        if (self.video_capture or self.frame_store) and not self.is_playing:
             self.is_playing = True
-            self.timer.start(1000 // self.fps)
+            self.suspended = False
+            if (self.use_decoder_thread and not self.decoder
+                    and not self.frame_store):
+                self.start_decoder()
+            self.scheduler.resume()
+            self.timer.start(0)
+            if self.governor:
+                self.governor_timer.start(int(self.governor_interval * 1000))
+            if self.policy and not self.policy_timer.isActive():
+                self.policy_timer.start(int(self.policy_interval * 1000))
             self.show()
             print("Reproducción iniciada")
     
     def pause(self):
         """Pausar reproducción"""
+        self.suspended = False
         if self.is_playing:
             self.is_playing = False
             self.timer.stop()
+            self.governor_timer.stop()
+            self.scheduler.pause()
             print("Reproducción pausada")
     
     def stop(self):
         """Detener reproducción"""
         self.is_playing = False
+        self.suspended = False
         self.timer.stop()
+        self.governor_timer.stop()
+        self.policy_timer.stop()
         self.hide()
         
+        self.stop_decoder()
+        self.scheduler.stop()
+        self.timestamps = TimestampTracker(self.source_fps)
+        self.presented_time = None
+        if self.frame_store:
+            self.frame_store.rewind()
         if self.video_capture:
             self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
         
         print("Reproducción detenida")
     
+    def screen_rect(self):
+        """Rectángulo de la pantalla que cubre el fondo"""
+        geometry = self.target_geometry or QApplication.primaryScreen().geometry()
+        return (
+            geometry.left(),
+            geometry.top(),
+            geometry.right() + 1,
+            geometry.bottom() + 1
+        )
+    
+    def check_policy(self):
+        """Suspender o reanudar según las sondas de visibilidad y energía"""
+        if not self.policy:
+            return
+        
+        if self.policy.evaluate():
+            if self.is_playing:
+                self.pause()
+                self.suspended = True
+                print(f"Reproducción suspendida ({', '.join(self.policy.reasons)})")
+        elif self.suspended:
+            self.play()
+    
+    def start_decoder(self):
+        """Iniciar hilo de decodificación con buffer circular"""
+        self.stop_decoder()
+        
+        width, height = self.render_size()
+        self.ring_buffer = FrameRingBuffer(self.buffer_depth, width, height)
+        self.decoder = DecoderThread(
+            self.video_capture,
+            self.ring_buffer,
+            interpolation=self.interpolation,
+            recorder=self.create_loop_store(),
+            stats=self.stats,
+            timestamps=self.timestamps,
+            sinks=self.sinks
+        )
+        self.decoder.start()
+    
+    def stop_decoder(self):
+        """Detener hilo de decodificación"""
+        if self.decoder:
+            self.decoder.stop()
+            self.decoder.discard_recorder()
+            self.decoder = None
+        
+        # El frame actual apunta a memoria del buffer
+        if self.ring_buffer:
+            self.drop_current_frame()
+            self.ring_buffer = None
+    
+    def drop_current_frame(self):
+        """Soltar el QImage mostrado antes de liberar la memoria a la que apunta
+        
+        Las superficies que pintan ese mismo QImage en otras pantallas
+        también lo sueltan: hasta su próximo frame no repintan nada.
+        """
+        self.current_frame = None
+        for mirror in self.mirrors:
+            mirror.drop_frame()
+    
+    def add_sink(self, width, height, callback=None, depth=3):
+        """Recibir los frames de este reproductor a otra resolución"""
+        if callback:
+            sink = CallbackSink(width, height, callback)
+        else:
+            sink = FrameSink(width, height, depth)
+        # La lista es la misma que recorre el decodificador
+        self.sinks.append(sink)
+        return sink
+    
+    def remove_sink(self, sink):
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+        sink.close()
+    
+    def feed_sinks(self, frame, frame_time, rgb=False):
+        """Repartir un frame decodificado en el hilo de la GUI"""
+        for sink in self.sinks:
+            sink.offer(frame, frame_time, rgb)
+    
+    def create_loop_store(self, source=None):
+        """Reservar caché de bucle si el clip cabe en el presupuesto
+        
+        source: resultado de open_source() de un video que aún no se ha
+        cargado (precarga); por defecto, el video actual.
+        """
+        if not self.loop_cache_enabled and not self.frame_cache:
+            return None
+        
+        # Solo se guardan frames a resolución completa
+        if self.render_scale != 1.0:
+            return None
+        
+        capture, open_path = self.video_capture, self.open_path
+        source_fps, video_fps = self.source_fps, self.video_fps
+        if source:
+            capture, open_path = source['capture'], source['open_path']
+            if source['fps'] > 0:
+                source_fps, video_fps = source['fps'], source['video_fps']
+        
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        if frame_count <= 0:
+            return None
+        
+        # Margen por si el contenedor subestima el número de frames
+        capacity = frame_count + max(1, frame_count // 50)
+        
+        # Preferir la caché en disco: la grabación sobrevive a reinicios
+        if self.frame_cache:
+            key = self.frame_cache.make_key(
+                open_path, self.width(), self.height(), video_fps
+            )
+            store = self.frame_cache.create(
+                key, capacity, self.width(), self.height(), source_fps
+            )
+            if store or not self.loop_cache_enabled:
+                return store
+        
+        needed = FrameStore.estimate_bytes(capacity, self.width(), self.height())
+        if needed > self.loop_cache_budget:
+            print(
+                f"Clip demasiado grande para caché de bucle "
+                f"({needed // (1024 * 1024)} MB), usando streaming"
+            )
+            return None
+        
+        return FrameStore.allocate(
+            capacity,
+            self.width(),
+            self.height(),
+            source_fps,
+            use_mmap=self.loop_cache_mmap
+        )
+    
+    def release_frame_store(self):
+        """Liberar la caché de bucle"""
+        if self.frame_store:
+            self.drop_current_frame()
+            self.frame_store.release()
+            self.frame_store = None
+    
+    def render_size(self):
+        """Resolución a la que se escalan los frames antes de pintarlos"""
+        return (
+            max(1, int(self.width() * self.render_scale)),
+            max(1, int(self.height() * self.render_scale))
+        )
+    
+    def update_rate(self):
+        """Recalcular los FPS efectivos (video, máximo y gobernador)"""
+        fps = self.video_fps
+        if self.fps_limit:
+            fps = min(fps, self.fps_limit)
+        self.fps = max(1, fps)
+        self.scheduler.set_rate(self.fps)
+    
+    def apply_quality(self, level):
+        """Aplicar un nivel de calidad (escala, FPS e interpolación)"""
+        resized = level['scale'] != self.render_scale
+        self.render_scale = level['scale']
+        self.interpolation = level['interpolation']
+        self.fps_limit = level['fps']
+        self.update_rate()
+        
+        if self.decoder:
+            self.decoder.interpolation = self.interpolation
+            if resized:
+                self.start_decoder()
+        
+        print(
+            f"Calidad ajustada: escala {self.render_scale:.2f}, "
+            f"{self.fps} FPS"
+        )
+    
+    def sample_governor(self):
+        """Muestrear carga y coste por frame y ajustar la calidad"""
+        # Con la caché de bucle no hay decodificación que aligerar
+        if not self.governor or self.frame_store:
+            return
+        
+        underruns = self.ring_buffer.underruns if self.ring_buffer else 0
+        level = self.governor.sample(self.scheduler.ticks, underruns)
+        if level is not None:
+            self.apply_quality(self.governor.current)
+    
+    def get_buffer_stats(self):
+        """Estadísticas del buffer de frames (profundidad, llenado, underruns)"""
+        if not self.ring_buffer:
+            return {
+                'depth': self.buffer_depth,
+                'fill': 0,
+                'underruns': 0,
+                'frames_written': 0,
+                'frames_read': 0,
+            }
+        return self.ring_buffer.stats()
+    
+    def enable_stats(self, enabled=True, log_interval=0, osd=False):
+        """Activar medición por etapa, log periódico (segundos) y OSD"""
+        self.stats.enabled = enabled
+        self.show_osd = enabled and osd
+        
+        self.stats_timer.stop()
+        if enabled and log_interval > 0:
+            self.stats_timer.start(int(log_interval * 1000))
+        self.update()
+    
+    def get_stats(self):
+        """Tiempos por etapa, FPS reales, frames descartados y buffer"""
+        stats = self.stats.snapshot()
+        stats['buffer'] = self.get_buffer_stats()
+        stats['mode'] = (
+            'cache' if self.frame_store else
+            'thread' if self.decoder else 'sync'
+        )
+        stats['scheduler'] = self.scheduler.stats()
+        stats['suspended'] = self.suspended
+        if self.governor:
+            stats['governor'] = self.governor.stats()
+        return stats
+    
+    def log_stats(self):
+        """Línea periódica con el estado del pipeline"""
+        print(f"[stats] {self.stats.format_line()}")
+    
     def update_frame(self):
         """Actualizar frame del video"""
+        start = self.stats.begin()
+        try:
+            self.advance_frame()
+        except Exception as e:
+            # Una excepción en un slot de Qt cierra la aplicación
+            print(f"Error al mostrar frame: {e}")
+        finally:
+            self.stats.end('update', start)
+            # Siguiente tick calculado desde el reloj, no desde este
+            if self.is_playing:
+                self.timer.start(self.scheduler.next_delay_ms())
+    
+    def advance_frame(self):
+        """Pasar al siguiente frame según el modo de reproducción"""
+        if self.frame_store:
+            self.show_stored_frame()
+            return
+        
         if not self.video_capture:
             return
         
-        ret, frame = self.video_capture.read()
+        if self.decoder:
+            self.show_buffered_frame()
+            return
         
-        if not ret:
+        self.show_decoded_frame()
+    
+    def frame_interval(self):
+        """Duración de un frame del video en segundos"""
+        return 1.0 / self.source_fps if self.source_fps > 0 else 1.0 / 30
+    
+    def is_early(self, frame_time):
+        """El frame todavía no toca (salvo saltos de tiempo grandes)"""
+        ahead = frame_time - self.scheduler.media_time()
+        return 0 < ahead < RESYNC_THRESHOLD
+    
+    def grab_next(self):
+        """Capturar el siguiente frame sin decodificar la imagen (loop)"""
+        if not self.video_capture.grab():
             # Reiniciar video (loop)
             self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            ret, frame = self.video_capture.read()
-            
-            if not ret:
-                return
+            self.timestamps.wrap()
+            if not self.video_capture.grab():
+                return None
+        return self.timestamps.stamp(self.video_capture)
+    
+    def show_decoded_frame(self):
+        """Decodificar en el hilo de la GUI (sin hilo de decodificación)"""
+        if self.is_early(self.timestamps.next_time()):
+            return
+        
+        start = self.stats.begin()
+        frame_time = self.grab_next()
+        if frame_time is None:
+            return
+        
+        # Atrasados: saltar con grab() sin retrieve()
+        skipped = 0
+        interval = self.frame_interval()
+        while self.scheduler.is_stale(frame_time, interval):
+            next_time = self.grab_next()
+            if next_time is None:
+                break
+            frame_time = next_time
+            skipped += 1
+        self.count_skipped(skipped)
+        
+        ret, frame = self.video_capture.retrieve()
+        if not ret:
+            return
+        self.stats.end('decode', start)
+        self.feed_sinks(frame, frame_time)
         
         # Convertir frame a QImage
+        start = self.stats.begin()
         self.current_frame = self.cv_to_qimage(frame)
-        self.update()
+        self.stats.end('scale', start)
+        if self.fade_from is not None:
+            self.show_rgb_frame(self.convert_buffer, frame_time)
+            return
+        self.current_rgb = self.convert_buffer
+        changed = self.repaint_changed(self.convert_buffer)
+        self.frame_presented(frame_time, changed)
     
-    def cv_to_qimage(self, cv_frame):
-        """Convertir frame de OpenCV a QImage"""
-        # Obtener tamaño de pantalla
-        height, width = self.height(), self.width()
+    def show_buffered_frame(self):
+        """Mostrar el siguiente frame listo del buffer circular"""
+        if self.ring_buffer.fill_level() == 0:
+            store = self.decoder.take_recorder()
+            if store:
+                # Primera vuelta grabada: reproducir desde memoria
+                self.stop_decoder()
+                if self.frame_cache and store.cache_key:
+                    self.frame_cache.commit(store)
+                self.frame_store = store
+                print(f"Caché de bucle lista ({store.count} frames)")
+                self.show_stored_frame()
+                return
         
-        # Redimensionar con interpolación rápida
-        frame_resized = cv2.resize(
-            cv_frame, 
-            (width, height),
-            interpolation=cv2.INTER_LINEAR  # Más rápido que INTER_CUBIC
+        next_time = self.ring_buffer.next_time()
+        if next_time is not None and self.is_early(next_time):
+            return
+        
+        rgb_frame, frame_time, skipped = self.ring_buffer.acquire_due(
+            self.scheduler.media_time()
+        )
+        if rgb_frame is None:
+            # Underrun: se mantiene el frame anterior
+            self.stats.count('dropped')
+            return
+        
+        # Si vamos atrasados el decodificador salta frames con grab()
+        self.decoder.skip_before = (
+            self.scheduler.media_time() - self.frame_interval()
         )
+        self.count_skipped(skipped)
+        self.show_rgb_frame(rgb_frame, frame_time)
+    
+    def show_stored_frame(self):
+        """Mostrar el frame de la caché de bucle que marca el reloj"""
+        store = self.frame_store
+        previous = self.presented_time
+        rgb_frame, frame_time = store.frame_at(self.scheduler.media_time())
+        if frame_time == previous:
+            return
         
-        # Convertir BGR a RGB
-        rgb_frame = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
+        if previous is not None:
+            self.count_skipped(
+                max(0, int(round((frame_time - previous) * store.fps)) - 1)
+            )
+        self.feed_sinks(rgb_frame, frame_time, rgb=True)
+        self.show_rgb_frame(rgb_frame, frame_time)
+    
+    def count_skipped(self, skipped):
+        """Contabilizar frames saltados para no acumular retraso"""
+        if skipped:
+            self.scheduler.skipped += skipped
+            self.stats.count('skipped', skipped)
+    
+    def frame_presented(self, frame_time, changed=True):
+        """Registrar el frame mostrado en el reloj y en las estadísticas"""
+        self.presented_time = frame_time
+        self.scheduler.presented(frame_time)
+        self.stats.frame_presented()
+        for mirror in self.mirrors:
+            mirror.present(frame_time, changed)
+    
+    def repaint_changed(self, rgb_frame):
+        """Pedir el repintado de las teselas que cambiaron (False si ninguna)"""
+        if not self.frame_diff or self.show_osd:
+            self.update()
+            return True
+        
+        start = self.stats.begin()
+        rects = self.frame_diff.changed(rgb_frame)
+        self.stats.end('diff', start)
+        if not rects:
+            # Frame igual al anterior (cinemagraph, pausa de un GIF...)
+            self.stats.count('repaint_skipped')
+            return False
         
+        height, width = rgb_frame.shape[:2]
+        if rects[0][2:] == (width, height):
+            self.stats.count('repaint_full')
+            self.update()
+            return True
+        
+        # Render a menor resolución: llevar las teselas a la ventana
+        scale_x = self.width() / width
+        scale_y = self.height() / height
+        margin = 0 if (scale_x, scale_y) == (1.0, 1.0) else 1
+        region = QRegion()
+        for x, y, w, h in rects:
+            left = max(0, math.floor(x * scale_x) - margin)
+            top = max(0, math.floor(y * scale_y) - margin)
+            right = math.ceil((x + w) * scale_x) + margin
+            bottom = math.ceil((y + h) * scale_y) + margin
+            region += QRect(left, top, right - left, bottom - top)
+        self.stats.count('repaint_partial')
+        self.update(region)
+        return True
+    
+    def show_rgb_frame(self, rgb_frame, frame_time):
+        """Mostrar un frame RGB ya escalado sin copiarlo"""
+        if self.fade_from is not None:
+            rgb_frame = self.fade_frame(rgb_frame)
+        self.current_rgb = rgb_frame
         h, w, ch = rgb_frame.shape
-        bytes_per_line = ch * w
         
-        # Copiar datos para evitar problemas de memoria
-        q_image = QImage(
-            rgb_frame.copy(),
+        # El array debe seguir vivo mientras se use el QImage
+        self.current_frame = QImage(
+            rgb_frame,
             w,
             h,
-            bytes_per_line,
+            ch * w,
+            QImage.Format_RGB888
+        )
+        changed = self.repaint_changed(rgb_frame)
+        self.frame_presented(frame_time, changed)
+    
+    def cv_to_qimage(self, cv_frame):
+        """Convertir frame de OpenCV a QImage sin reservar memoria por frame
+        
+        El QImage apunta a un buffer interno que se reutiliza, por lo que
+        solo es válido hasta la siguiente llamada.
+        """
+        # Obtener tamaño de render (pantalla por la escala de calidad)
+        width, height = self.render_size()
+        
+        # Buffer destino reservado una vez por resolución
+        if (self.convert_buffer is None or
+                self.convert_buffer.shape[:2] != (height, width)):
+            self.convert_buffer = np.empty((height, width, 3), dtype=np.uint8)
+        
+        # Redimensionar y convertir BGR a RGB dentro del mismo buffer
+        rgb_frame = scale_into(cv_frame, self.convert_buffer, self.interpolation)
+        
+        # Sin copia: convert_buffer mantiene viva la memoria del QImage
+        q_image = QImage(
+            rgb_frame,
+            width,
+            height,
+            3 * width,
             QImage.Format_RGB888
         )
         
@@ -206,13 +1046,65 @@ class DesktopVideoPlayer(QWidget):
     
     def paintEvent(self, event):
         """Dibujar frame en la ventana"""
-        if self.current_frame:
+        start = self.stats.begin()
+        if self.current_frame or self.show_osd:
             painter = QPainter(self)
-            painter.drawImage(0, 0, self.current_frame)
+            if self.current_frame:
+                if self.current_frame.size() == self.size():
+                    # Solo las teselas pedidas en repaint_changed()
+                    for rect in event.region().rects():
+                        painter.drawImage(rect.topLeft(), self.current_frame, rect)
+                else:
+                    # Render a menor resolución: escalar al pintar
+                    painter.drawImage(self.rect(), self.current_frame)
+            if self.show_osd:
+                self.draw_osd(painter)
+        self.stats.end('paint', start)
+    
+    def draw_osd(self, painter):
+        """Dibujar FPS, descartes y latencias sobre el fondo"""
+        text = self.stats.format_line()
+        painter.setFont(QFont("Consolas", 10))
+        metrics = painter.fontMetrics()
+        rect = metrics.boundingRect(text).adjusted(-8, -4, 8, 4)
+        rect.moveTopLeft(QPoint(16, 16))
+        painter.fillRect(rect, QColor(0, 0, 0, 160))
+        painter.setPen(QColor(255, 255, 255))
+        painter.drawText(rect, Qt.AlignCenter, text)
+    
+    def resizeEvent(self, event):
+        """Reconstruir el buffer si cambia el tamaño de la ventana"""
+        super().resizeEvent(event)
+        store = self.frame_store
+        if store and not store.native_size and (
+            store.width != self.width() or store.height != self.height()
+        ):
+            # Caché a otra resolución: volver a streaming y regrabar
+            self.release_frame_store()
+            self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self.timestamps = TimestampTracker(self.source_fps)
+            self.timestamps.loop_offset = self.scheduler.media_time()
+            if self.is_playing:
+                self.start_decoder()
+            return
+        
+        ring = self.ring_buffer
+        if self.decoder and ring and (
+            (ring.width, ring.height) != self.render_size()
+        ):
+            self.start_decoder()
+    
+    def shutdown(self):
+        """La aplicación se cierra: parar los hilos en segundo plano"""
+        self.stop_decoder()
+        if self.proxies:
+            self.proxies.cancel()
     
     def closeEvent(self, event):
         """Limpiar recursos al cerrar"""
+        _live_players.discard(self)
         self.stop()
+        self.release_frame_store()
         if self.video_capture:
             self.video_capture.release()
         event.accept()
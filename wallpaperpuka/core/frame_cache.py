@@ -0,0 +1,216 @@
+# pylint: disable=no-member
+"""
+Caché persistente en disco de frames pre-escalados (archivos mapeados en memoria)
+"""
+import json
+import os
+import time
+import weakref
+from pathlib import Path
+import numpy as np
+from wallpaperpuka.core.frame_store import FrameStore
+from wallpaperpuka.utils.file_hash import fast_hash
+
+# Grabaciones sin entrada más recientes que esto pueden estar en curso en
+# otro proceso: no se tratan como huérfanas
+ORPHAN_AGE_SECONDS = 24 * 3600
+
+# Una FrameCache por carpeta en cada proceso (ver shared_frame_cache)
+_shared_caches = {}
+
+
+def shared_frame_cache(cache_dir, max_bytes=2048 * 1024 * 1024):
+    """FrameCache compartida por todos los reproductores del proceso
+
+    Con varias pantallas cada reproductor graba en la misma carpeta; una
+    única instancia sabe qué grabaciones siguen en curso.
+    """
+    key = str(Path(cache_dir).resolve())
+    cache = _shared_caches.get(key)
+    if cache is None:
+        cache = _shared_caches[key] = FrameCache(cache_dir, max_bytes)
+    else:
+        cache.max_bytes = max_bytes
+    return cache
+
+
+class FrameCache:
+    """Frames RGB crudos por video, resolución y FPS con expulsión LRU"""
+
+    def __init__(self, cache_dir, max_bytes=2048 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.cache_dir / 'index.json'
+        self.max_bytes = max_bytes
+        self.removed = set()  # Borradas por este proceso
+        self.changed = set()  # Escritas o usadas por este proceso
+        self.recording = set()  # Claves con grabación en curso en este proceso
+        self.readers = {}  # Clave -> FrameStores de este proceso que la usan
+        self.entries = self.load_index()
+        self.remove_orphans()
+
+    def load_index(self):
+        """Cargar índice de entradas"""
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Índice de caché de frames corrupto: {e}")
+        return {}
+
+    def save_index(self):
+        """Guardar índice de forma atómica sin perder lo que añadieron otros procesos"""
+        on_disk = self.load_index()
+        for key in self.removed:
+            on_disk.pop(key, None)
+        for key in self.changed:
+            if key in self.entries:
+                on_disk[key] = self.entries[key]
+        self.entries = on_disk
+
+        temp_file = self.index_file.with_name(f"index.{os.getpid()}.tmp")
+        with open(temp_file, 'w') as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(temp_file, self.index_file)
+
+    def remove_orphans(self):
+        """Borrar archivos de grabaciones que nunca se completaron
+
+        Se respetan las grabaciones en curso de este proceso y los archivos
+        recientes, que pueden ser de otro proceso que aún está grabando.
+        """
+        now = time.time()
+        for frames_file in self.cache_dir.glob('*.frames'):
+            key = frames_file.stem
+            if key in self.entries or key in self.recording:
+                continue
+            try:
+                if now - frames_file.stat().st_mtime < ORPHAN_AGE_SECONDS:
+                    continue
+                frames_file.unlink()
+            except OSError:
+                pass
+
+    def frames_path(self, key):
+        return self.cache_dir / f"{key}.frames"
+
+    @staticmethod
+    def make_key(video_path, width, height, fps):
+        """Clave: hash del contenido + tamaño de pantalla + FPS máximo"""
+        return f"{fast_hash(video_path)}_{width}x{height}_{fps}"
+
+    def total_bytes(self):
+        return sum(entry['bytes'] for entry in self.entries.values())
+
+    def open(self, key):
+        """Abrir una entrada como FrameStore de solo lectura (None si no existe)"""
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+
+        path = self.frames_path(key)
+        shape = (entry['count'], entry['height'], entry['width'], 3)
+        try:
+            frames = np.memmap(path, dtype=np.uint8, mode='r', shape=shape)
+        except (OSError, ValueError) as e:
+            print(f"Entrada de caché inválida {key}: {e}")
+            self.remove(key)
+            return None
+
+        entry['last_used'] = time.time()
+        self.changed.add(key)
+        self.save_index()
+
+        store = FrameStore(frames, entry['fps'], path=str(path), owns_file=False)
+        store.count = entry['count']
+        store.complete = True
+        store.cache_key = key
+        self.track(key, store)
+        return store
+
+    def track(self, key, store):
+        """Recordar que un reproductor está mostrando la entrada"""
+        self.readers.setdefault(key, weakref.WeakSet()).add(store)
+
+    def in_use(self, key):
+        """Algún FrameStore de la entrada sigue abierto (release() lo vacía)"""
+        return any(store.capacity for store in self.readers.get(key, ()))
+
+    def create(self, key, capacity, width, height, fps):
+        """Reservar una entrada nueva para grabar (None si no cabe)"""
+        needed = FrameStore.estimate_bytes(capacity, width, height)
+        if needed > self.max_bytes:
+            return None
+
+        if key in self.recording and self.frames_path(key).exists():
+            # Otro reproductor ya está grabando este mismo video (una
+            # grabación abandonada borra su archivo al liberarse)
+            return None
+
+        self.evict(self.max_bytes - needed)
+
+        path = self.frames_path(key)
+        shape = (int(capacity), int(height), int(width), 3)
+        frames = np.memmap(path, dtype=np.uint8, mode='w+', shape=shape)
+
+        # Hasta commit() la entrada es temporal y se borra al liberarla
+        store = FrameStore(frames, fps, path=str(path), owns_file=True)
+        store.cache_key = key
+        self.recording.add(key)
+        return store
+
+    def commit(self, store):
+        """Registrar una grabación completa en el índice"""
+        if not store.complete or not store.cache_key:
+            return False
+
+        self.recording.discard(store.cache_key)
+        if not os.path.exists(store.path):
+            print(f"Grabación desaparecida, no se guarda: {store.cache_key}")
+            return False
+
+        store.frames.flush()
+        store.owns_file = False
+        self.removed.discard(store.cache_key)
+        self.changed.add(store.cache_key)
+        self.entries[store.cache_key] = {
+            'count': store.count,
+            'width': store.width,
+            'height': store.height,
+            'fps': store.fps,
+            'bytes': store.nbytes,
+            'last_used': time.time(),
+        }
+        self.track(store.cache_key, store)
+        self.save_index()
+        print(f"Frames guardados en caché: {store.cache_key}")
+        return True
+
+    def remove(self, key):
+        """Borrar una entrada"""
+        self.entries.pop(key, None)
+        self.changed.discard(key)
+        self.removed.add(key)
+        try:
+            self.frames_path(key).unlink()
+        except OSError:
+            pass
+        self.save_index()
+
+    def evict(self, target_bytes):
+        """Expulsar las entradas menos usadas hasta bajar de target_bytes
+
+        Las que algún reproductor tiene abiertas se quedan aunque se pase.
+        """
+        by_age = sorted(self.entries, key=lambda k: self.entries[k]['last_used'])
+        for key in by_age:
+            if self.total_bytes() <= target_bytes:
+                break
+            if not self.in_use(key):
+                self.remove(key)
+
+    def clear(self):
+        """Vaciar la caché"""
+        for key in list(self.entries):
+            self.remove(key)
@@ -0,0 +1,150 @@
+# pylint: disable=no-member
+"""
+Detección de regiones cambiadas entre frames para repintar solo lo necesario
+"""
+import cv2
+import numpy as np
+
+
+class TileDiff:
+    """Compara cada tesela píxel a píxel con el último frame que se pintó
+
+    Una tesela cambia si cualquier canal de cualquier píxel difiere en más
+    de threshold (0: cualquier diferencia), así que un punto de pocos
+    píxeles moviéndose se repinta siempre. La diferencia se reduce por
+    teselas en palabras de 64 bits (OR de los bytes): ~2 ms a 1080p.
+
+    Con video en movimiento continuo el diff no ahorra nada: tras
+    full_streak frames completos seguidos se deja de comparar durante
+    backoff frames y luego se vuelve a probar.
+    """
+
+    def __init__(self, tile=64, threshold=0, full_ratio=0.5):
+        # Múltiplo de 8: los bordes de tesela caen en límites de palabra
+        self.tile = max(8, int(tile) // 8 * 8)
+        self.threshold = int(threshold)  # Diferencia tolerada por canal (0-255)
+        self.full_ratio = full_ratio  # Con más teselas cambiadas: repintar todo
+        self.painted = None
+        self.diff = None
+        self.edges = None
+        self.word = np.uint8
+        self.full_streak = 8
+        self.backoff = 15
+        self.streak = 0
+        self.skip = 0
+
+    def reset(self):
+        """Olvidar lo pintado (el siguiente frame se repinta entero)"""
+        self.painted = None
+
+    def grid(self, width, height):
+        """Columnas y filas de teselas para un frame"""
+        return (
+            max(1, -(-width // self.tile)),
+            max(1, -(-height // self.tile))
+        )
+
+    def remember(self, rgb_frame):
+        """Guardar el frame pintado (y preparar buffers si cambia el tamaño)"""
+        if self.painted is None or self.painted.shape != rgb_frame.shape:
+            height, width = rgb_frame.shape[:2]
+            cols, rows = self.grid(width, height)
+            # Bordes en píxeles de cada tesela (la última puede ser menor)
+            self.edges = (
+                [min(width, c * self.tile) for c in range(cols + 1)],
+                [min(height, r * self.tile) for r in range(rows + 1)],
+            )
+            # Palabra más ancha que divide la fila en bytes
+            row_bytes = width * rgb_frame.shape[2]
+            self.word = next(
+                word for word in (np.uint64, np.uint32, np.uint16, np.uint8)
+                if row_bytes % np.dtype(word).itemsize == 0
+            )
+            self.painted = np.empty_like(rgb_frame)
+            self.diff = np.empty_like(rgb_frame)
+        np.copyto(self.painted, rgb_frame)
+
+    def tile_mask(self, rgb_frame):
+        """Matriz (filas, columnas) con True en las teselas que cambiaron"""
+        height, width, channels = rgb_frame.shape
+        cv2.absdiff(rgb_frame, self.painted, dst=self.diff)
+        if self.threshold:
+            cv2.threshold(self.diff, self.threshold, 255, cv2.THRESH_TOZERO,
+                          dst=self.diff)
+
+        words = self.diff.reshape(height, width * channels).view(self.word)
+        split = height // self.tile * self.tile
+        parts = []
+        if split:
+            parts.append(np.bitwise_or.reduce(
+                words[:split].reshape(split // self.tile, self.tile, -1), axis=1
+            ))
+        if split < height:
+            # Última fila de teselas más baja (o frame más bajo que una tesela)
+            parts.append(np.bitwise_or.reduce(words[split:], axis=0)[None])
+        per_row = parts[0] if len(parts) == 1 else np.vstack(parts)
+
+        itemsize = np.dtype(self.word).itemsize
+        starts = [x * channels // itemsize for x in self.edges[0][:-1]]
+        return np.bitwise_or.reduceat(per_row, starts, axis=1) != 0
+
+    def changed(self, rgb_frame):
+        """Rectángulos (x, y, ancho, alto) que han cambiado
+
+        Lista vacía si el frame es igual al pintado; un único rectángulo
+        con el frame entero si hay que repintarlo todo.
+        """
+        height, width = rgb_frame.shape[:2]
+        if self.skip:
+            self.skip -= 1
+            if not self.skip:
+                # Lo guardado ya no es lo que hay en pantalla
+                self.painted = None
+            return [(0, 0, width, height)]
+
+        if self.painted is None or self.painted.shape != rgb_frame.shape:
+            self.remember(rgb_frame)
+            return [(0, 0, width, height)]
+
+        mask = self.tile_mask(rgb_frame)
+        changed = int(np.count_nonzero(mask))
+        if changed == 0:
+            self.streak = 0
+            return []
+
+        if changed > self.full_ratio * mask.size:
+            self.remember(rgb_frame)
+            self.streak += 1
+            if self.streak >= self.full_streak:
+                self.streak = 0
+                self.skip = self.backoff
+            return [(0, 0, width, height)]
+
+        # Solo se guarda lo que se repinta: con threshold > 0 los cambios
+        # lentos se acumulan hasta que se notan en vez de perderse
+        self.streak = 0
+        rects = self.rects(mask)
+        for x, y, w, h in rects:
+            self.painted[y:y + h, x:x + w] = rgb_frame[y:y + h, x:x + w]
+        return rects
+
+    def rects(self, mask):
+        """Una tira por cada tramo horizontal de teselas cambiadas"""
+        xs, ys = self.edges
+        rects = []
+        for row in np.flatnonzero(mask.any(axis=1)):
+            line = mask[row]
+            col = 0
+            cols = len(line)
+            while col < cols:
+                if not line[col]:
+                    col += 1
+                    continue
+                start = col
+                while col < cols and line[col]:
+                    col += 1
+                rects.append((
+                    xs[start], ys[row],
+                    xs[col] - xs[start], ys[row + 1] - ys[row]
+                ))
+        return rects
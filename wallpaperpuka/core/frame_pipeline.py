@@ -0,0 +1,343 @@
+# pylint: disable=no-member
+"""
+Pipeline productor/consumidor de frames para el reproductor de escritorio
+"""
+import threading
+import cv2
+import numpy as np
+from wallpaperpuka.core.frame_stats import PipelineStats
+from wallpaperpuka.core.frame_scheduler import TimestampTracker
+
+
+def scale_into(frame, dst, interpolation=cv2.INTER_LINEAR):
+    """Escalar un frame BGR de OpenCV dentro de un buffer RGB preasignado"""
+    height, width = dst.shape[:2]
+
+    if frame.shape[0] == height and frame.shape[1] == width:
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=dst)
+    else:
+        cv2.resize(frame, (width, height), dst=dst, interpolation=interpolation)
+        cv2.cvtColor(dst, cv2.COLOR_BGR2RGB, dst=dst)
+
+    return dst
+
+
+class FrameRingBuffer:
+    """Buffer circular de tamaño fijo con frames RGB preasignados"""
+
+    def __init__(self, depth, width, height):
+        self.depth = max(2, int(depth))
+        self.width = width
+        self.height = height
+
+        # Toda la memoria se reserva una sola vez
+        self.slots = np.zeros((self.depth, height, width, 3), dtype=np.uint8)
+        self.times = [0.0] * self.depth  # Tiempo de cada frame en el video
+
+        self._cond = threading.Condition()
+        self._read = 0      # Siguiente slot listo para mostrar
+        self._count = 0     # Frames listos en cola
+        self._held = False  # El consumidor retiene el slot en pantalla
+        self._closed = False
+
+        # Estadísticas
+        self.underruns = 0
+        self.frames_written = 0
+        self.frames_read = 0
+
+    def _free_slots(self):
+        return self.depth - self._count - (1 if self._held else 0)
+
+    def begin_write(self, timeout=None):
+        """Esperar un slot libre y devolverlo para escribir (None si se cerró)"""
+        with self._cond:
+            while not self._closed and self._free_slots() <= 0:
+                if not self._cond.wait(timeout):
+                    return None
+            if self._closed:
+                return None
+            return self.slots[(self._read + self._count) % self.depth]
+
+    def end_write(self, media_time=0.0):
+        """Publicar el slot escrito para el consumidor"""
+        with self._cond:
+            self.times[(self._read + self._count) % self.depth] = media_time
+            self._count += 1
+            self.frames_written += 1
+            self._cond.notify_all()
+
+    def acquire(self):
+        """Tomar el siguiente frame listo sin bloquear
+
+        El slot devuelto queda retenido hasta la siguiente llamada, de modo
+        que puede envolverse en un QImage sin copiarlo.
+        """
+        with self._cond:
+            if self._count == 0:
+                self.underruns += 1
+                return None
+
+            slot = self.slots[self._read]
+            self._read = (self._read + 1) % self.depth
+            self._count -= 1
+            self._held = True
+            self.frames_read += 1
+            self._cond.notify_all()
+            return slot
+
+    def next_time(self):
+        """Tiempo del siguiente frame listo (None si no hay ninguno)"""
+        with self._cond:
+            if self._count == 0:
+                return None
+            return self.times[self._read]
+
+    def acquire_due(self, media_time):
+        """Tomar el frame más reciente cuyo tiempo ya llegó
+
+        Los frames listos que el reloj ya superó se descartan. Devuelve
+        (slot, tiempo del frame, descartados) o (None, None, 0).
+        """
+        with self._cond:
+            if self._count == 0:
+                self.underruns += 1
+                return None, None, 0
+
+            skipped = 0
+            while (self._count > 1 and
+                   self.times[(self._read + 1) % self.depth] <= media_time):
+                self._read = (self._read + 1) % self.depth
+                self._count -= 1
+                skipped += 1
+
+            frame_time = self.times[self._read]
+            slot = self.slots[self._read]
+            self._read = (self._read + 1) % self.depth
+            self._count -= 1
+            self._held = True
+            self.frames_read += 1
+            self._cond.notify_all()
+            return slot, frame_time, skipped
+
+    def clear(self):
+        """Descartar los frames en cola (el slot retenido sigue en pantalla)"""
+        with self._cond:
+            self._read = (self._read + self._count) % self.depth
+            self._count = 0
+            self._cond.notify_all()
+
+    def fill_level(self):
+        """Número de frames decodificados esperando a mostrarse"""
+        with self._cond:
+            return self._count
+
+    def close(self):
+        """Despertar a los hilos en espera y rechazar nuevas escrituras"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self):
+        """Estadísticas del buffer"""
+        with self._cond:
+            return {
+                'depth': self.depth,
+                'fill': self._count,
+                'underruns': self.underruns,
+                'frames_written': self.frames_written,
+                'frames_read': self.frames_read,
+            }
+
+
+class FrameSink:
+    """Destino extra de los frames decodificados, con su propia resolución
+
+    El decodificador escala cada frame una vez por destino; si el buffer
+    del destino está lleno el frame se descarta para ese destino y el
+    resto del pipeline no espera.
+    """
+
+    def __init__(self, width, height, depth=3, interpolation=cv2.INTER_AREA):
+        self.ring = FrameRingBuffer(depth, width, height)
+        self.interpolation = interpolation
+        self.dropped = 0
+
+    @property
+    def size(self):
+        return self.ring.width, self.ring.height
+
+    def offer(self, frame, frame_time, rgb=False):
+        """Entregar un frame BGR (o RGB ya convertido si rgb=True)"""
+        slot = self.ring.begin_write(timeout=0)
+        if slot is None:
+            self.dropped += 1
+            return False
+
+        if rgb:
+            cv2.resize(frame, self.size, dst=slot, interpolation=self.interpolation)
+        else:
+            scale_into(frame, slot, self.interpolation)
+        self.ring.end_write(frame_time)
+        return True
+
+    def acquire_at(self, media_time):
+        """Frame más reciente cuyo tiempo ya llegó (None si aún no hay)
+
+        Mantiene un destino sincronizado con el reproductor que lo alimenta
+        aunque el decodificador vaya unos frames por delante.
+        """
+        next_time = self.ring.next_time()
+        if next_time is None or next_time > media_time + 1e-6:
+            return None
+        slot, _, _ = self.ring.acquire_due(media_time)
+        return slot
+
+    def latest(self):
+        """Frame RGB más reciente (None si no ha llegado ninguno nuevo)"""
+        slot, _, _ = self.ring.acquire_due(float('inf'))
+        return slot
+
+    def reset(self):
+        """Olvidar los frames en cola (el reproductor empieza otra línea de tiempo)"""
+        self.ring.clear()
+
+    def close(self):
+        self.ring.close()
+
+
+class CallbackSink(FrameSink):
+    """Destino que entrega cada frame a una función (miniaturas, análisis)"""
+
+    def __init__(self, width, height, callback, interpolation=cv2.INTER_AREA):
+        super().__init__(width, height, depth=2, interpolation=interpolation)
+        self.callback = callback
+
+    def offer(self, frame, frame_time, rgb=False):
+        if not super().offer(frame, frame_time, rgb):
+            return False
+        slot = self.ring.acquire()
+        # El callback debe copiar el frame si lo conserva
+        self.callback(slot, frame_time)
+        return True
+
+
+class DecoderThread(threading.Thread):
+    """Hilo que decodifica y pre-escala frames dentro del buffer circular"""
+
+    def __init__(self, capture, ring, loop=True,
+                 interpolation=cv2.INTER_LINEAR, recorder=None, stats=None,
+                 timestamps=None, sinks=None):
+        super().__init__(name="wallpaperpuka-decoder", daemon=True)
+        self.capture = capture
+        self.ring = ring
+        # Otros destinos (vista previa, miniaturas) del mismo frame decodificado
+        self.sinks = sinks if sinks is not None else []
+        self.loop = loop
+        self.interpolation = interpolation
+        # FrameStore opcional que se llena durante la primera vuelta
+        self.recorder = recorder
+        self.recording = False
+        self.stats = stats or PipelineStats()
+        self.timestamps = timestamps or TimestampTracker(
+            capture.get(cv2.CAP_PROP_FPS)
+        )
+        # Frames anteriores a este tiempo se saltan con grab() sin decodificar
+        self.skip_before = 0.0
+        self.frames_skipped = 0
+        self.frames_decoded = 0
+        self.finished = False
+        self._stop_event = threading.Event()
+        # Descarte pedido mientras el hilo aún podía escribir en el almacén
+        self._recorder_lock = threading.Lock()
+        self._discard_pending = False
+
+    def run(self):
+        # Solo se graba una vuelta completa empezando desde el frame 0
+        if self.recorder is not None:
+            self.recording = self.capture.get(cv2.CAP_PROP_POS_FRAMES) == 0
+
+        try:
+            while not self._stop_event.is_set():
+                start = self.stats.begin()
+                ret = self.capture.grab()
+
+                if not ret:
+                    if self.recording and self.recorder.finalize():
+                        # Clip completo en memoria: no hace falta decodificar más
+                        break
+                    if not self.loop:
+                        break
+                    # Reiniciar video (loop)
+                    self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    self.timestamps.wrap()
+                    self.recording = self.recorder is not None
+                    if not self.capture.grab():
+                        break
+
+                frame_time = self.timestamps.stamp(self.capture)
+
+                # Atrasado respecto al reloj: no convertir ni escalar
+                if not self.recording and frame_time < self.skip_before:
+                    self.frames_skipped += 1
+                    continue
+
+                ret, frame = self.capture.retrieve()
+                if not ret:
+                    continue
+                self.stats.end('decode', start)
+                self.frames_decoded += 1
+
+                slot = self.ring.begin_write()
+                if slot is None:
+                    break
+
+                start = self.stats.begin()
+                scale_into(frame, slot, self.interpolation)
+                self.stats.end('scale', start)
+                if self.recording and not self.recorder.record(slot):
+                    # El clip no cabe en el presupuesto: seguir en streaming
+                    self.discard_recorder()
+                self.ring.end_write(frame_time)
+
+                for sink in tuple(self.sinks):
+                    sink.offer(frame, frame_time)
+        except Exception as e:
+            print(f"Error en hilo de decodificación: {e}")
+        finally:
+            with self._recorder_lock:
+                self.finished = True
+                discard = self._discard_pending
+            if discard:
+                self.discard_recorder()
+
+    def discard_recorder(self):
+        """Abandonar la grabación del bucle y liberar su memoria
+
+        Si el hilo sigue vivo (stop() se cansó de esperar a un grab() lento)
+        aún puede estar escribiendo en el almacén: lo libera él al terminar.
+        """
+        with self._recorder_lock:
+            self.recording = False
+            if (threading.current_thread() is not self and self.is_alive()
+                    and not self.finished):
+                self._discard_pending = True
+                return
+            recorder = self.recorder
+            self.recorder = None
+        if recorder is not None:
+            recorder.release()
+
+    def take_recorder(self):
+        """Entregar el almacén si la vuelta completa quedó grabada"""
+        recorder = self.recorder
+        if self.finished and recorder is not None and recorder.complete:
+            self.recorder = None
+            return recorder
+        return None
+
+    def stop(self, timeout=2.0):
+        """Detener el hilo y esperar a que termine"""
+        self._stop_event.set()
+        self.ring.close()
+        if self.is_alive():
+            self.join(timeout)
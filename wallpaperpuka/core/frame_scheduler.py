@@ -0,0 +1,138 @@
+# pylint: disable=no-member
+"""
+Planificación de frames con reloj monotónico y timestamps del video
+"""
+import math
+import time
+import cv2
+
+# Desfase a partir del cual se reancla el reloj en lugar de saltar frames
+RESYNC_THRESHOLD = 1.0
+
+
+class TimestampTracker:
+    """Convierte los PTS del contenedor en un tiempo continuo entre vueltas"""
+
+    def __init__(self, fps):
+        self.frame_interval = 1.0 / fps if fps and fps > 0 else 1.0 / 30
+        self.loop_offset = 0.0
+        self.last = None
+
+    def stamp(self, capture):
+        """Tiempo del frame recién capturado con grab() o read()"""
+        pts = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        media_time = self.loop_offset + pts
+
+        # PTS ausentes o no crecientes: suponer FPS constante
+        if self.last is not None and media_time <= self.last:
+            media_time = self.last + self.frame_interval
+
+        self.last = media_time
+        return media_time
+
+    def wrap(self):
+        """El video vuelve al inicio: el tiempo sigue avanzando"""
+        if self.last is not None:
+            self.loop_offset = self.last + self.frame_interval
+            self.last = None
+
+    def next_time(self):
+        """Tiempo estimado del siguiente frame"""
+        if self.last is None:
+            return self.loop_offset
+        return self.last + self.frame_interval
+
+
+class FrameScheduler:
+    """Reloj de reproducción que decide cuándo toca cada frame
+
+    Los ticks se calculan desde un origen monotónico fijo, así que el
+    redondeo a milisegundos de QTimer no se acumula, y un tick lento no
+    retrasa los siguientes.
+    """
+
+    def __init__(self, tick_fps=30):
+        self.tick_interval = 1.0 / tick_fps
+        self.origin = None
+        self.paused_at = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.ticks = 0
+        self.skipped = 0
+        self.resyncs = 0
+        self.drift = 0.0
+        self.max_drift = 0.0
+
+    def set_rate(self, tick_fps):
+        """Cambiar la frecuencia de ticks (FPS máximos de pantalla)"""
+        if tick_fps > 0:
+            self.tick_interval = 1.0 / tick_fps
+
+    @property
+    def running(self):
+        return self.origin is not None and self.paused_at is None
+
+    def start(self, media_time=0.0):
+        """Arrancar el reloj en la posición indicada del video"""
+        self.origin = time.monotonic() - media_time
+        self.paused_at = None
+
+    def stop(self):
+        self.origin = None
+        self.paused_at = None
+        self.reset_stats()
+
+    def pause(self):
+        if self.running:
+            self.paused_at = time.monotonic()
+
+    def resume(self):
+        """Reanudar sin saltar el tiempo que estuvo pausado"""
+        if self.origin is None:
+            self.start()
+        elif self.paused_at is not None:
+            self.origin += time.monotonic() - self.paused_at
+            self.paused_at = None
+
+    def media_time(self):
+        """Posición actual del reloj de reproducción en segundos"""
+        if self.origin is None:
+            return 0.0
+        now = self.paused_at if self.paused_at is not None else time.monotonic()
+        return now - self.origin
+
+    def next_delay_ms(self):
+        """Milisegundos hasta el siguiente tick"""
+        elapsed = self.media_time()
+        next_tick = (math.floor(elapsed / self.tick_interval) + 1) * self.tick_interval
+        return max(1, int(math.ceil((next_tick - elapsed) * 1000)))
+
+    def is_stale(self, frame_time, frame_interval):
+        """El frame ya fue superado por el siguiente según el reloj"""
+        return frame_time + frame_interval <= self.media_time()
+
+    def presented(self, frame_time):
+        """Registrar el frame mostrado y medir el desfase respecto al reloj"""
+        self.ticks += 1
+        drift = self.media_time() - frame_time
+
+        # Salto de tiempo (seek, reinicio del decodificador): reanclar
+        if abs(drift) > RESYNC_THRESHOLD:
+            self.start(frame_time)
+            self.resyncs += 1
+            drift = 0.0
+
+        self.drift = drift
+        self.max_drift = max(self.max_drift, abs(drift))
+
+    def stats(self):
+        """Desfase actual y máximo, frames saltados y reanclajes"""
+        return {
+            'media_time': round(self.media_time(), 3),
+            'drift_ms': round(self.drift * 1000, 2),
+            'max_drift_ms': round(self.max_drift * 1000, 2),
+            'skipped': self.skipped,
+            'resyncs': self.resyncs,
+            'ticks': self.ticks,
+        }
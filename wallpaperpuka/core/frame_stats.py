@@ -0,0 +1,123 @@
+"""
+Instrumentación ligera de las etapas del pipeline de frames
+"""
+import time
+
+
+class StageStats:
+    """Últimas N duraciones de una etapa en un buffer circular preasignado"""
+
+    def __init__(self, size=256):
+        self.samples = [0.0] * size
+        self.size = size
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.samples[self.index] = seconds
+        self.index = (self.index + 1) % self.size
+        self.count += 1
+        self.total += seconds
+
+    def recent(self):
+        """Muestras guardadas actualmente"""
+        if self.count < self.size:
+            return self.samples[:self.count]
+        return list(self.samples)
+
+    def summary(self):
+        """Percentiles en milisegundos de las muestras recientes"""
+        values = sorted(self.recent())
+        if not values:
+            return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+
+        def pick(p):
+            return values[min(len(values) - 1, int(p * (len(values) - 1)))] * 1000
+
+        return {
+            'count': self.count,
+            'mean': round(sum(values) / len(values) * 1000, 3),
+            'p50': round(pick(0.50), 3),
+            'p95': round(pick(0.95), 3),
+            'max': round(values[-1] * 1000, 3),
+        }
+
+
+class PipelineStats:
+    """Tiempos por etapa, frames mostrados y descartados
+
+    Desactivado, begin() devuelve 0 y end() no hace nada, así que el
+    coste en el camino crítico es una comprobación de atributo.
+    """
+
+    def __init__(self, size=256):
+        self.enabled = False
+        self.size = size
+        self.stages = {}
+        self.counters = {}
+        self.frame_times = StageStats(size)  # Instantes de presentación
+        self.started = time.perf_counter()
+
+    def begin(self):
+        """Marca de inicio de una etapa (0 si está desactivado)"""
+        return time.perf_counter() if self.enabled else 0.0
+
+    def end(self, stage, start):
+        """Registrar la duración de una etapa iniciada con begin()"""
+        if start:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats(self.size)
+            stats.add(time.perf_counter() - start)
+
+    def count(self, name, amount=1):
+        """Incrementar un contador (frames descartados, repintados...)"""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def frame_presented(self):
+        """Registrar un frame mostrado para calcular los FPS reales"""
+        if self.enabled:
+            self.frame_times.add(time.perf_counter())
+
+    def fps(self):
+        """FPS medidos sobre los últimos frames mostrados"""
+        times = self.frame_times.recent()
+        if len(times) < 2:
+            return 0.0
+        span = max(times) - min(times)
+        return (len(times) - 1) / span if span > 0 else 0.0
+
+    def reset(self):
+        self.stages = {}
+        self.counters = {}
+        self.frame_times = StageStats(self.size)
+        self.started = time.perf_counter()
+
+    def snapshot(self):
+        """Resumen de todas las etapas"""
+        return {
+            'enabled': self.enabled,
+            'fps': round(self.fps(), 2),
+            'frames': self.frame_times.count,
+            'counters': dict(self.counters),
+            'stages': {
+                name: stats.summary() for name, stats in self.stages.items()
+            },
+        }
+
+    def format_line(self):
+        """Una línea legible para log u OSD"""
+        snap = self.snapshot()
+        parts = [f"{snap['fps']:.1f} FPS"]
+        dropped = snap['counters'].get('dropped', 0)
+        parts.append(f"descartados {dropped}")
+        if 'repaint_skipped' in snap['counters'] or 'repaint_partial' in snap['counters']:
+            parts.append(
+                f"sin repintar {snap['counters'].get('repaint_skipped', 0)}, "
+                f"parcial {snap['counters'].get('repaint_partial', 0)}"
+            )
+        for name, summary in snap['stages'].items():
+            parts.append(f"{name} {summary['p50']:.1f}/{summary['p95']:.1f} ms")
+        return " | ".join(parts)
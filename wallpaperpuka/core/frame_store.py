@@ -0,0 +1,100 @@
+# pylint: disable=no-member
+"""
+Almacén de frames pre-decodificados para reproducir clips cortos en bucle
+"""
+import os
+import tempfile
+from pathlib import Path
+import numpy as np
+
+
+class FrameStore:
+    """Frames RGB a resolución de pantalla guardados en un único bloque"""
+
+    # Frames a su resolución original: se escalan al pintar
+    native_size = False
+
+    def __init__(self, frames, fps, path=None, owns_file=True):
+        self.frames = frames  # ndarray o np.memmap (n, alto, ancho, 3)
+        self.fps = fps
+        self.path = path
+        self.owns_file = owns_file  # Borrar el archivo al liberar
+        self.cache_key = None
+        self.count = 0  # Frames válidos grabados
+        self.complete = False
+        self.position = 0
+
+    @property
+    def capacity(self):
+        return self.frames.shape[0]
+
+    @property
+    def width(self):
+        return self.frames.shape[2]
+
+    @property
+    def height(self):
+        return self.frames.shape[1]
+
+    @property
+    def nbytes(self):
+        return self.frames.nbytes
+
+    @staticmethod
+    def estimate_bytes(frame_count, width, height):
+        """Memoria necesaria para guardar un clip completo"""
+        return int(frame_count) * int(width) * int(height) * 3
+
+    @classmethod
+    def allocate(cls, frame_count, width, height, fps, use_mmap=False):
+        """Reservar almacén en memoria o mapeado a un archivo temporal"""
+        shape = (int(frame_count), int(height), int(width), 3)
+
+        if not use_mmap:
+            return cls(np.empty(shape, dtype=np.uint8), fps)
+
+        temp_dir = Path(tempfile.gettempdir()) / 'wallpaperpuka'
+        temp_dir.mkdir(exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix='.frames', dir=temp_dir)
+        os.close(fd)
+        frames = np.memmap(path, dtype=np.uint8, mode='w+', shape=shape)
+        return cls(frames, fps, path=path)
+
+    def record(self, rgb_frame):
+        """Añadir un frame al almacén (False si no cabe)"""
+        if self.complete or self.count >= self.capacity:
+            return False
+        np.copyto(self.frames[self.count], rgb_frame)
+        self.count += 1
+        return True
+
+    def finalize(self):
+        """Marcar el clip como completo tras una vuelta entera"""
+        if self.count > 0:
+            self.complete = True
+            if isinstance(self.frames, np.memmap):
+                self.frames.flush()
+        return self.complete
+
+    def frame_at(self, media_time):
+        """Frame que corresponde a un instante del reloj y su tiempo"""
+        index = int(media_time * self.fps + 1e-6)
+        self.position = index % self.count
+        return self.frames[self.position], index / self.fps
+
+    def rewind(self):
+        """Volver al primer frame"""
+        self.position = 0
+
+    def release(self):
+        """Liberar memoria y borrar el archivo temporal si existe"""
+        self.frames = np.empty((0, 0, 0, 3), dtype=np.uint8)
+        self.count = 0
+        self.complete = False
+
+        if self.path and self.owns_file:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
@@ -0,0 +1,114 @@
+# pylint: disable=no-member
+"""
+GIFs animados para el reproductor de escritorio
+
+Pillow compone cada frame una sola vez (con su método de disposal y su
+transparencia) y se guardan todos en un único bloque RGB. Después la
+reproducción solo elige el frame según el reloj: no se decodifica nada
+más y el escalado a pantalla se hace al pintar.
+"""
+import bisect
+from pathlib import Path
+import numpy as np
+from wallpaperpuka.core.frame_store import FrameStore
+
+# Como los navegadores: retardos de 0-10 ms se reproducen a 100 ms
+CLAMPED_DELAY_MS = 10
+DEFAULT_DELAY_MS = 100
+
+
+def is_gif(path):
+    """GIF por extensión o, en .mlw abiertos en su sitio, por cabecera"""
+    ext = Path(path).suffix.lower()
+    if ext == '.gif':
+        return True
+    if ext != '.mlw':
+        return False
+
+    from wallpaperpuka.utils.container_scan import sniff_format
+    try:
+        return sniff_format(path) == '.gif'
+    except OSError:
+        return False
+
+
+def frame_delay(info):
+    """Retardo de un frame en segundos según el bloque de control del GIF"""
+    delay = info.get('duration') or 0
+    if delay <= CLAMPED_DELAY_MS:
+        delay = DEFAULT_DELAY_MS
+    return delay / 1000.0
+
+
+class GifFrameStore(FrameStore):
+    """Frames compuestos de un GIF con su retardo propio cada uno"""
+
+    native_size = True
+
+    def __init__(self, frames, delays):
+        self.delays = list(delays)
+        # Inicio de cada frame dentro de una vuelta
+        self.starts = [0.0]
+        for delay in self.delays[:-1]:
+            self.starts.append(self.starts[-1] + delay)
+        self.duration = self.starts[-1] + self.delays[-1]
+
+        super().__init__(frames, len(self.delays) / self.duration)
+        self.count = len(self.delays)
+        self.complete = True
+
+    @classmethod
+    def load(cls, path, max_size=None, budget=None):
+        """Componer todos los frames del GIF (None si no es válido o no cabe)
+
+        max_size: (ancho, alto) máximos; los GIF más grandes se reducen
+        al cargarlos. budget: bytes máximos del bloque de frames.
+        """
+        from PIL import Image, ImageSequence
+
+        try:
+            with Image.open(path) as image:
+                count = getattr(image, 'n_frames', 1)
+                width, height = image.size
+                if max_size and (width > max_size[0] or height > max_size[1]):
+                    width, height = max_size
+
+                needed = FrameStore.estimate_bytes(count, width, height)
+                if budget and needed > budget:
+                    print(
+                        f"GIF demasiado grande para componerlo en memoria "
+                        f"({needed // (1024 * 1024)} MB)"
+                    )
+                    return None
+
+                frames = np.empty((count, height, width, 3), dtype=np.uint8)
+                background = Image.new('RGB', (width, height))
+                delays = []
+                for index, frame in enumerate(ImageSequence.Iterator(image)):
+                    if index >= count:
+                        break
+                    # Pillow ya aplica el disposal del frame anterior al hacer seek
+                    rgba = frame.convert('RGBA')
+                    if rgba.size != (width, height):
+                        rgba = rgba.resize((width, height), Image.BILINEAR)
+                    composed = background.copy()
+                    composed.paste(rgba, mask=rgba.getchannel('A'))
+                    frames[index] = np.asarray(composed)
+                    delays.append(frame_delay(frame.info))
+        except (OSError, ValueError, EOFError) as e:
+            print(f"Error al leer GIF: {e}")
+            return None
+
+        if not delays:
+            return None
+        return cls(frames[:len(delays)], delays)
+
+    def frame_at(self, media_time):
+        """Frame que toca en un instante del reloj según los retardos"""
+        loops, offset = divmod(max(0.0, media_time), self.duration)
+        self.position = max(0, bisect.bisect_right(self.starts, offset + 1e-6) - 1)
+        return self.frames[self.position], loops * self.duration + self.starts[self.position]
+
+    def release(self):
+        super().release()
+        self.delays = []
@@ -0,0 +1,382 @@
+# pylint: disable=no-member
+"""
+Importación en lote de una biblioteca de fondos (.mlw, videos y GIFs)
+
+Cada archivo se procesa en un proceso del pool: extracción de .mlw,
+lectura de propiedades del video y miniatura. El proceso principal solo
+recoge resultados, informa del progreso y guarda el índice.
+"""
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+import cv2
+from wallpaperpuka.core.decode_backends import codec_name
+from wallpaperpuka.core.thumbnailer import grab_frames, resize_to_width
+from wallpaperpuka.utils.file_hash import fast_hash
+
+LIBRARY_EXTENSIONS = {'.mlw', '.mp4', '.avi', '.mov', '.mkv', '.webm', '.gif'}
+THUMBNAIL_WIDTH = 320
+
+# Un MLWHandler por proceso del pool (reutiliza su caché de extracciones)
+_mlw_handler = None
+
+
+def scan_library(paths, recursive=True):
+    """Archivos soportados dentro de las rutas dadas (archivos o carpetas)"""
+    for path in paths:
+        path = Path(path)
+        if path.is_file():
+            if path.suffix.lower() in LIBRARY_EXTENSIONS:
+                yield str(path.resolve())
+            continue
+
+        pattern = '**/*' if recursive else '*'
+        for file_path in sorted(path.glob(pattern)):
+            if file_path.is_file() and file_path.suffix.lower() in LIBRARY_EXTENSIONS:
+                yield str(file_path.resolve())
+
+
+def probe_video(video_path):
+    """Propiedades básicas del video (None si no se puede abrir)"""
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        return None
+
+    fps = capture.get(cv2.CAP_PROP_FPS)
+    frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    info = {
+        'codec': codec_name(capture),
+        'width': int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        'height': int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        'fps': fps,
+        'frames': frames,
+        'duration': frames / fps if fps > 0 and frames > 0 else None,
+    }
+    capture.release()
+    return info
+
+
+def make_thumbnail(video_path, width=THUMBNAIL_WIDTH):
+    """JPEG (bytes) de un frame al 10% del video, reducido a width"""
+    frame = grab_frames(video_path, [0.1])[0]
+    if frame is None:
+        return None
+
+    ok, data = cv2.imencode(
+        '.jpg', resize_to_width(frame, width), [cv2.IMWRITE_JPEG_QUALITY, 85]
+    )
+    return data.tobytes() if ok else None
+
+
+def import_file(path, thumbnails=True):
+    """Procesar un archivo de la biblioteca (se ejecuta en el pool)"""
+    global _mlw_handler
+
+    stat = os.stat(path)
+    record = {
+        'path': path,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'hash': fast_hash(path),
+        'video_path': path,
+        'thumbnail': None,
+        'error': None,
+        'imported': time.time(),
+    }
+
+    try:
+        if path.lower().endswith('.mlw'):
+            if _mlw_handler is None:
+                from wallpaperpuka.utils.mlw_handler import MLWHandler
+                _mlw_handler = MLWHandler()
+            record['video_path'] = _mlw_handler.extract_video(path)
+            if not record['video_path']:
+                record['error'] = "No se pudo extraer el video"
+                return record
+
+        info = probe_video(record['video_path'])
+        if not info:
+            record['error'] = "No se pudo abrir el video"
+            return record
+        record.update(info)
+
+        if thumbnails:
+            record['thumbnail'] = make_thumbnail(record['video_path'])
+    except Exception as e:
+        record['error'] = str(e)
+
+    return record
+
+
+class LibraryIndex:
+    """Índice SQLite de la biblioteca: metadatos y miniatura por archivo
+
+    Listar y buscar no vuelve a abrir ningún video; las columnas de la
+    consulta se leen del índice y la miniatura solo cuando se pide.
+    """
+
+    COLUMNS = (
+        'path', 'size', 'mtime', 'hash', 'video_path', 'codec', 'width',
+        'height', 'fps', 'frames', 'duration', 'error', 'imported',
+    )
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS wallpapers (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime INTEGER,
+                hash TEXT,
+                video_path TEXT,
+                codec TEXT,
+                width INTEGER,
+                height INTEGER,
+                fps REAL,
+                frames INTEGER,
+                duration REAL,
+                thumbnail BLOB,
+                error TEXT,
+                imported REAL
+            );
+            CREATE INDEX IF NOT EXISTS wallpapers_hash ON wallpapers (hash);
+            CREATE TABLE IF NOT EXISTS decode_backends (
+                codec TEXT,
+                width INTEGER,
+                height INTEGER,
+                backend TEXT,
+                open_ms REAL,
+                fps REAL,
+                probed REAL,
+                PRIMARY KEY (codec, width, height)
+            );
+        """)
+
+    def save(self):
+        """Confirmar los cambios pendientes"""
+        with self._lock:
+            self.db.commit()
+
+    def close(self):
+        with self._lock:
+            self.db.commit()
+            self.db.close()
+
+    def get(self, path):
+        """Registro de un archivo (sin miniatura) o None"""
+        with self._lock:
+            row = self.db.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM wallpapers WHERE path = ?",
+                (path,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def put(self, record):
+        """Insertar o reemplazar un registro (la miniatura va como bytes)"""
+        columns = self.COLUMNS + ('thumbnail',)
+        values = [record.get(column) for column in columns]
+        with self._lock:
+            self.db.execute(
+                f"INSERT OR REPLACE INTO wallpapers ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                values
+            )
+
+    def remove(self, path):
+        with self._lock:
+            self.db.execute("DELETE FROM wallpapers WHERE path = ?", (path,))
+
+    def thumbnail(self, path):
+        """Miniatura JPEG en bytes (None si no hay)"""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT thumbnail FROM wallpapers WHERE path = ?", (path,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_current(self, path, size, mtime):
+        """El archivo no ha cambiado desde que se indexó"""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT 1 FROM wallpapers WHERE path = ? AND size = ? AND mtime = ?",
+                (path, size, mtime)
+            ).fetchone()
+        return row is not None
+
+    def paths_under(self, folder):
+        """Rutas indexadas dentro de una carpeta"""
+        prefix = os.path.join(str(folder), '')
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT path FROM wallpapers WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def decode_backend(self, codec, width, height):
+        """Backend ganador del sondeo para un códec y resolución (o None)"""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT backend, open_ms, fps, probed FROM decode_backends "
+                "WHERE codec = ? AND width = ? AND height = ?",
+                (codec, width, height)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def set_decode_backend(self, codec, width, height, result):
+        """Guardar el resultado de probe_backend() del ganador"""
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO decode_backends "
+                "(codec, width, height, backend, open_ms, fps, probed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (codec, width, height, result['backend'], result['open_ms'],
+                 result['fps'], time.time())
+            )
+
+    def decode_backends(self):
+        """Todos los ganadores guardados"""
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT * FROM decode_backends ORDER BY codec, width, height"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search(self, text=None, codec=None, min_width=None, min_height=None,
+               max_duration=None, include_errors=False, order_by='path',
+               limit=None):
+        """Filtrar la biblioteca sin abrir ningún video"""
+        clauses = []
+        params = []
+        if text:
+            clauses.append("path LIKE ?")
+            params.append(f"%{text}%")
+        if codec:
+            clauses.append("codec = ?")
+            params.append(codec)
+        if min_width:
+            clauses.append("width >= ?")
+            params.append(min_width)
+        if min_height:
+            clauses.append("height >= ?")
+            params.append(min_height)
+        if max_duration:
+            clauses.append("duration <= ?")
+            params.append(max_duration)
+        if not include_errors:
+            clauses.append("error IS NULL")
+
+        if order_by not in self.COLUMNS:
+            order_by = 'path'
+        query = f"SELECT {', '.join(self.COLUMNS)} FROM wallpapers"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += f" ORDER BY {order_by}"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            return [dict(row) for row in self.db.execute(query, params)]
+
+    def __len__(self):
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM wallpapers").fetchone()[0]
+
+
+class LibraryImporter:
+    """Importa carpetas enteras en paralelo con progreso y cancelación"""
+
+    def __init__(self, index, thumbnails=True, workers=None, save_every=25):
+        self.index = index
+        self.thumbnails = thumbnails
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.save_every = save_every  # Confirmar el índice cada N resultados
+        self.skipped = 0  # Sin cambios desde la última importación
+        self.removed = 0  # Ya no existen en disco
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Detener la importación (los archivos ya procesados se conservan)"""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def pending_files(self, paths, recursive=True, force=False):
+        """Archivos nuevos o modificados (por tamaño y mtime) y poda del índice"""
+        files = list(scan_library(paths, recursive))
+        found = set(files)
+
+        self.removed = 0
+        for path in paths:
+            if Path(path).is_dir():
+                for indexed in self.index.paths_under(Path(path).resolve()):
+                    if indexed not in found:
+                        self.index.remove(indexed)
+                        self.removed += 1
+
+        if force:
+            self.skipped = 0
+            return files
+
+        pending = []
+        for path in files:
+            stat = os.stat(path)
+            if not self.index.is_current(path, stat.st_size, stat.st_mtime_ns):
+                pending.append(path)
+        self.skipped = len(files) - len(pending)
+        return pending
+
+    def run(self, paths, progress=None, recursive=True, force=False):
+        """Importar lo nuevo o modificado dentro de paths
+
+        progress(hechos, total, registro) se llama en este hilo tras cada
+        archivo. Devuelve la lista de registros obtenidos.
+        """
+        self._cancel.clear()
+        files = self.pending_files(paths, recursive, force)
+
+        records = []
+        if not files:
+            self.index.save()
+            return records
+
+        executor = ProcessPoolExecutor(max_workers=min(self.workers, len(files)))
+        try:
+            futures = {
+                executor.submit(import_file, path, self.thumbnails): path
+                for path in files
+            }
+            pending = set(futures)
+            while pending and not self.cancelled:
+                # Espera corta para atender la cancelación con rapidez
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        record = future.result()
+                        # Los errores también se guardan: no se reintentan
+                        # hasta que el archivo cambie
+                        self.index.put(record)
+                    except Exception as e:
+                        record = {'path': futures[future], 'error': str(e)}
+
+                    records.append(record)
+                    if len(records) % self.save_every == 0:
+                        self.index.save()
+                    if progress:
+                        progress(len(records), len(files), record)
+        finally:
+            # Al cancelar no se espera a los archivos pendientes
+            executor.shutdown(wait=not self.cancelled, cancel_futures=True)
+            self.index.save()
+
+        return records
@@ -0,0 +1,293 @@
+# pylint: disable=no-member
+"""
+Política de pausa automática: no decodificar cuando nadie ve el fondo
+
+Cada sonda recibe funciones de lectura inyectables, de modo que la lógica
+se puede probar en cualquier sistema sustituyéndolas por valores fijos.
+"""
+import ctypes
+import glob
+import os
+from ctypes import wintypes
+from wallpaperpuka.core.quality_governor import SystemLoadSampler
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# --- Lecturas del sistema (None = desconocido) ---
+
+def read_foreground_rect():
+    """Rectángulo (izq, arriba, der, abajo) de la ventana en primer plano"""
+    try:
+        user32 = ctypes.windll.user32
+        hwnd = user32.GetForegroundWindow()
+        if not hwnd or user32.IsIconic(hwnd):
+            return None
+
+        # El propio escritorio no tapa el fondo
+        class_name = ctypes.create_unicode_buffer(64)
+        user32.GetClassNameW(hwnd, class_name, 64)
+        if class_name.value in ("Progman", "WorkerW", "Shell_TrayWnd"):
+            return None
+
+        rect = wintypes.RECT()
+        user32.GetWindowRect(hwnd, ctypes.byref(rect))
+        return rect.left, rect.top, rect.right, rect.bottom
+    except (AttributeError, OSError):
+        return None
+
+
+def read_fullscreen_app():
+    """Hay una aplicación a pantalla completa, juego D3D o presentación"""
+    try:
+        state = ctypes.c_int()
+        if ctypes.windll.shell32.SHQueryUserNotificationState(ctypes.byref(state)):
+            return None
+        # QUNS_BUSY, QUNS_RUNNING_D3D_FULL_SCREEN, QUNS_PRESENTATION_MODE
+        return state.value in (2, 3, 4)
+    except (AttributeError, OSError):
+        return None
+
+
+def read_session_locked():
+    """La sesión está bloqueada (el escritorio de entrada no es accesible)"""
+    try:
+        user32 = ctypes.windll.user32
+        desktop = user32.OpenInputDesktop(0, False, 0x0100)  # DESKTOP_SWITCHDESKTOP
+        if not desktop:
+            return True
+        user32.CloseDesktop(desktop)
+        return False
+    except (AttributeError, OSError):
+        return None
+
+
+class LASTINPUTINFO(ctypes.Structure):
+    _fields_ = [("cbSize", wintypes.UINT), ("dwTime", wintypes.DWORD)]
+
+
+def read_idle_seconds():
+    """Segundos desde la última entrada de teclado o ratón"""
+    try:
+        info = LASTINPUTINFO()
+        info.cbSize = ctypes.sizeof(LASTINPUTINFO)
+        if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+            return None
+        elapsed = ctypes.windll.kernel32.GetTickCount() - info.dwTime
+        return (elapsed & 0xFFFFFFFF) / 1000.0
+    except (AttributeError, OSError):
+        return None
+
+
+class SYSTEM_POWER_STATUS(ctypes.Structure):
+    _fields_ = [
+        ("ACLineStatus", ctypes.c_ubyte),
+        ("BatteryFlag", ctypes.c_ubyte),
+        ("BatteryLifePercent", ctypes.c_ubyte),
+        ("SystemStatusFlag", ctypes.c_ubyte),
+        ("BatteryLifeTime", wintypes.DWORD),
+        ("BatteryFullLifeTime", wintypes.DWORD),
+    ]
+
+
+def read_power_status():
+    """(conectado a corriente, porcentaje de batería) o None"""
+    if psutil is not None and hasattr(psutil, "sensors_battery"):
+        battery = psutil.sensors_battery()
+        if battery is not None:
+            return battery.power_plugged, battery.percent
+
+    try:
+        status = SYSTEM_POWER_STATUS()
+        if ctypes.windll.kernel32.GetSystemPowerStatus(ctypes.byref(status)):
+            if status.ACLineStatus == 255:
+                return None
+            percent = status.BatteryLifePercent
+            return status.ACLineStatus == 1, None if percent == 255 else percent
+    except (AttributeError, OSError):
+        pass
+
+    # Linux: /sys/class/power_supply
+    for supply in glob.glob('/sys/class/power_supply/*'):
+        try:
+            with open(os.path.join(supply, 'type'), 'r') as f:
+                if f.read().strip() != 'Mains':
+                    continue
+            with open(os.path.join(supply, 'online'), 'r') as f:
+                return f.read().strip() == '1', None
+        except OSError:
+            continue
+    return None
+
+
+# --- Sondas ---
+
+class PolicyProbe:
+    """Sonda base: active() devuelve True si hay que pausar"""
+
+    name = "probe"
+
+    def active(self):
+        raise NotImplementedError
+
+
+class WindowCoverageProbe(PolicyProbe):
+    """La ventana en primer plano tapa casi toda la pantalla (maximizada)"""
+
+    name = "coverage"
+
+    def __init__(self, screen_rect, read_rect=read_foreground_rect, ratio=0.95):
+        self.screen_rect = screen_rect  # Función -> (izq, arriba, der, abajo)
+        self.read_rect = read_rect
+        self.ratio = ratio
+
+    def active(self):
+        window = self.read_rect()
+        screen = self.screen_rect()
+        if not window or not screen:
+            return False
+
+        width = min(window[2], screen[2]) - max(window[0], screen[0])
+        height = min(window[3], screen[3]) - max(window[1], screen[1])
+        if width <= 0 or height <= 0:
+            return False
+
+        screen_area = (screen[2] - screen[0]) * (screen[3] - screen[1])
+        return screen_area > 0 and width * height >= screen_area * self.ratio
+
+
+class FullscreenAppProbe(PolicyProbe):
+    """Juego, video o presentación a pantalla completa"""
+
+    name = "fullscreen"
+
+    def __init__(self, read_state=read_fullscreen_app):
+        self.read_state = read_state
+
+    def active(self):
+        return bool(self.read_state())
+
+
+class SessionLockProbe(PolicyProbe):
+    """Pantalla bloqueada"""
+
+    name = "locked"
+
+    def __init__(self, read_locked=read_session_locked):
+        self.read_locked = read_locked
+
+    def active(self):
+        return bool(self.read_locked())
+
+
+class IdleProbe(PolicyProbe):
+    """Sin actividad del usuario durante más de idle_seconds"""
+
+    name = "idle"
+
+    def __init__(self, idle_seconds=600, read_idle=read_idle_seconds):
+        self.idle_seconds = idle_seconds
+        self.read_idle = read_idle
+
+    def active(self):
+        idle = self.read_idle()
+        return idle is not None and idle >= self.idle_seconds
+
+
+class BatteryProbe(PolicyProbe):
+    """Funcionando con batería (opcionalmente solo por debajo de un %)"""
+
+    name = "battery"
+
+    def __init__(self, below_percent=None, read_status=read_power_status):
+        self.below_percent = below_percent
+        self.read_status = read_status
+
+    def active(self):
+        status = self.read_status()
+        if status is None:
+            return False
+        plugged, percent = status
+        if plugged:
+            return False
+        if self.below_percent is None or percent is None:
+            return True
+        return percent < self.below_percent
+
+
+class CpuLoadProbe(PolicyProbe):
+    """CPU del sistema por encima del umbral, con histéresis para reanudar"""
+
+    name = "cpu"
+
+    def __init__(self, threshold=0.9, resume_ratio=0.7, read_load=None):
+        self.threshold = threshold
+        self.resume_ratio = resume_ratio
+        self.read_load = read_load or SystemLoadSampler().sample
+        self.triggered = False
+
+    def active(self):
+        load = self.read_load()
+        if load is None:
+            return self.triggered
+
+        if self.triggered:
+            # Nuestra propia carga desaparece al pausar: exigir margen
+            self.triggered = load > self.threshold * self.resume_ratio
+        else:
+            self.triggered = load > self.threshold
+        return self.triggered
+
+
+class PlaybackPolicy:
+    """Combina sondas y decide si la reproducción debe suspenderse"""
+
+    def __init__(self, probes=None, resume_checks=2):
+        self.probes = list(probes or [])
+        self.resume_checks = resume_checks  # Evaluaciones limpias para reanudar
+        self.reasons = []
+        self.clear_count = 0
+        self.suspended = False
+
+    def add_probe(self, probe):
+        self.probes.append(probe)
+
+    @classmethod
+    def from_config(cls, config, screen_rect):
+        """Crear sondas según la lista guardada en Config"""
+        enabled = config.get('auto_pause_probes', ['coverage', 'fullscreen', 'locked'])
+        factories = {
+            'coverage': lambda: WindowCoverageProbe(screen_rect),
+            'fullscreen': FullscreenAppProbe,
+            'locked': SessionLockProbe,
+            'idle': lambda: IdleProbe(config.get('auto_pause_idle_minutes', 10) * 60),
+            'battery': lambda: BatteryProbe(config.get('auto_pause_battery_percent')),
+            'cpu': lambda: CpuLoadProbe(config.get('auto_pause_cpu_threshold', 0.9)),
+        }
+        probes = [factories[name]() for name in enabled if name in factories]
+        return cls(probes)
+
+    def evaluate(self):
+        """Evaluar sondas; devuelve True si la reproducción debe estar suspendida"""
+        reasons = []
+        for probe in self.probes:
+            try:
+                if probe.active():
+                    reasons.append(probe.name)
+            except Exception as e:
+                print(f"Error en sonda {probe.name}: {e}")
+        self.reasons = reasons
+
+        if reasons:
+            self.clear_count = 0
+            self.suspended = True
+        elif self.suspended:
+            self.clear_count += 1
+            if self.clear_count >= self.resume_checks:
+                self.suspended = False
+                self.clear_count = 0
+
+        return self.suspended
@@ -0,0 +1,123 @@
+"""
+Lista de fondos animados y rotación: por tiempo, aleatoria o por hora del día
+"""
+import datetime
+import random
+from pathlib import Path
+
+# Lo que puede reproducir DesktopVideoPlayer (los .mlw se extraen antes)
+PLAYLIST_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.webm', '.gif', '.mlw'}
+
+
+def parse_time(text):
+    """'HH:MM' -> minutos desde medianoche"""
+    hours, minutes = text.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def rule_matches(rule, now):
+    """La regla cubre la hora actual (admite tramos que cruzan medianoche)"""
+    try:
+        start = parse_time(rule['start'])
+        end = parse_time(rule['end'])
+    except (KeyError, ValueError):
+        return False
+    minute = now.hour * 60 + now.minute
+    if start <= end:
+        return start <= minute < end
+    return minute >= start or minute < end
+
+
+class Playlist:
+    """Fondos que se van turnando, guardados en Config['playlist']
+
+    rules: [{'start': '22:00', 'end': '07:00', 'items': [...]}]; la
+    primera regla que cubre la hora actual sustituye a la lista general.
+    """
+
+    def __init__(self, items=None, enabled=False, interval_minutes=10,
+                 shuffle=False, rules=None, crossfade_ms=800, prefetch_seconds=5):
+        self.items = list(items or [])
+        self.enabled = enabled
+        self.interval_minutes = interval_minutes
+        self.shuffle = shuffle
+        self.rules = list(rules or [])
+        self.crossfade_ms = crossfade_ms
+        self.prefetch_seconds = prefetch_seconds
+        self.bag = []  # Orden aleatorio pendiente (sin repetir hasta agotarlo)
+
+    @classmethod
+    def from_config(cls, config):
+        data = config.get('playlist') or {}
+        return cls(
+            data.get('items'),
+            data.get('enabled', False),
+            data.get('interval_minutes', 10),
+            data.get('shuffle', False),
+            data.get('rules'),
+            data.get('crossfade_ms', 800),
+            data.get('prefetch_seconds', 5)
+        )
+
+    def to_dict(self):
+        return {
+            'items': self.items,
+            'enabled': self.enabled,
+            'interval_minutes': self.interval_minutes,
+            'shuffle': self.shuffle,
+            'rules': self.rules,
+            'crossfade_ms': self.crossfade_ms,
+            'prefetch_seconds': self.prefetch_seconds,
+        }
+
+    def save(self, config):
+        config.set('playlist', self.to_dict())
+
+    @staticmethod
+    def accepts(path):
+        return Path(path).suffix.lower() in PLAYLIST_EXTENSIONS
+
+    def add(self, path):
+        """Añadir un archivo (False si ya está o no es un fondo animado)"""
+        path = str(path)
+        if path in self.items or not self.accepts(path):
+            return False
+        self.items.append(path)
+        return True
+
+    def remove(self, path):
+        if path in self.items:
+            self.items.remove(path)
+            self.bag = [item for item in self.bag if item != path]
+
+    def interval_ms(self):
+        return max(1, int(self.interval_minutes * 60 * 1000))
+
+    def active_items(self, now=None):
+        """Lista que toca a esta hora"""
+        now = now or datetime.datetime.now()
+        for rule in self.rules:
+            if rule_matches(rule, now) and rule.get('items'):
+                return list(rule['items'])
+        return list(self.items)
+
+    def next_item(self, current=None, now=None):
+        """Siguiente fondo distinto del actual (None si no hay otro)"""
+        items = [item for item in self.active_items(now) if item != current]
+        if not items:
+            return None
+
+        if self.shuffle:
+            self.bag = [item for item in self.bag if item in items]
+            if not self.bag:
+                self.bag = items
+                random.shuffle(self.bag)
+            return self.bag.pop()
+
+        ordered = self.active_items(now)
+        if current in ordered:
+            position = ordered.index(current)
+            for item in ordered[position + 1:] + ordered[:position]:
+                if item != current:
+                    return item
+        return items[0]
@@ -0,0 +1,179 @@
+# pylint: disable=no-member
+"""
+Gobernador de calidad: baja resolución, FPS o interpolación bajo carga
+"""
+import time
+import cv2
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class SystemLoadSampler:
+    """Uso total de CPU del sistema (0-1) entre dos muestras"""
+
+    def __init__(self):
+        self.last_busy = None
+        self.last_total = None
+
+    def read_proc_stat(self):
+        """Tiempos de CPU agregados de /proc/stat (Linux)"""
+        try:
+            with open('/proc/stat', 'r') as f:
+                fields = [int(v) for v in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+        total = sum(fields)
+        return total - idle, total
+
+    def sample(self):
+        """Fracción de CPU ocupada desde la última muestra (None si no se sabe)"""
+        if psutil is not None:
+            return psutil.cpu_percent(interval=None) / 100.0
+
+        times = self.read_proc_stat()
+        if times is None:
+            return None
+
+        busy, total = times
+        load = None
+        if self.last_total is not None and total > self.last_total:
+            load = (busy - self.last_busy) / (total - self.last_total)
+        self.last_busy, self.last_total = busy, total
+        return load
+
+
+def build_levels(max_fps, min_fps=15, min_scale=0.5):
+    """Escalera de calidad: de mejor a más barata"""
+    ladder = [
+        (1.0, max_fps, cv2.INTER_LINEAR),
+        (1.0, max_fps, cv2.INTER_NEAREST),
+        (1.0, 24, cv2.INTER_NEAREST),
+        (0.75, 24, cv2.INTER_NEAREST),
+        (0.75, 20, cv2.INTER_NEAREST),
+        (0.5, 15, cv2.INTER_NEAREST),
+    ]
+
+    levels = []
+    for scale, fps, interpolation in ladder:
+        level = {
+            'scale': max(scale, min_scale),
+            'fps': max(min(fps, max_fps), min_fps),
+            'interpolation': interpolation,
+        }
+        if level not in levels:
+            levels.append(level)
+    return levels
+
+
+class QualityGovernor:
+    """Ajusta el nivel de calidad según el coste por frame y la carga"""
+
+    def __init__(self, levels, frame_budget_ms=15.0, max_system_load=0.85,
+                 restore_samples=3):
+        self.levels = levels
+        self.level = 0
+        self.frame_budget = frame_budget_ms / 1000.0
+        self.max_system_load = max_system_load
+        self.restore_samples = restore_samples
+        self.load_sampler = SystemLoadSampler()
+
+        self.headroom_count = 0
+        self.last_cpu = None
+        self.last_frames = 0
+        self.last_underruns = 0
+        self.last_sample = None
+        self.frame_cost = 0.0
+        self.system_load = None
+        self.changes = 0
+
+    @classmethod
+    def from_config(cls, config, max_fps=30):
+        """Crear a partir de la política guardada en Config"""
+        levels = build_levels(
+            max_fps,
+            min_fps=config.get('governor_min_fps', 15),
+            min_scale=config.get('governor_min_scale', 0.5)
+        )
+        return cls(
+            levels,
+            frame_budget_ms=config.get('governor_frame_budget_ms', 15.0),
+            max_system_load=config.get('governor_max_system_load', 0.85),
+            restore_samples=config.get('governor_restore_samples', 3)
+        )
+
+    @property
+    def current(self):
+        return self.levels[self.level]
+
+    def reset(self):
+        self.level = 0
+        self.headroom_count = 0
+        self.last_cpu = None
+
+    def sample(self, frames, underruns=0):
+        """Tomar una muestra y devolver el nuevo nivel si hay que cambiarlo
+
+        frames y underruns son contadores acumulados del reproductor.
+        """
+        now = time.monotonic()
+        cpu = time.process_time()
+        system_load = self.load_sampler.sample()
+
+        if self.last_cpu is None:
+            self.last_cpu, self.last_sample = cpu, now
+            self.last_frames, self.last_underruns = frames, underruns
+            return None
+
+        frame_delta = frames - self.last_frames
+        late = underruns - self.last_underruns
+        cost = (cpu - self.last_cpu) / frame_delta if frame_delta > 0 else 0.0
+
+        self.last_cpu, self.last_sample = cpu, now
+        self.last_frames, self.last_underruns = frames, underruns
+        self.frame_cost = cost
+        self.system_load = system_load
+
+        overloaded = (
+            cost > self.frame_budget or
+            late > max(1, frame_delta // 10) or
+            (system_load is not None and system_load > self.max_system_load)
+        )
+        has_headroom = (
+            cost < self.frame_budget * 0.6 and late == 0 and
+            (system_load is None or system_load < self.max_system_load * 0.8)
+        )
+
+        if overloaded and self.level < len(self.levels) - 1:
+            self.headroom_count = 0
+            return self.set_level(self.level + 1)
+
+        if has_headroom and self.level > 0:
+            self.headroom_count += 1
+            if self.headroom_count >= self.restore_samples:
+                self.headroom_count = 0
+                return self.set_level(self.level - 1)
+        elif not has_headroom:
+            self.headroom_count = 0
+
+        return None
+
+    def set_level(self, level):
+        self.level = level
+        self.changes += 1
+        return self.level
+
+    def stats(self):
+        return {
+            'level': self.level,
+            'scale': self.current['scale'],
+            'fps': self.current['fps'],
+            'frame_cost_ms': round(self.frame_cost * 1000, 2),
+            'system_load': (
+                round(self.system_load, 2) if self.system_load is not None else None
+            ),
+            'changes': self.changes,
+        }
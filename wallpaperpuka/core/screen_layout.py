@@ -0,0 +1,171 @@
+# pylint: disable=no-name-in-module
+"""
+Fondo en varias pantallas: solo la principal, duplicado, extendido o uno por pantalla
+
+Cada video se decodifica una sola vez aunque se vea en varias pantallas.
+Las pantallas con la misma resolución que el reproductor muestran su
+mismo QImage; para cada resolución distinta se escala un único FrameSink
+que comparten todas las pantallas de ese tamaño.
+"""
+from PyQt5.QtWidgets import QWidget, QApplication
+from PyQt5.QtGui import QImage, QPainter
+from wallpaperpuka.core.desktop_video_player import (
+    DesktopVideoPlayer, prepare_desktop_window
+)
+
+SCREEN_MODES = ('primary', 'duplicate', 'span', 'separate')
+
+
+def list_screens():
+    """[(nombre, geometría)] con la pantalla principal primero"""
+    primary = QApplication.primaryScreen()
+    screens = [primary] + [s for s in QApplication.screens() if s is not primary]
+    return [(screen.name(), screen.geometry()) for screen in screens]
+
+
+class ScreenSurface(QWidget):
+    """Ventana de fondo que muestra los frames de otro reproductor"""
+
+    def __init__(self, geometry, provider, sink=None):
+        super().__init__()
+        self.provider = provider  # Cualquier objeto con current_frame
+        self.sink = sink  # None: pintar el QImage del proveedor tal cual
+        self.current_frame = None
+        prepare_desktop_window(self, geometry)
+
+    def present(self, frame_time, changed=True):
+        """El reproductor acaba de mostrar el frame frame_time"""
+        if self.sink is None:
+            self.current_frame = self.provider.current_frame
+        else:
+            slot = self.sink.acquire_at(frame_time)
+            if slot is None:
+                return
+            h, w, ch = slot.shape
+            self.current_frame = QImage(slot, w, h, ch * w, QImage.Format_RGB888)
+        # Frame igual al anterior: el QImage cambia de buffer pero no se repinta
+        if changed:
+            self.update()
+
+    def drop_frame(self):
+        """El proveedor va a liberar la memoria del QImage que se comparte"""
+        if self.sink is None:
+            self.current_frame = None
+
+    def paintEvent(self, event):
+        if self.current_frame:
+            painter = QPainter(self)
+            painter.drawImage(self.rect(), self.current_frame)
+
+
+class ScreenLayout:
+    """Reparte el fondo animado entre las pantallas según el modo"""
+
+    def __init__(self, player, mode='primary', wallpapers=None,
+                 create_player=DesktopVideoPlayer, screens=list_screens):
+        self.player = player
+        self.mode = mode if mode in SCREEN_MODES else 'primary'
+        self.wallpapers = wallpapers or {}  # Pantalla -> archivo (modo 'separate')
+        self.create_player = create_player
+        self.screens = screens
+        self.surfaces = []
+        self.players = {}  # Archivo -> reproductor propio (modo 'separate')
+
+    @classmethod
+    def from_config(cls, player, config, create_player=DesktopVideoPlayer):
+        return cls(
+            player,
+            config.get('screen_mode', 'primary'),
+            config.get('screen_wallpapers', {}),
+            create_player
+        )
+
+    def apply(self, video_path):
+        """Colocar el reproductor y crear las superficies de las demás pantallas
+
+        Devuelve [(reproductor, archivo)] con los reproductores nuevos que
+        aún tienen que cargar su video (modo 'separate').
+        """
+        self.release()
+        screens = self.screens()
+        if not screens:
+            return []
+
+        if self.mode == 'span':
+            # Una sola ventana sobre todo el escritorio: un decode, un escalado
+            geometry = screens[0][1]
+            for _, other in screens[1:]:
+                geometry = geometry.united(other)
+            self.player.move_to(geometry)
+            return []
+
+        self.player.move_to(screens[0][1])
+        if self.mode == 'primary':
+            return []
+
+        pending = []
+        for name, geometry in screens[1:]:
+            path = video_path
+            if self.mode == 'separate':
+                path = self.wallpapers.get(name, video_path)
+
+            source = self.player if path == video_path else self.players.get(path)
+            if source is None:
+                # Primer uso de este archivo: su reproductor va en esta pantalla
+                source = self.create_player(geometry)
+                self.players[path] = source
+                pending.append((source, path))
+                continue
+            self.mirror(source, geometry)
+
+        print(f"Pantallas: {len(screens)} ({self.mode}), "
+              f"{len(self.surfaces)} superficies, {len(self.players)} videos extra")
+        return pending
+
+    def mirror(self, source, geometry):
+        """Mostrar los frames de source en otra pantalla sin decodificar de nuevo"""
+        size = (geometry.width(), geometry.height())
+        provider, sink = source, None
+        if size != (source.width(), source.height()):
+            leader = self.find_surface(source, size)
+            if leader:
+                provider = leader
+            else:
+                sink = source.add_sink(*size, depth=source.buffer_depth + 2)
+
+        surface = ScreenSurface(geometry, provider, sink)
+        # Detrás de su líder en la lista: copia el frame que este ya tomó
+        source.mirrors.append(surface)
+        self.surfaces.append(surface)
+        surface.show()
+        return surface
+
+    def find_surface(self, source, size):
+        for surface in self.surfaces:
+            if surface.sink and surface.provider is source and (
+                surface.sink.size == size
+            ):
+                return surface
+        return None
+
+    def all_players(self):
+        return [self.player] + list(self.players.values())
+
+    def release(self):
+        """Cerrar superficies y reproductores extra"""
+        for source in self.all_players():
+            for surface in list(source.mirrors):
+                if surface in self.surfaces:
+                    source.mirrors.remove(surface)
+                    if surface.sink:
+                        source.remove_sink(surface.sink)
+        for surface in self.surfaces:
+            surface.close()
+            surface.deleteLater()
+        self.surfaces = []
+
+        for player in self.players.values():
+            player.stop()
+            player.close()
+            player.deleteLater()
+        self.players = {}
@@ -0,0 +1,182 @@
+# pylint: disable=no-member
+"""
+Miniaturas y tiras de vista previa en keyframes, cacheadas por contenido
+"""
+import bisect
+from pathlib import Path
+import cv2
+import numpy as np
+from wallpaperpuka.utils.file_hash import fast_hash
+
+# Un seek de OpenCV cuesta lo mismo que decodificar unos 30 frames
+# (medido con benchmarks/bench_thumbnails.py): vuelve atrás y decodifica
+# hacia delante aunque el destino sea un keyframe
+SEEK_COST_FRAMES = 30
+
+# Solo en versiones recientes de OpenCV: sin ella se usan las posiciones
+# repartidas tal cual, sin ajustarlas a keyframes
+KEY_FRAME_PROP = getattr(cv2, 'CAP_PROP_LRF_HAS_KEY_FRAME', None)
+
+
+def keyframe_indices(video_path, stop_after=None):
+    """Índices de los keyframes leyendo solo paquetes, sin decodificar
+
+    Con stop_after se deja de leer en el primer keyframe posterior a ese
+    índice: lo que queda del archivo no cambia el keyframe más cercano a
+    ningún frame anterior. Devuelve None si el backend no permite leer
+    paquetes sin decodificar o si OpenCV no informa de keyframes.
+    """
+    if KEY_FRAME_PROP is None:
+        return None
+    capture = cv2.VideoCapture(str(video_path), cv2.CAP_FFMPEG)
+    if not capture.isOpened():
+        return None
+    try:
+        if not capture.set(cv2.CAP_PROP_FORMAT, -1):
+            return None
+        keyframes = []
+        index = 0
+        while capture.grab():
+            if capture.get(KEY_FRAME_PROP):
+                keyframes.append(index)
+                if stop_after is not None and index > stop_after:
+                    break
+            index += 1
+        return keyframes or None
+    finally:
+        capture.release()
+
+
+def nearest(sorted_values, value):
+    position = bisect.bisect_left(sorted_values, value)
+    candidates = sorted_values[max(0, position - 1):position + 1]
+    return min(candidates, key=lambda v: abs(v - value))
+
+
+def grab_frames(video_path, fractions, seek_cost_frames=SEEK_COST_FRAMES,
+                snap_to_keyframes=True):
+    """Frames BGR en las posiciones relativas dadas (0..1), None si fallan
+
+    Se elige lo más barato: recorrer el video una vez con grab() y llamar
+    a retrieve() solo en los frames pedidos, o buscar cada frame con un
+    seek. La pasada secuencial abre el archivo una sola vez y decodifica
+    todo desde el principio, así que cualquier frame sale limpio. Con
+    seeks las posiciones se ajustan antes al keyframe más cercano (se
+    decodifican sin depender de otros frames); para eso se leen los
+    paquetes, sin decodificar, solo hasta pasar el último frame pedido.
+    """
+    capture = cv2.VideoCapture(str(video_path))
+    if not capture.isOpened():
+        return [None] * len(fractions)
+
+    total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    if total <= 0:
+        # Sin número de frames (algunos GIF/WebM): el primero para todo
+        ret, frame = capture.read()
+        capture.release()
+        return [frame if ret else None] * len(fractions)
+
+    targets = [min(total - 1, max(0, int(total * f))) for f in fractions]
+    wanted = sorted(set(targets))
+    use_seek = wanted[-1] > len(wanted) * seek_cost_frames
+    if use_seek and snap_to_keyframes:
+        keyframes = keyframe_indices(video_path, stop_after=wanted[-1])
+        if keyframes:
+            targets = [nearest(keyframes, index) for index in targets]
+            wanted = sorted(set(targets))
+
+    frames = {}
+    try:
+        if use_seek:
+            for index in wanted:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+                ret, frame = capture.read()
+                if ret:
+                    frames[index] = frame
+        else:
+            wanted_set = set(wanted)
+            index = 0
+            while index <= wanted[-1] and capture.grab():
+                if index in wanted_set:
+                    ret, frame = capture.retrieve()
+                    if ret:
+                        frames[index] = frame
+                index += 1
+    finally:
+        capture.release()
+
+    return [frames.get(index) for index in targets]
+
+
+def resize_to_width(frame, width):
+    height = max(1, round(frame.shape[0] * width / frame.shape[1]))
+    return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+
+class Thumbnailer:
+    """Genera miniatura + tira de N frames por video y las guarda por hash"""
+
+    def __init__(self, cache_dir, width=320, strip_frames=8, strip_width=160,
+                 quality=85, seek_cost_frames=SEEK_COST_FRAMES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.width = width
+        self.strip_frames = strip_frames
+        self.strip_width = strip_width  # Ancho de cada frame de la tira
+        self.quality = quality
+        self.seek_cost_frames = seek_cost_frames
+
+    def cache_paths(self, content_hash):
+        return (
+            self.cache_dir / f"{content_hash}_thumb_{self.width}.jpg",
+            self.cache_dir / f"{content_hash}_strip_{self.strip_frames}x{self.strip_width}.jpg",
+        )
+
+    def lookup(self, video_path):
+        """Resultados ya generados para este contenido (None si falta alguno)"""
+        thumbnail, strip = self.cache_paths(fast_hash(video_path))
+        if thumbnail.exists() and strip.exists():
+            return {'thumbnail': str(thumbnail), 'strip': str(strip)}
+        return None
+
+    def generate(self, video_path):
+        """Miniatura (al 25%) y tira de vista previa con una sola lectura del video"""
+        content_hash = fast_hash(video_path)
+        thumbnail_path, strip_path = self.cache_paths(content_hash)
+        if thumbnail_path.exists() and strip_path.exists():
+            return {'thumbnail': str(thumbnail_path), 'strip': str(strip_path)}
+
+        # Tira: frames centrados en N tramos iguales del video
+        fractions = [0.25] + [
+            (i + 0.5) / self.strip_frames for i in range(self.strip_frames)
+        ]
+        frames = grab_frames(video_path, fractions, self.seek_cost_frames)
+        if frames[0] is None:
+            print(f"No se pudo generar miniatura: {video_path}")
+            return None
+
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        cv2.imwrite(str(thumbnail_path), resize_to_width(frames[0], self.width), params)
+
+        tiles = [resize_to_width(f, self.strip_width) for f in frames[1:] if f is not None]
+        if not tiles:
+            print(f"No se pudo generar la tira de vista previa: {video_path}")
+            return {'thumbnail': str(thumbnail_path), 'strip': None}
+        height = min(tile.shape[0] for tile in tiles)
+        strip = np.hstack([tile[:height] for tile in tiles])
+        cv2.imwrite(str(strip_path), strip, params)
+
+        return {'thumbnail': str(thumbnail_path), 'strip': str(strip_path)}
+
+    def poster(self, video_path, fraction=0.25):
+        """Frame a resolución completa como JPEG (para fondos estáticos)"""
+        path = self.cache_dir / f"{fast_hash(video_path)}_poster_{int(fraction * 100)}.jpg"
+        if path.exists():
+            return str(path)
+
+        frame = grab_frames(video_path, [fraction], self.seek_cost_frames)[0]
+        if frame is None:
+            return None
+        if not cv2.imwrite(str(path), frame):
+            return None
+        return str(path)
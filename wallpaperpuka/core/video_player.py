@@ -1,4 +1,5 @@
 import cv2
+import numpy as np
 from PyQt5.QtCore import QThread, pyqtSignal
 
 class VideoPlayer:
@@ -11,10 +12,25 @@ class VideoPlayer:
         self.volume = 50
         self.current_file = None
         
-    def play(self, file_path):
-        """Iniciar reproducción de video"""
+        # Frames compartidos con otro reproductor (sin segunda decodificación)
+        self.preview_size = (320, 180)
+        self.source = None
+        self.sink = None
+        self.frame_buffer = None  # Frame BGR devuelto por get_frame()
+        
+    def play(self, file_path, capture=None, source=None):
+        """Iniciar reproducción de video
+
+        capture: ya abierto en otro hilo; source: reproductor que ya
+        decodifica file_path y reparte sus frames (add_sink/remove_sink)
+        """
         self.current_file = file_path
-        self.cap = cv2.VideoCapture(file_path)
+        self.release()
+        if source is not None:
+            self.source = source
+            self.sink = source.add_sink(*self.preview_size)
+        else:
+            self.cap = capture if capture is not None else cv2.VideoCapture(file_path)
         self.is_playing = True
         self.is_paused = False
         print(f"Reproduciendo: {file_path}")
@@ -28,10 +44,21 @@ class VideoPlayer:
         """Detener reproducción"""
         self.is_playing = False
         self.is_paused = False
+        self.release()
+        print("Detenido")
+    
+    def release(self):
+        """Cerrar el video propio o desengancharse del reproductor compartido"""
         if self.cap:
             self.cap.release()
             self.cap = None
-        print("Detenido")
+        if self.sink:
+            self.source.remove_sink(self.sink)
+            self.sink = None
+            self.source = None
+    
+    def is_shared(self):
+        return self.sink is not None
         
     def set_volume(self, volume):
         """Establecer volumen (0-100)"""
@@ -39,14 +66,40 @@ class VideoPlayer:
         print(f"Volumen: {volume}%")
         
     def get_frame(self):
-        """Obtener frame actual del video"""
-        if self.cap and self.is_playing and not self.is_paused:
+        """Obtener frame actual del video: BGR a preview_size en ambos casos
+        
+        Compartido, el frame llega ya escalado en RGB y solo se pasa a BGR;
+        con captura propia se escala aquí. El buffer se reutiliza entre
+        llamadas: copiarlo si hay que guardarlo.
+        """
+        if not self.is_playing or self.is_paused:
+            return None
+        if self.sink:
+            frame = self.sink.latest()
+            if frame is None:
+                return None
+            return self.to_preview(frame, cv2.COLOR_RGB2BGR)
+        if self.cap:
             ret, frame = self.cap.read()
-            if ret:
-                return frame
-            else:
+            if not ret:
                 # Loop del video
                 self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
                 ret, frame = self.cap.read()
-                return frame if ret else None
+                if not ret:
+                    return None
+            return self.to_preview(frame)
         return None
+    
+    def to_preview(self, frame, conversion=None):
+        """Frame BGR a preview_size en el buffer reutilizado"""
+        width, height = self.preview_size
+        if self.frame_buffer is None or self.frame_buffer.shape != (height, width, 3):
+            self.frame_buffer = np.empty((height, width, 3), dtype=np.uint8)
+        if conversion is not None:
+            cv2.cvtColor(frame, conversion, dst=self.frame_buffer)
+        elif frame.shape[:2] == (height, width):
+            np.copyto(self.frame_buffer, frame)
+        else:
+            cv2.resize(frame, (width, height), dst=self.frame_buffer,
+                       interpolation=cv2.INTER_AREA)
+        return self.frame_buffer
@@ -0,0 +1,170 @@
+# pylint: disable=no-member
+"""
+Proxies a resolución de pantalla para no decodificar fuentes 4K en 1080p
+"""
+import os
+import threading
+import time
+from pathlib import Path
+import cv2
+from wallpaperpuka.utils.file_hash import fast_hash
+
+# Solo compensa generar un proxy si la fuente es bastante mayor
+MIN_PIXEL_RATIO = 1.5
+
+
+class ProxyTranscoder:
+    """Genera y guarda (una vez) copias MJPEG intra-frame a resolución de pantalla
+
+    MJPEG codifica cada frame de forma independiente: decodificarlo es
+    barato, volver al frame 0 no requiere buscar un keyframe y el bucle
+    no tiene saltos.
+    """
+
+    def __init__(self, proxy_dir, max_bytes=4096 * 1024 * 1024, quality=90):
+        self.proxy_dir = Path(proxy_dir)
+        self.proxy_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+
+        # Restos de generaciones interrumpidas
+        for partial in self.proxy_dir.glob('*.partial.avi'):
+            try:
+                partial.unlink()
+            except OSError:
+                pass
+
+    def proxy_path(self, video_path, width, height, fps):
+        key = f"{fast_hash(video_path)}_{width}x{height}_{fps}"
+        return self.proxy_dir / f"{key}.avi"
+
+    @staticmethod
+    def needs_proxy(source_size, target_size, source_fps=0, max_fps=30):
+        """La fuente es mucho mayor que la pantalla o supera los FPS máximos"""
+        source_pixels = source_size[0] * source_size[1]
+        target_pixels = target_size[0] * target_size[1]
+        return (
+            source_pixels >= target_pixels * MIN_PIXEL_RATIO or
+            source_fps > max_fps * MIN_PIXEL_RATIO
+        )
+
+    def lookup(self, video_path, width, height, fps):
+        """Ruta del proxy si ya existe (y marcarlo como usado)"""
+        path = self.proxy_path(video_path, width, height, fps)
+        if path.exists():
+            os.utime(path)
+            return str(path)
+        return None
+
+    def schedule(self, video_path, width, height, fps):
+        """Generar el proxy en segundo plano si no existe ni se está generando"""
+        path = self.proxy_path(video_path, width, height, fps)
+        with self._lock:
+            job = self.jobs.get(path)
+            if path.exists() or (job and job.is_alive()):
+                return
+            job = threading.Thread(
+                target=self.transcode,
+                args=(video_path, path, width, height, fps),
+                name="wallpaperpuka-proxy",
+                daemon=True
+            )
+            self.jobs[path] = job
+            job.start()
+
+    def transcode(self, video_path, output_path, width, height, fps):
+        """Escalar y recodificar el video completo (bloqueante)"""
+        output_path = Path(output_path)
+        partial = output_path.with_name(output_path.stem + '.partial.avi')
+        start = time.perf_counter()
+
+        capture = cv2.VideoCapture(str(video_path))
+        if not capture.isOpened():
+            print(f"Proxy: no se pudo abrir {video_path}")
+            return None
+
+        source_fps = capture.get(cv2.CAP_PROP_FPS) or fps
+        out_fps = min(source_fps, fps)
+        writer = cv2.VideoWriter(
+            str(partial), cv2.VideoWriter_fourcc(*'MJPG'), out_fps, (width, height)
+        )
+        if not writer.isOpened():
+            capture.release()
+            print("Proxy: códec MJPG no disponible")
+            return None
+        writer.set(cv2.VIDEOWRITER_PROP_QUALITY, self.quality)
+
+        written = 0
+        last_slot = -1
+        index = 0
+        ok = True
+        try:
+            while True:
+                if self._cancel.is_set():
+                    ok = False
+                    break
+                if not capture.grab():
+                    break
+
+                # Reducir FPS: un frame por cada intervalo de salida
+                slot = int(index * out_fps / source_fps)
+                index += 1
+                if slot == last_slot:
+                    continue
+                last_slot = slot
+
+                ret, frame = capture.retrieve()
+                if not ret:
+                    break
+                writer.write(cv2.resize(
+                    frame, (width, height), interpolation=cv2.INTER_AREA
+                ))
+                written += 1
+        finally:
+            capture.release()
+            writer.release()
+
+        if not ok or written == 0:
+            try:
+                partial.unlink()
+            except OSError:
+                pass
+            return None
+
+        os.replace(partial, output_path)
+        self.evict(keep=output_path)
+        print(
+            f"Proxy generado: {output_path.name} ({written} frames, "
+            f"{time.perf_counter() - start:.1f} s)"
+        )
+        return str(output_path)
+
+    def evict(self, keep=None):
+        """Borrar los proxies usados hace más tiempo si se supera max_bytes"""
+        proxies = sorted(
+            (p for p in self.proxy_dir.glob('*.avi')
+             if not p.name.endswith('.partial.avi')),
+            key=lambda p: p.stat().st_mtime
+        )
+        total = sum(p.stat().st_size for p in proxies)
+        for path in proxies:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == Path(keep):
+                continue
+            size = path.stat().st_size
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+
+    def cancel(self):
+        """Interrumpir generaciones en curso (al salir de la aplicación)"""
+        self._cancel.set()
+        for job in list(self.jobs.values()):
+            if job.is_alive():
+                job.join(2.0)
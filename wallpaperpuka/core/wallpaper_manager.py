@@ -1,9 +1,9 @@
 # pylint: disable=no-member
 import os
-import cv2
 import tempfile
 from pathlib import Path
 import ctypes
+from wallpaperpuka.core.thumbnailer import Thumbnailer
 
 
 class WallpaperManager:
@@ -16,6 +16,7 @@ class WallpaperManager:
         self.original_wallpaper = self.get_current_wallpaper()
         self.temp_dir = Path(tempfile.gettempdir()) / 'wallpaperpuka'
         self.temp_dir.mkdir(exist_ok=True)
+        self.thumbnailer = None
         
     def get_current_wallpaper(self):
         """Obtener fondo de pantalla actual"""
@@ -34,24 +35,15 @@ class WallpaperManager:
             return None
     
     def extract_frame_from_video(self, video_path):
-        """Extraer un frame del video para usar como imagen"""
+        """Extraer un frame del video para usar como imagen (cacheado por contenido)"""
         try:
-            cap = cv2.VideoCapture(video_path)  # pylint: disable=no-member
+            if self.thumbnailer is None:
+                self.thumbnailer = Thumbnailer(self.temp_dir / 'frames')
             
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            cap.set(cv2.CAP_PROP_POS_FRAMES, total_frames // 4)
-            
-            ret, frame = cap.read()
-            cap.release()
-            
-            if ret:
-                video_name = Path(video_path).stem
-                temp_image = self.temp_dir / f"{video_name}_frame.jpg"
-                cv2.imwrite(str(temp_image), frame)
-                print(f"Frame extraido: {temp_image}")
-                return str(temp_image)
-            
-            return None
+            image_path = self.thumbnailer.poster(video_path)
+            if image_path:
+                print(f"Frame extraido: {image_path}")
+            return image_path
         except Exception as e:
             print(f"Error al extraer frame: {e}")
             return None
@@ -1,5 +1,6 @@
 # pylint: disable=no-name-in-module
 import os
+import time
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QFileDialog, QSlider, 
@@ -7,22 +8,101 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QIcon
-from wallpaperpuka.core.video_player import VideoPlayer
-from wallpaperpuka.core.wallpaper_manager import WallpaperManager
-from wallpaperpuka.core.desktop_video_player import DesktopVideoPlayer
+from wallpaperpuka.core.playlist import Playlist
+from wallpaperpuka.gui.task_runner import TaskRunner
+from wallpaperpuka.utils.config import Config
 
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.video_player = VideoPlayer()
-        self.wallpaper_manager = WallpaperManager()
-        self.desktop_player = DesktopVideoPlayer()  # Reproductor de escritorio
+        self.config = Config()
         self.current_file = None
+        # Archivo elegido por el usuario (el .mlw original, no el video extraído)
+        self.selected_file = None
+        
+        # Subsistemas pesados (OpenCV, ventana de escritorio, registro de
+        # Windows): se crean al usarlos por primera vez
+        self._video_player = None
+        self._wallpaper_manager = None
+        self._desktop_player = None
+        self._screen_layout = None
+        self._decode_backends = None
+        self.screen_tasks = []
+        
+        # Extracción, apertura de videos y fondos estáticos fuera del hilo de la GUI
+        self.tasks = TaskRunner(parent=self)
+        
+        # Rotación de fondos: el siguiente se abre y decodifica antes del cambio
+        self.playlist = Playlist.from_config(self.config)
+        self.wallpaper_item = None
+        self.prefetched = None
+        self.prefetched_item = None
+        self.rotation_due = 0.0
+        self.rotation_timer = QTimer(self)
+        self.rotation_timer.setSingleShot(True)
+        self.rotation_timer.timeout.connect(self.prefetch_next)
+        self.switch_timer = QTimer(self)
+        self.switch_timer.setSingleShot(True)
+        self.switch_timer.timeout.connect(self.rotate)
         
         self.init_ui()
         self.create_tray_icon()
         
+        app = QApplication.instance()
+        app.screenAdded.connect(self.screens_changed)
+        app.screenRemoved.connect(self.screens_changed)
+        
+        # Con la ventana ya pintada, precargar OpenCV en segundo plano
+        QTimer.singleShot(1000, lambda: self.tasks.submit('warmup', preload_modules))
+    
+    @property
+    def video_player(self):
+        if self._video_player is None:
+            from wallpaperpuka.core.video_player import VideoPlayer
+            self._video_player = VideoPlayer()
+            self._video_player.volume = self.volume_slider.value()
+        return self._video_player
+    
+    @property
+    def wallpaper_manager(self):
+        if self._wallpaper_manager is None:
+            from wallpaperpuka.core.wallpaper_manager import WallpaperManager
+            self._wallpaper_manager = WallpaperManager()
+        return self._wallpaper_manager
+    
+    @property
+    def desktop_player(self):
+        """Reproductor de escritorio"""
+        if self._desktop_player is None:
+            self._desktop_player = self.create_desktop_player()
+        return self._desktop_player
+    
+    def create_desktop_player(self, geometry=None):
+        from wallpaperpuka.core.desktop_video_player import DesktopVideoPlayer
+        player = DesktopVideoPlayer(geometry)
+        player.apply_config(self.config)
+        player.backends = self.decode_backends
+        return player
+    
+    @property
+    def decode_backends(self):
+        """Backend de decodificación por códec y resolución (se sondea una vez)"""
+        if self._decode_backends is None:
+            from wallpaperpuka.core.decode_backends import BackendSelector
+            self._decode_backends = BackendSelector.from_config(self.config)
+        return self._decode_backends
+    
+    @property
+    def screen_layout(self):
+        """Reparto del fondo entre pantallas (modo en Config)"""
+        if self._screen_layout is None:
+            from wallpaperpuka.core.screen_layout import ScreenLayout
+            self._screen_layout = ScreenLayout.from_config(
+                self.desktop_player, self.config, self.create_desktop_player
+            )
+        return self._screen_layout
+        
     def init_ui(self):
         """Inicializar interfaz de usuario"""
         self.setWindowTitle("🌊 WallpaperPUKA")
@@ -110,10 +190,17 @@ class MainWindow(QMainWindow):
         # Espaciador
         layout.addStretch()
         
-        # Label de estado
+        # Label de estado (con botón para cancelar la tarea en curso)
+        status_layout = QHBoxLayout()
         self.status_label = QLabel("Listo")
         self.status_label.setStyleSheet("color: green; padding: 10px;")
-        layout.addWidget(self.status_label)
+        status_layout.addWidget(self.status_label, 1)
+        
+        self.btn_cancel = QPushButton("✖️ Cancelar")
+        self.btn_cancel.clicked.connect(self.cancel_tasks)
+        self.btn_cancel.setVisible(False)
+        status_layout.addWidget(self.btn_cancel)
+        layout.addLayout(status_layout)
         
     def create_tray_icon(self):
         """Crear icono en system tray"""
@@ -136,6 +223,22 @@ class MainWindow(QMainWindow):
         
         tray_menu.addSeparator()
         
+        next_action = QAction("⏭️ Siguiente fondo", self)
+        next_action.triggered.connect(self.next_wallpaper)
+        tray_menu.addAction(next_action)
+        
+        add_action = QAction("➕ Añadir a la lista", self)
+        add_action.triggered.connect(self.add_to_playlist)
+        tray_menu.addAction(add_action)
+        
+        rotation_action = QAction("🔁 Rotación automática", self)
+        rotation_action.setCheckable(True)
+        rotation_action.setChecked(self.playlist.enabled)
+        rotation_action.toggled.connect(self.set_rotation)
+        tray_menu.addAction(rotation_action)
+        
+        tray_menu.addSeparator()
+        
         quit_action = QAction("Salir", self)
         quit_action.triggered.connect(self.quit_app)
         tray_menu.addAction(quit_action)
@@ -157,91 +260,231 @@ class MainWindow(QMainWindow):
         )
         
         if file_path:
-            # Si es archivo .mlw, extraer el video primero
+            # Si es archivo .mlw, extraer el video primero (en segundo plano)
             if file_path.lower().endswith('.mlw'):
-                from wallpaperpuka.utils.mlw_handler import MLWHandler
                 self.status_label.setText("🔄 Procesando archivo .mlw...")
                 self.status_label.setStyleSheet("color: orange; padding: 10px;")
-                
-                handler = MLWHandler()
-                extracted_video = handler.extract_video(file_path)
-                
-                if extracted_video:
-                    file_path = extracted_video
-                    self.status_label.setText("✅ Archivo .mlw procesado")
-                    self.status_label.setStyleSheet("color: green; padding: 10px;")
-                else:
-                    self.status_label.setText("❌ Error al procesar .mlw")
-                    self.status_label.setStyleSheet("color: red; padding: 10px;")
-                    return
-            
-            self.current_file = file_path
-            filename = os.path.basename(file_path)
-            self.file_label.setText(f"📹 {filename}")
-            self.file_label.setStyleSheet(
-                "color: black; font-weight: bold; margin: 10px;"
-            )
-            
-            # Habilitar botones
-            self.btn_play.setEnabled(True)
-            self.btn_set_wallpaper.setEnabled(True)
+                self.tasks.submit(
+                    'load', extract_mlw, file_path,
+                    on_done=lambda video, path=file_path: self.mlw_extracted(video, path),
+                    on_error=self.task_failed,
+                    on_progress=self.show_progress,
+                    on_cancel=self.task_cancelled
+                )
+                self.btn_cancel.setVisible(True)
+                return
             
-            self.status_label.setText(f"Archivo cargado: {filename}")
-            self.status_label.setStyleSheet("color: blue; padding: 10px;")
+            self.set_current_file(file_path)
+    
+    def mlw_extracted(self, extracted_video, mlw_path):
+        """Resultado de la extracción de un .mlw"""
+        self.btn_cancel.setVisible(self.tasks.is_running('wallpaper'))
+        if extracted_video:
+            self.set_current_file(extracted_video, mlw_path)
+        else:
+            self.status_label.setText("❌ Error al procesar .mlw")
+            self.status_label.setStyleSheet("color: red; padding: 10px;")
+    
+    def set_current_file(self, file_path, selected_file=None):
+        """Archivo listo para reproducir o poner de fondo
+
+        selected_file: archivo que eligió el usuario si file_path es el
+        video extraído de un .mlw (el temporal puede borrarse entre sesiones)
+        """
+        self.current_file = file_path
+        self.selected_file = selected_file or file_path
+        filename = os.path.basename(self.selected_file)
+        self.file_label.setText(f"📹 {filename}")
+        self.file_label.setStyleSheet(
+            "color: black; font-weight: bold; margin: 10px;"
+        )
+        
+        # Habilitar botones
+        self.btn_play.setEnabled(True)
+        self.btn_set_wallpaper.setEnabled(True)
+        
+        self.status_label.setText(f"Archivo cargado: {filename}")
+        self.status_label.setStyleSheet("color: blue; padding: 10px;")
+    
+    def show_progress(self, done, total):
+        """Progreso de la tarea en curso"""
+        if total:
+            self.status_label.setText(f"🔄 Procesando... {done * 100 // total}%")
+        else:
+            self.status_label.setText(f"🔄 Procesando... {done // (1024 * 1024)} MB")
+    
+    def task_failed(self, error):
+        self.btn_cancel.setVisible(bool(self.tasks.tasks))
+        self.status_label.setText(f"❌ Error: {error}")
+        self.status_label.setStyleSheet("color: red; padding: 10px;")
+    
+    def task_cancelled(self):
+        self.btn_cancel.setVisible(bool(self.tasks.tasks))
+    
+    def cancel_tasks(self):
+        """Cancelar la extracción o carga en curso"""
+        self.tasks.cancel_all()
+        self.btn_cancel.setVisible(False)
+        self.status_label.setText("⏹️ Cancelado")
+        self.status_label.setStyleSheet("color: orange; padding: 10px;")
     
     def play(self):
-        """Reproducir video"""
+        """Reproducir video (la apertura se hace en segundo plano)"""
         if self.current_file:
-            self.video_player.play(self.current_file)
-            self.btn_pause.setEnabled(True)
-            self.btn_stop.setEnabled(True)
-            self.status_label.setText("▶️ Reproduciendo...")
-            self.status_label.setStyleSheet("color: green; padding: 10px;")
+            self.start_preview(self.current_file)
+    
+    def start_preview(self, file_path):
+        if self.is_on_desktop(file_path):
+            # El fondo ya decodifica este video: compartir sus frames
+            self.video_player.play(file_path, source=self.desktop_player)
+            self.preview_started()
+            return
+        self.tasks.submit(
+            'preview', open_capture, file_path, self.decode_backends,
+            on_done=self.capture_ready,
+            on_error=self.task_failed,
+            on_discard=release_capture
+        )
+    
+    def capture_ready(self, result):
+        file_path, capture = result
+        if not capture.isOpened():
+            capture.release()
+            self.status_label.setText("❌ Error al abrir video")
+            self.status_label.setStyleSheet("color: red; padding: 10px;")
+            return
+        self.video_player.play(file_path, capture)
+        self.preview_started()
+    
+    def preview_started(self):
+        self.btn_pause.setEnabled(True)
+        self.btn_stop.setEnabled(True)
+        self.status_label.setText("▶️ Reproduciendo...")
+        self.status_label.setStyleSheet("color: green; padding: 10px;")
     
     def pause(self):
         """Pausar video"""
-        self.video_player.pause()
+        if self._video_player:
+            self._video_player.pause()
         self.status_label.setText("⏸️ Pausado")
         self.status_label.setStyleSheet("color: orange; padding: 10px;")
     
     def stop(self):
         """Detener video"""
-        self.video_player.stop()
+        if self._video_player:
+            self._video_player.stop()
         self.btn_pause.setEnabled(False)
         self.btn_stop.setEnabled(False)
         self.status_label.setText("⏹️ Detenido")
         self.status_label.setStyleSheet("color: red; padding: 10px;")
     
+    def is_on_desktop(self, file_path):
+        """El fondo animado está reproduciendo file_path"""
+        return bool(
+            self._desktop_player and self._desktop_player.is_playing
+            and self._desktop_player.video_path == file_path
+        )
+    
+    def sync_preview(self):
+        """Compartir la decodificación del fondo o volver a una propia"""
+        player = self._video_player
+        if not player or not player.is_playing:
+            return
+        if player.is_shared() != self.is_on_desktop(player.current_file):
+            self.start_preview(player.current_file)
+    
     def change_volume(self, value):
         """Cambiar volumen"""
-        self.video_player.set_volume(value)
+        if self._video_player:
+            self._video_player.set_volume(value)
     
     def set_as_wallpaper(self):
         """Establecer como fondo de pantalla"""
         if self.current_file:
             from pathlib import Path
             ext = Path(self.current_file).suffix.lower()
-            video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
+            # Los .mlw que llegan aquí son videos o GIFs renombrados abiertos en su sitio
+            video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.webm', '.gif', '.mlw']
+            
+            self.status_label.setText("🔄 Cargando...")
+            self.status_label.setStyleSheet("color: orange; padding: 10px;")
+            self.btn_cancel.setVisible(True)
             
             # Si es video, usar reproductor de escritorio
             if ext in video_extensions:
-                success = self.desktop_player.load_video(self.current_file)
-                if success:
-                    self.desktop_player.play()
-                    self.status_label.setText("✅ Video animado establecido como fondo")
-                    self.status_label.setStyleSheet("color: green; padding: 10px;")
-                else:
-                    self.status_label.setText("❌ Error al cargar video")
-                    self.status_label.setStyleSheet("color: red; padding: 10px;")
+                target_size = (self.desktop_player.width(), self.desktop_player.height())
+                self.tasks.submit(
+                    'wallpaper', open_video_source, self.desktop_player,
+                    self.current_file, target_size,
+                    on_done=lambda result, item=self.selected_file: self.video_source_ready(result, item),
+                    on_error=self.task_failed,
+                    on_cancel=self.task_cancelled,
+                    on_discard=release_source
+                )
             else:
                 # Si es imagen, usar método tradicional
-                success = self.wallpaper_manager.set_wallpaper(self.current_file)
-                if success:
-                    self.status_label.setText("✅ Fondo de pantalla establecido")
-                    self.status_label.setStyleSheet("color: green; padding: 10px;")
-                else:
-                    self.status_label.setText("❌ Error al establecer fondo")
-                    self.status_label.setStyleSheet("color: red; padding: 10px;")
+                self.tasks.submit(
+                    'wallpaper', set_static_wallpaper, self.wallpaper_manager,
+                    self.current_file,
+                    on_done=self.static_wallpaper_set,
+                    on_error=self.task_failed,
+                    on_cancel=self.task_cancelled
+                )
+    
+    def video_source_ready(self, result, item=None):
+        """Video abierto en segundo plano: aplicarlo al reproductor de escritorio"""
+        self.btn_cancel.setVisible(self.tasks.is_running('load'))
+        video_path, source = result
+        if source and self.desktop_player.load_video(video_path, source):
+            self.desktop_player.play()
+            self.wallpaper_item = item or video_path
+            self.apply_screen_layout(video_path)
+            self.sync_preview()
+            self.schedule_rotation()
+            self.status_label.setText("✅ Video animado establecido como fondo")
+            self.status_label.setStyleSheet("color: green; padding: 10px;")
+        else:
+            self.status_label.setText("❌ Error al cargar video")
+            self.status_label.setStyleSheet("color: red; padding: 10px;")
+    
+    def apply_screen_layout(self, video_path):
+        """Extender el fondo a las demás pantallas"""
+        self.cancel_screen_tasks()
+        pending = self.screen_layout.apply(video_path)
+        for index, (player, path) in enumerate(pending):
+            name = f'screen-{index}'
+            self.screen_tasks.append(name)
+            self.tasks.submit(
+                name, open_video_source, player, path,
+                (player.width(), player.height()),
+                on_done=lambda result, player=player: self.screen_source_ready(player, result),
+                on_error=self.task_failed,
+                on_discard=release_source
+            )
+    
+    def screen_source_ready(self, player, result):
+        video_path, source = result
+        if source and player.load_video(video_path, source):
+            player.play()
+    
+    def cancel_screen_tasks(self):
+        for name in self.screen_tasks:
+            self.tasks.cancel(name)
+        self.screen_tasks = []
+    
+    def screens_changed(self, screen):
+        """Pantalla conectada o desconectada: recolocar el fondo"""
+        if self._desktop_player and self._desktop_player.is_playing:
+            self.apply_screen_layout(self._desktop_player.video_path)
+    
+    def static_wallpaper_set(self, success):
+        self.btn_cancel.setVisible(self.tasks.is_running('load'))
+        if success:
+            self.status_label.setText("✅ Fondo de pantalla establecido")
+            self.status_label.setStyleSheet("color: green; padding: 10px;")
+        else:
+            self.status_label.setText("❌ Error al establecer fondo")
+            self.status_label.setStyleSheet("color: red; padding: 10px;")
     
     def closeEvent(self, event):
         """Minimizar a tray en lugar de cerrar"""
@@ -257,13 +500,192 @@ class MainWindow(QMainWindow):
     
     def stop_animated_wallpaper(self):
         """Detener fondo animado"""
-        self.desktop_player.stop()
+        self.stop_rotation()
+        if self._desktop_player:
+            self._desktop_player.stop()
+        self.release_screens()
+        self.sync_preview()
         self.status_label.setText("⏹️ Fondo animado detenido")
         self.status_label.setStyleSheet("color: orange; padding: 10px;")
     
+    def add_to_playlist(self):
+        """Añadir el archivo actual a la lista de rotación"""
+        if not self.selected_file:
+            return
+        # Los .mlw se guardan tal cual: prefetch_wallpaper los extrae al rotar
+        if self.playlist.add(self.selected_file):
+            self.playlist.save(self.config)
+            self.status_label.setText(f"➕ Añadido a la lista ({len(self.playlist.items)})")
+        else:
+            self.status_label.setText("Ya está en la lista o no es un fondo animado")
+    
+    def set_rotation(self, enabled):
+        self.playlist.enabled = enabled
+        self.playlist.save(self.config)
+        if enabled:
+            self.schedule_rotation()
+        else:
+            self.stop_rotation()
+    
+    def schedule_rotation(self):
+        """Programar el próximo cambio; la precarga empieza unos segundos antes"""
+        self.rotation_timer.stop()
+        self.discard_prefetch()
+        if not self.playlist.enabled or not self._desktop_player:
+            return
+        if not self._desktop_player.video_path:
+            return
+        
+        interval = self.playlist.interval_ms()
+        lead = min(interval, int(self.playlist.prefetch_seconds * 1000))
+        self.rotation_due = time.monotonic() + interval / 1000.0
+        self.rotation_timer.start(interval - lead)
+    
+    def next_wallpaper(self):
+        """Cambiar ya al siguiente fondo de la lista"""
+        if not self._desktop_player or not self._desktop_player.video_path:
+            return
+        self.rotation_timer.stop()
+        self.rotation_due = time.monotonic()
+        self.prefetch_next()
+    
+    def prefetch_next(self):
+        """Extraer y abrir en segundo plano el siguiente fondo"""
+        item = self.playlist.next_item(self.wallpaper_item)
+        if not item:
+            return
+        self.discard_prefetch()
+        target_size = (self.desktop_player.width(), self.desktop_player.height())
+        self.tasks.submit(
+            'prefetch', prefetch_wallpaper, self.desktop_player, item, target_size,
+            on_done=lambda result, item=item: self.prefetch_ready(item, result),
+            on_error=self.prefetch_failed,
+            on_discard=release_source
+        )
+    
+    def prefetch_ready(self, item, result):
+        video_path, source = result
+        if not source:
+            print(f"No se pudo preparar el siguiente fondo: {item}")
+            self.schedule_rotation()
+            return
+        
+        # Decodificador en marcha con los primeros frames en su buffer
+        self.prefetched = self.desktop_player.prefetch(video_path, source)
+        self.prefetched_item = item
+        remaining = int((self.rotation_due - time.monotonic()) * 1000)
+        self.switch_timer.start(max(0, remaining))
+    
+    def prefetch_failed(self, error):
+        print(f"Error al preparar el siguiente fondo: {error}")
+        self.schedule_rotation()
+    
+    def rotate(self):
+        """Pasar al fondo precargado (con fundido si está configurado)"""
+        prefetched, self.prefetched = self.prefetched, None
+        if not prefetched:
+            return
+        if self.desktop_player.switch_to(prefetched, self.playlist.crossfade_ms):
+            self.wallpaper_item = self.prefetched_item
+            self.sync_preview()
+            self.status_label.setText(f"🔁 Fondo: {os.path.basename(self.wallpaper_item)}")
+            self.status_label.setStyleSheet("color: green; padding: 10px;")
+        self.schedule_rotation()
+    
+    def discard_prefetch(self):
+        self.tasks.cancel('prefetch')
+        self.switch_timer.stop()
+        if self.prefetched:
+            self.desktop_player.cancel_prefetch(self.prefetched)
+            self.prefetched = None
+    
+    def stop_rotation(self):
+        self.rotation_timer.stop()
+        self.discard_prefetch()
+    
+    def release_screens(self):
+        self.cancel_screen_tasks()
+        if self._screen_layout:
+            self._screen_layout.release()
+    
     def quit_app(self):
         """Cerrar aplicación completamente"""
-        self.video_player.stop()
-        self.desktop_player.stop()  # Detener reproductor de escritorio
+        self.stop_rotation()
+        self.tasks.cancel_all()
+        self.tasks.wait(2000)
+        if self._video_player:
+            self._video_player.stop()
+        if self._desktop_player:
+            self._desktop_player.stop()  # Detener reproductor de escritorio
+        self.release_screens()
         self.tray_icon.hide()
-        QApplication.quit()
\ No newline at end of file
+        QApplication.quit()
+
+# --- Tareas (se ejecutan en el pool de TaskRunner) ---
+
+def extract_mlw(task, file_path):
+    """Extraer el video de un .mlw con progreso y cancelación"""
+    from wallpaperpuka.utils.mlw_handler import MLWHandler
+    handler = MLWHandler()
+    return handler.extract_video(file_path, task.report, task.cancelled)
+
+
+def prefetch_wallpaper(task, player, file_path, target_size):
+    """Extraer (si es .mlw) y abrir el siguiente fondo de la lista"""
+    video_path = file_path
+    if file_path.lower().endswith('.mlw'):
+        video_path = extract_mlw(task, file_path)
+        if not video_path:
+            return file_path, None
+    return open_video_source(task, player, video_path, target_size)
+
+
+def preload_modules(task):
+    """Importar OpenCV y NumPy antes de que hagan falta"""
+    import cv2  # noqa: F401
+    import numpy  # noqa: F401
+
+
+def open_capture(task, file_path, backends=None):
+    """Abrir el video para la vista previa"""
+    if backends:
+        capture = backends.open(file_path)[0]
+    else:
+        import cv2
+        capture = cv2.VideoCapture(file_path)
+    if task.cancelled():
+        capture.release()
+        return file_path, None
+    return file_path, capture
+
+
+def release_capture(result):
+    """Cerrar la captura de una vista previa que ya no se va a mostrar"""
+    _, capture = result
+    if capture is not None:
+        capture.release()
+
+
+def open_video_source(task, player, video_path, target_size):
+    """Abrir el video (y proxy/caché) sin bloquear la GUI"""
+    source = player.open_source(video_path, target_size)
+    if source and task.cancelled():
+        release_source((video_path, source))
+        return video_path, None
+    return video_path, source
+
+
+def release_source(result):
+    """Cerrar lo que abrió open_video_source() si no se va a usar"""
+    _, source = result
+    if not source:
+        return
+    if source['capture']:
+        source['capture'].release()
+    if source.get('frames'):
+        source['frames'].release()
+
+
+def set_static_wallpaper(task, wallpaper_manager, file_path):
+    """Decodificar el frame, escribir el JPEG y cambiar el fondo"""
+    return wallpaper_manager.set_wallpaper(file_path)
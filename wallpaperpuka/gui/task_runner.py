@@ -0,0 +1,170 @@
+# pylint: disable=no-name-in-module
+"""
+Tareas en segundo plano para la GUI (QThreadPool + señales)
+
+Todo el trabajo de E/S y decodificación se ejecuta en el pool; los
+resultados vuelven al hilo de la GUI a través de señales en cola, así que
+los callbacks pueden tocar widgets sin más.
+"""
+import threading
+import time
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+
+class TaskSignals(QObject):
+    """Señales de una tarea (se emiten desde el hilo de trabajo)"""
+
+    progress = pyqtSignal(object, object)  # Sin límite de 32 bits
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Task(QRunnable):
+    """Ejecuta func(task, *args); func informa con report() y mira cancelled()"""
+
+    def __init__(self, name, func, args):
+        super().__init__()
+        self.name = name
+        self.func = func
+        self.args = args
+        self.signals = TaskSignals()
+        self.result = None
+        self.on_discard = None  # Libera un resultado que no se va a entregar
+        self._cancel = threading.Event()
+        self.setAutoDelete(False)  # TaskRunner guarda la referencia
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def report(self, done, total=None):
+        """Progreso (done de total, o total None si se desconoce)"""
+        if not self.cancelled():
+            self.signals.progress.emit(done, total)
+
+    def run(self):
+        try:
+            result = self.func(self, *self.args)
+        except Exception as e:
+            if self.cancelled():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+            return
+
+        self.result = result
+        if self.cancelled():
+            self.signals.cancelled.emit()
+        else:
+            self.signals.finished.emit(result)
+
+
+class TaskRunner(QObject):
+    """Lanza tareas con nombre; una tarea nueva cancela a la anterior del mismo nombre"""
+
+    def __init__(self, max_threads=2, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self.tasks = {}
+
+    def submit(self, name, func, *args, on_done=None, on_error=None,
+               on_progress=None, on_cancel=None, on_discard=None):
+        """Ejecutar func(task, *args) en el pool y devolver la tarea
+
+        on_discard(resultado) recibe lo que devolvió una tarea cancelada o
+        sustituida (capturas abiertas, archivos...) para liberarlo.
+        """
+        self.cancel(name)
+
+        task = Task(name, func, args)
+        task.on_discard = on_discard
+        self.tasks[name] = task
+        if on_progress:
+            task.signals.progress.connect(on_progress)
+        task.signals.finished.connect(lambda result: self._finished(task, on_done, result))
+        task.signals.failed.connect(lambda error: self._done(task, on_error, error))
+        task.signals.cancelled.connect(lambda: self._cancelled(task, on_cancel))
+        self.pool.start(task)
+        return task
+
+    def _finished(self, task, callback, result):
+        if self.tasks.get(task.name) is not task and task.on_discard:
+            # Sustituida después de terminar: nadie va a usar el resultado
+            task.on_discard(result)
+            return
+        self._done(task, callback, result)
+
+    def _cancelled(self, task, callback):
+        self._done(task, callback)
+        if task.result is not None and task.on_discard:
+            task.on_discard(task.result)
+
+    def _done(self, task, callback, *args):
+        current = self.tasks.get(task.name) is task
+        if current:
+            del self.tasks[task.name]
+        # Resultados de tareas canceladas o sustituidas se descartan
+        if callback and (current or not args):
+            callback(*args)
+
+    def cancel(self, name):
+        task = self.tasks.pop(name, None)
+        if task:
+            task.cancel()
+
+    def cancel_all(self):
+        for name in list(self.tasks):
+            self.cancel(name)
+
+    def is_running(self, name):
+        return name in self.tasks
+
+    def wait(self, timeout_ms=-1):
+        """Esperar a que terminen las tareas (al salir)"""
+        return self.pool.waitForDone(timeout_ms)
+
+
+class EventLoopMonitor(QObject):
+    """Mide el retraso del bucle de eventos con un timer periódico
+
+    Si el hilo de la GUI se bloquea, el timer llega tarde: el retraso
+    sobre el intervalo esperado es la latencia que percibe el usuario.
+    """
+
+    def __init__(self, interval_ms=5, parent=None):
+        super().__init__(parent)
+        self.interval = interval_ms / 1000.0
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.tick)
+        self.last = None
+        self.lags = []
+
+    def start(self):
+        self.lags = []
+        self.last = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def tick(self):
+        now = time.perf_counter()
+        self.lags.append(max(0.0, now - self.last - self.interval))
+        self.last = now
+
+    def summary(self):
+        """Retraso del bucle en ms: muestras, media, p95 y máximo"""
+        if not self.lags:
+            return {'count': 0, 'mean': 0.0, 'p95': 0.0, 'max': 0.0}
+        lags = sorted(self.lags)
+        return {
+            'count': len(lags),
+            'mean': sum(lags) / len(lags) * 1000,
+            'p95': lags[min(len(lags) - 1, int(len(lags) * 0.95))] * 1000,
+            'max': lags[-1] * 1000,
+        }
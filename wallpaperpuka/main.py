@@ -1,17 +1,156 @@
 import sys
-from PyQt5.QtWidgets import QApplication
-from wallpaperpuka.gui.main_window import MainWindow
+import multiprocessing
+
+
+def run_gui():
+    """Abrir la ventana principal"""
+    from PyQt5.QtWidgets import QApplication
+    from wallpaperpuka.gui.main_window import MainWindow
 
-def main():
-    """Entry point de la aplicación"""
     app = QApplication(sys.argv)
     app.setApplicationName("WallpaperPUKA")
     app.setOrganizationName("PUKA")
-    
+
     window = MainWindow()
     window.show()
-    
+
     sys.exit(app.exec_())
 
+
+def open_library(argv, parser):
+    """Añadir --index al parser y abrir el índice de la biblioteca"""
+    from wallpaperpuka.core.library import LibraryIndex
+    from wallpaperpuka.utils.config import Config
+
+    parser.add_argument('--index', default=str(Config().config_dir / 'library.db'))
+    args = parser.parse_args(argv)
+    return args, LibraryIndex(args.index)
+
+
+def run_import(argv):
+    """Subcomando import: importar carpetas a la biblioteca"""
+    import argparse
+    from wallpaperpuka.core.library import LibraryImporter
+
+    parser = argparse.ArgumentParser(
+        prog="wallpaperpuka import",
+        description="Importar videos, GIFs y .mlw a la biblioteca"
+    )
+    parser.add_argument('paths', nargs='+', help="Archivos o carpetas")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Procesos en paralelo (por defecto: núcleos - 1)")
+    parser.add_argument('--no-thumbnails', action='store_true')
+    parser.add_argument('--no-recursive', action='store_true')
+    parser.add_argument('--force', action='store_true',
+                        help="Volver a procesar también los archivos sin cambios")
+    args, index = open_library(argv, parser)
+
+    importer = LibraryImporter(index, not args.no_thumbnails, args.workers)
+
+    def progress(done, total, record):
+        status = f"error: {record['error']}" if record.get('error') else "ok"
+        print(f"[{done}/{total}] {record['path']} ({status})")
+
+    try:
+        records = importer.run(args.paths, progress, not args.no_recursive, args.force)
+    except KeyboardInterrupt:
+        importer.cancel()
+        print("Importación cancelada")
+        return 1
+    finally:
+        index.close()
+
+    errors = sum(1 for record in records if record.get('error'))
+    print(f"Importados {len(records) - errors} archivos, {errors} errores, "
+          f"{importer.skipped} sin cambios, {importer.removed} eliminados del índice")
+    return 1 if errors else 0
+
+
+def run_list(argv):
+    """Subcomando list: buscar en la biblioteca sin abrir los videos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="wallpaperpuka list",
+        description="Listar y filtrar la biblioteca"
+    )
+    parser.add_argument('text', nargs='?', help="Texto a buscar en la ruta")
+    parser.add_argument('--codec')
+    parser.add_argument('--min-width', type=int)
+    parser.add_argument('--min-height', type=int)
+    parser.add_argument('--max-duration', type=float)
+    parser.add_argument('--errors', action='store_true', help="Incluir errores")
+    parser.add_argument('--sort', default='path')
+    args, index = open_library(argv, parser)
+
+    records = index.search(
+        args.text, args.codec, args.min_width, args.min_height,
+        args.max_duration, args.errors, args.sort
+    )
+    index.close()
+
+    for record in records:
+        if record['error']:
+            print(f"{record['path']}  (error: {record['error']})")
+            continue
+        duration = f"{record['duration']:.1f} s" if record['duration'] else "?"
+        print(f"{record['path']}  {record['width']}x{record['height']} "
+              f"{record['fps']:.0f} FPS {record['codec'] or '?'} {duration}")
+    print(f"{len(records)} resultados")
+    return 0
+
+
+def run_backends(argv):
+    """Subcomando backends: sondear un video o listar los ganadores guardados"""
+    import argparse
+    from wallpaperpuka.core import decode_backends
+
+    parser = argparse.ArgumentParser(
+        prog="wallpaperpuka backends",
+        description="Backends de decodificación por códec y resolución"
+    )
+    parser.add_argument('video', nargs='?', help="Video a sondear (sin él: listar)")
+    parser.add_argument('--frames', type=int, default=30)
+    args, index = open_library(argv, parser)
+
+    if args.video:
+        import cv2
+        capture = cv2.VideoCapture(args.video)
+        if not capture.isOpened():
+            print(f"No se puede abrir {args.video}")
+            index.close()
+            return 1
+        selector = decode_backends.BackendSelector(index, args.frames)
+        codec, width, height = selector.signature(args.video, capture)
+        capture.release()
+
+        results = decode_backends.probe(args.video, args.frames)
+        for result in results:
+            print(f"{result['backend']:<14} abrir {result['open_ms']:7.1f} ms  "
+                  f"{result['fps']:7.1f} FPS ({result['frames']} frames)")
+        winner = decode_backends.pick_winner(results, selector.max_open_ms)
+        if winner:
+            index.set_decode_backend(codec, width, height, winner)
+            print(f"Ganador para {codec} {width}x{height}: {winner['backend']}")
+        index.close()
+        return 0 if winner else 1
+
+    rows = index.decode_backends()
+    index.close()
+    for row in rows:
+        print(f"{row['codec']} {row['width']}x{row['height']}: {row['backend']} "
+              f"({row['fps']:.0f} FPS, abrir {row['open_ms']:.0f} ms)")
+    print(f"{len(rows)} combinaciones sondeadas")
+    return 0
+
+
+def main():
+    """Entry point de la aplicación"""
+    multiprocessing.freeze_support()
+    commands = {'import': run_import, 'list': run_list, 'backends': run_backends}
+    if len(sys.argv) > 1 and sys.argv[1] in commands:
+        sys.exit(commands[sys.argv[1]](sys.argv[2:]))
+    run_gui()
+
 if __name__ == "__main__":
     main()
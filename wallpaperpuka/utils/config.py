@@ -13,10 +13,11 @@ class Config:
     
     def load(self):
         """Cargar configuración"""
+        settings = self.default_settings()
         if self.config_file.exists():
             with open(self.config_file, 'r') as f:
-                return json.load(f)
-        return self.default_settings()
+                settings.update(json.load(f))
+        return settings
     
     def save(self):
         """Guardar configuración"""
@@ -29,7 +30,58 @@ class Config:
             'volume': 50,
             'autostart': False,
             'loop': True,
-            'recent_files': []
+            'recent_files': [],
+            # Caché de bucle para clips cortos
+            'loop_cache': False,
+            'loop_cache_budget_mb': 512,
+            'loop_cache_mmap': False,
+            # Caché persistente de frames pre-escalados en ~/.wallpaperpuka
+            'frame_cache': True,
+            'frame_cache_max_mb': 2048,
+            # Proxy MJPEG a resolución de pantalla para fuentes mayores
+            'proxy_enabled': False,
+            'proxy_max_mb': 4096,
+            # Backend de decodificación ('auto': sondear y recordar el más rápido)
+            'decode_backend': 'auto',
+            'decode_probe_frames': 30,
+            'decode_max_open_ms': 500,
+            # Instrumentación del pipeline (log en segundos, 0 = sin log)
+            'stats_enabled': False,
+            'stats_log_interval': 0,
+            'stats_osd': False,
+            # Gobernador de calidad: baja escala/FPS si se supera el presupuesto
+            'governor_enabled': False,
+            'governor_interval': 2.0,
+            'governor_frame_budget_ms': 15.0,
+            'governor_max_system_load': 0.85,
+            'governor_restore_samples': 3,
+            'governor_min_fps': 15,
+            'governor_min_scale': 0.5,
+            # Pausa automática: coverage, fullscreen, locked, idle, battery, cpu
+            'auto_pause': True,
+            'auto_pause_interval': 1.0,
+            'auto_pause_probes': ['coverage', 'fullscreen', 'locked'],
+            'auto_pause_idle_minutes': 10,
+            'auto_pause_battery_percent': None,
+            'auto_pause_cpu_threshold': 0.9,
+            # Repintar solo las teselas que cambian entre frames
+            'dirty_repaint': True,
+            'dirty_tile': 64,
+            'dirty_threshold': 0,
+            # Rotación de fondos (lista, intervalo, aleatorio, reglas por hora)
+            'playlist': {
+                'items': [],
+                'enabled': False,
+                'interval_minutes': 10,
+                'shuffle': False,
+                'rules': [],
+                'crossfade_ms': 800,
+                'prefetch_seconds': 5
+            },
+            # Varias pantallas: primary, duplicate, span o separate
+            # (screen_wallpapers: nombre de pantalla -> archivo en 'separate')
+            'screen_mode': 'primary',
+            'screen_wallpapers': {}
         }
     
     def get(self, key, default=None):
@@ -0,0 +1,338 @@
+"""
+Identificación de formatos y localización de videos MP4/WebM/MKV embebidos
+sin cargar el archivo en memoria
+"""
+import io
+import os
+import struct
+import zipfile
+from pathlib import Path
+
+CHUNK_SIZE = 1024 * 1024
+PROBE_SIZE = 4096
+
+MP4_SIGNATURE = b'ftyp'
+EBML_SIGNATURE = b'\x1A\x45\xDF\xA3'
+EBML_SEGMENT_ID = b'\x18\x53\x80\x67'
+EBML_DOCTYPE_ID = b'\x42\x82'
+ZIP_SIGNATURES = (b'PK\x03\x04', b'PK\x05\x06')
+GIF_SIGNATURES = (b'GIF87a', b'GIF89a')
+RIFF_SIGNATURE = b'RIFF'
+AVI_FORM_TYPE = b'AVI '
+QUICKTIME_BRAND = b'qt  '
+# QuickTime antiguo sin caja ftyp
+QUICKTIME_BOXES = (b'moov', b'mdat', b'wide', b'free', b'skip')
+
+ZIP_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+# Extensiones de video en orden de preferencia
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.mkv', '.mov', '.avi')
+
+# Cajas MP4 de primer nivel: cualquier otra cosa marca el final del video
+MP4_TOP_LEVEL_BOXES = {
+    b'ftyp', b'styp', b'moov', b'mdat', b'free', b'skip', b'wide', b'uuid',
+    b'moof', b'mfra', b'sidx', b'ssix', b'meta', b'pdin', b'udta', b'emsg',
+    b'prft',
+}
+
+
+class CopyCancelled(Exception):
+    """La copia se canceló desde fuera (ver copy_stream)"""
+
+
+class PayloadRange:
+    """Rango de bytes de un video dentro de otro archivo"""
+
+    def __init__(self, path, offset, length, ext):
+        self.path = str(path)
+        self.offset = offset
+        self.length = length
+        self.ext = ext
+
+    def __repr__(self):
+        return (
+            f"PayloadRange({self.path!r}, offset={self.offset}, "
+            f"length={self.length}, ext={self.ext!r})"
+        )
+
+
+def iter_signatures(f, signatures, start=0, end=None, chunk_size=CHUNK_SIZE):
+    """Recorrer el archivo por bloques y devolver (offset, firma) en orden
+
+    Los bloques se solapan len(firma) - 1 bytes para no perder firmas
+    partidas entre dos lecturas.
+    """
+    overlap = max(len(sig) for sig in signatures) - 1
+    position = start
+    tail = b''
+
+    while end is None or position < end:
+        f.seek(position)
+        size = chunk_size if end is None else min(chunk_size, end - position)
+        chunk = f.read(size)
+        if not chunk:
+            break
+
+        data = tail + chunk
+        base = position - len(tail)
+        hits = []
+        for sig in signatures:
+            index = data.find(sig)
+            while index >= 0:
+                # Las coincidencias dentro del solape ya se devolvieron antes
+                if index + len(sig) > len(tail):
+                    hits.append((base + index, sig))
+                index = data.find(sig, index + 1)
+
+        for hit in sorted(hits):
+            yield hit
+
+        position += len(chunk)
+        tail = data[-overlap:] if overlap else b''
+
+
+def mp4_extent(f, box_start, file_size):
+    """Longitud de un MP4 que empieza en box_start recorriendo sus cajas
+
+    Devuelve None si la estructura no es un MP4 válido (ftyp + moov/mdat).
+    """
+    position = box_start
+    boxes = []
+
+    while position + 8 <= file_size:
+        f.seek(position)
+        header = f.read(16)
+        size = int.from_bytes(header[0:4], 'big')
+        box_type = header[4:8]
+        if box_type not in MP4_TOP_LEVEL_BOXES:
+            break
+
+        header_len = 8
+        if size == 1:
+            if len(header) < 16:
+                break
+            size = int.from_bytes(header[8:16], 'big')
+            header_len = 16
+        elif size == 0:
+            size = file_size - position
+
+        if size < header_len:
+            break
+        if not boxes and (box_type != MP4_SIGNATURE or size > 4096):
+            return None
+
+        boxes.append(box_type)
+        if position + size >= file_size:
+            # Última caja (o truncada): hasta el final del archivo
+            position = file_size
+            break
+        position += size
+
+    if len(boxes) < 2 or not ({b'moov', b'mdat'} & set(boxes)):
+        return None
+    return position - box_start
+
+
+def read_vint(f):
+    """Leer un entero de longitud variable EBML: (valor, bytes, desconocido)"""
+    first = f.read(1)
+    if not first:
+        return None, 0, False
+
+    byte = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not byte & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        return None, 0, False
+
+    rest = f.read(length - 1)
+    if len(rest) != length - 1:
+        return None, 0, False
+
+    value = byte & (mask - 1)
+    all_ones = (byte & (mask - 1)) == mask - 1
+    for b in rest:
+        value = (value << 8) | b
+        all_ones = all_ones and b == 0xFF
+    return value, length, all_ones
+
+
+def ebml_extent(f, start, file_size):
+    """Longitud y extensión (.webm/.mkv) de un archivo EBML en start"""
+    f.seek(start + 4)
+    header_size, size_len, unknown = read_vint(f)
+    if header_size is None or unknown or header_size > 4096:
+        return None
+
+    header_start = start + 4 + size_len
+    header = f.read(header_size)
+    ext = '.webm'
+    doctype = header.find(EBML_DOCTYPE_ID)
+    if doctype >= 0:
+        f.seek(header_start + doctype + 2)
+        length, _, _ = read_vint(f)
+        if length:
+            if f.read(length).rstrip(b'\x00') == b'matroska':
+                ext = '.mkv'
+
+    segment_start = header_start + header_size
+    f.seek(segment_start)
+    if f.read(4) != EBML_SEGMENT_ID:
+        return None
+
+    segment_size, size_len, unknown = read_vint(f)
+    if segment_size is None:
+        return None
+
+    data_start = segment_start + 4 + size_len
+    if unknown:
+        end = file_size
+    else:
+        end = min(file_size, data_start + segment_size)
+    return end - start, ext
+
+
+def sniff_header(header):
+    """Formato según los primeros bytes de un archivo (o miembro de ZIP)
+
+    Devuelve '.zip', '.mp4', '.mov', '.webm', '.mkv', '.avi', '.gif' o None.
+    """
+    if header.startswith(ZIP_SIGNATURES):
+        return '.zip'
+    if header.startswith(GIF_SIGNATURES):
+        return '.gif'
+    if header[0:4] == RIFF_SIGNATURE and header[8:12] == AVI_FORM_TYPE:
+        return '.avi'
+    if header[4:8] == MP4_SIGNATURE:
+        return '.mov' if header[8:12] == QUICKTIME_BRAND else '.mp4'
+    if header[4:8] in QUICKTIME_BOXES:
+        return '.mov'
+    if header.startswith(EBML_SIGNATURE):
+        result = ebml_extent(io.BytesIO(header), 0, len(header))
+        if result:
+            return result[1]
+    return None
+
+
+def sniff_format(path, probe_size=PROBE_SIZE):
+    """Formato real del archivo según su cabecera, sin fiarse de la extensión"""
+    with open(path, 'rb') as f:
+        return sniff_header(f.read(probe_size))
+
+
+def find_embedded_video(path, chunk_size=CHUNK_SIZE):
+    """Buscar en una sola pasada el primer MP4 o EBML válido del archivo"""
+    file_size = os.path.getsize(path)
+
+    with open(path, 'rb') as f:
+        scanner = iter_signatures(
+            f, (MP4_SIGNATURE, EBML_SIGNATURE), chunk_size=chunk_size
+        )
+        for offset, sig in scanner:
+            # Las comprobaciones mueven el puntero; el escáner vuelve a su sitio
+            if sig == MP4_SIGNATURE:
+                box_start = offset - 4
+                if box_start < 0:
+                    continue
+                length = mp4_extent(f, box_start, file_size)
+                if length:
+                    return PayloadRange(path, box_start, length, '.mp4')
+            else:
+                result = ebml_extent(f, offset, file_size)
+                if result:
+                    length, ext = result
+                    return PayloadRange(path, offset, length, ext)
+
+    return None
+
+
+def copy_stream(src, dst, length=None, progress=None, chunk_size=CHUNK_SIZE,
+                cancelled=None):
+    """Copiar por bloques con memoria constante; progress(copiados, total)
+
+    Si cancelled() devuelve True entre dos bloques se lanza CopyCancelled.
+    """
+    copied = 0
+    while length is None or copied < length:
+        if cancelled and cancelled():
+            raise CopyCancelled()
+        size = chunk_size if length is None else min(chunk_size, length - copied)
+        chunk = src.read(size)
+        if not chunk:
+            break
+        dst.write(chunk)
+        copied += len(chunk)
+        if progress:
+            progress(copied, length)
+    return copied
+
+
+def copy_range(src_path, offset, length, dst_path, chunk_size=CHUNK_SIZE,
+               progress=None, cancelled=None):
+    """Copiar un rango de bytes a otro archivo con memoria constante"""
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        src.seek(offset)
+        return copy_stream(src, dst, length, progress, chunk_size, cancelled)
+
+
+def copy_payload(payload, dst_path, chunk_size=CHUNK_SIZE, progress=None,
+                 cancelled=None):
+    """Volcar un PayloadRange a disco"""
+    return copy_range(payload.path, payload.offset, payload.length, dst_path,
+                      chunk_size, progress, cancelled)
+
+
+def best_zip_member(zip_ref, probe_size=PROBE_SIZE):
+    """Miembro de video más grande según el directorio central: (info, ext)
+
+    Si ningún nombre tiene extensión de video se mira la cabecera de cada
+    miembro; en ningún caso se extrae nada.
+    """
+    members = [
+        info for info in zip_ref.infolist()
+        if not info.is_dir() and not info.flag_bits & 0x1  # Cifrados no
+    ]
+    videos = []
+    for info in members:
+        ext = Path(info.filename).suffix.lower()
+        if ext in VIDEO_EXTENSIONS:
+            videos.append((info, ext))
+
+    if not videos:
+        for info in members:
+            with zip_ref.open(info) as member:
+                ext = sniff_header(member.read(probe_size))
+            if ext in VIDEO_EXTENSIONS:
+                videos.append((info, ext))
+
+    if not videos:
+        return None
+    return max(
+        videos,
+        key=lambda item: (item[0].file_size, -VIDEO_EXTENSIONS.index(item[1]))
+    )
+
+
+def zip_member_range(path, info, ext):
+    """Rango de bytes de un miembro almacenado sin comprimir (o None)
+
+    El directorio central no incluye el campo extra de la cabecera local,
+    así que hay que leerla para saber dónde empiezan los datos.
+    """
+    if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:
+        return None
+
+    with open(path, 'rb') as f:
+        f.seek(info.header_offset)
+        header = f.read(ZIP_LOCAL_HEADER.size)
+    if len(header) != ZIP_LOCAL_HEADER.size:
+        return None
+    fields = ZIP_LOCAL_HEADER.unpack(header)
+    if fields[0] != ZIP_SIGNATURES[0]:
+        return None
+
+    name_len, extra_len = fields[-2], fields[-1]
+    offset = info.header_offset + ZIP_LOCAL_HEADER.size + name_len + extra_len
+    return PayloadRange(path, offset, info.file_size, ext)
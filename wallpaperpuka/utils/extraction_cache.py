@@ -0,0 +1,141 @@
+"""
+Caché persistente de videos extraídos de archivos .mlw
+"""
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from wallpaperpuka.utils.file_hash import fast_hash
+
+
+class ExtractionCache:
+    """Asocia cada .mlw (ruta, tamaño, mtime, hash) con su video extraído
+
+    Reabrir el mismo archivo solo cuesta un stat(); el hash rápido se
+    calcula cuando la ruta es nueva o el archivo cambió, y permite
+    reutilizar la extracción de una copia idéntica en otra ruta.
+    """
+
+    def __init__(self, cache_dir, max_bytes=2048 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.cache_dir / 'index.json'
+        self.max_bytes = max_bytes
+        self.removed = set()  # Expulsadas por este proceso
+        self.index = self.load_index()
+
+    def load_index(self):
+        """Cargar índice (entradas por hash y rutas conocidas)"""
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, 'r') as f:
+                    index = json.load(f)
+                index.setdefault('entries', {})
+                index.setdefault('paths', {})
+                return index
+            except (OSError, ValueError) as e:
+                print(f"Índice de caché .mlw corrupto: {e}")
+        return {'entries': {}, 'paths': {}}
+
+    def save_index(self):
+        """Guardar índice de forma atómica sin perder lo que añadieron otros procesos"""
+        on_disk = self.load_index()
+        for content_hash in self.removed:
+            on_disk['entries'].pop(content_hash, None)
+        on_disk['entries'].update(self.index['entries'])
+        on_disk['paths'].update(self.index['paths'])
+        self.index = on_disk
+
+        temp_file = self.index_file.with_name(f"index.{os.getpid()}.tmp")
+        with open(temp_file, 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(temp_file, self.index_file)
+
+    @staticmethod
+    def source_key(mlw_path):
+        """(ruta absoluta, tamaño, mtime) del archivo de origen"""
+        path = os.path.abspath(str(mlw_path))
+        stat = os.stat(path)
+        return path, stat.st_size, stat.st_mtime_ns
+
+    def entry_path(self, entry):
+        return self.cache_dir / entry['file']
+
+    def content_hash(self, mlw_path):
+        """Hash del .mlw, reutilizando el guardado si no cambió"""
+        path, size, mtime = self.source_key(mlw_path)
+        known = self.index['paths'].get(path)
+        if known and known['size'] == size and known['mtime'] == mtime:
+            return known['hash']
+        return fast_hash(path)
+
+    def lookup(self, mlw_path):
+        """Ruta del video extraído si está en caché (None si no)"""
+        path, size, mtime = self.source_key(mlw_path)
+        content_hash = self.content_hash(mlw_path)
+        # Recordar el hash aunque falle: store() no tendrá que recalcularlo
+        self.index['paths'][path] = {'size': size, 'mtime': mtime, 'hash': content_hash}
+
+        entry = self.index['entries'].get(content_hash)
+        if not entry or not self.entry_path(entry).exists():
+            return None
+
+        entry['last_used'] = time.time()
+        self.save_index()
+        return str(self.entry_path(entry))
+
+    def store(self, mlw_path, extracted_path):
+        """Mover el video extraído a la caché y devolver su nueva ruta"""
+        path, size, mtime = self.source_key(mlw_path)
+        content_hash = self.content_hash(mlw_path)
+        extracted_path = Path(extracted_path)
+
+        target = self.cache_dir / f"{content_hash}{extracted_path.suffix.lower()}"
+        if extracted_path.resolve() != target.resolve():
+            shutil.move(str(extracted_path), str(target))
+
+        self.removed.discard(content_hash)
+        self.index['entries'][content_hash] = {
+            'file': target.name,
+            'bytes': target.stat().st_size,
+            'last_used': time.time(),
+        }
+        self.index['paths'][path] = {'size': size, 'mtime': mtime, 'hash': content_hash}
+        self.evict(keep=content_hash)
+        self.save_index()
+        return str(target)
+
+    def total_bytes(self):
+        return sum(entry['bytes'] for entry in self.index['entries'].values())
+
+    def evict(self, max_bytes=None, keep=None):
+        """Borrar las extracciones usadas hace más tiempo hasta caber en max_bytes"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.index['entries']
+        removed = 0
+
+        for content_hash in sorted(entries, key=lambda k: entries[k]['last_used']):
+            if self.total_bytes() <= max_bytes:
+                break
+            if content_hash == keep:
+                continue
+            try:
+                self.entry_path(entries[content_hash]).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                # En uso (p. ej. abierto por el reproductor en Windows)
+                continue
+            del entries[content_hash]
+            self.removed.add(content_hash)
+            removed += 1
+
+        # Olvidar rutas que apuntan a entradas expulsadas
+        self.index['paths'] = {
+            path: info for path, info in self.index['paths'].items()
+            if info['hash'] in entries
+        }
+        if removed:
+            self.save_index()
+        return removed
@@ -0,0 +1,27 @@
+"""
+Hash rápido del contenido de archivos grandes
+"""
+import hashlib
+import os
+
+SAMPLE_SIZE = 1024 * 1024  # 1 MB por muestra
+
+
+def fast_hash(file_path, sample_size=SAMPLE_SIZE):
+    """Hash del tamaño más el inicio, el centro y el final del archivo
+
+    Evita leer videos de cientos de MB completos y sigue cambiando si
+    el archivo se reemplaza o se recorta.
+    """
+    size = os.path.getsize(file_path)
+    digest = hashlib.sha1(str(size).encode())
+
+    with open(file_path, 'rb') as f:
+        if size <= sample_size * 3:
+            digest.update(f.read())
+        else:
+            for offset in (0, (size - sample_size) // 2, size - sample_size):
+                f.seek(offset)
+                digest.update(f.read(sample_size))
+
+    return digest.hexdigest()
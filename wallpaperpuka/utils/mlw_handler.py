@@ -7,121 +7,139 @@ import shutil
 import zipfile
 import tempfile
 from pathlib import Path
+from wallpaperpuka.utils.container_scan import (
+    CopyCancelled, best_zip_member, copy_payload, copy_stream,
+    find_embedded_video, sniff_format, zip_member_range
+)
+from wallpaperpuka.utils.extraction_cache import ExtractionCache
+
+
+# Formatos que el reproductor abre directamente aunque la extensión sea .mlw
+IN_PLACE_FORMATS = {'.mp4', '.mov', '.webm', '.mkv', '.avi', '.gif'}
 
 
 class MLWHandler:
     """Manejador de archivos .mlw"""
     
-    def __init__(self):
+    def __init__(self, max_cache_bytes=2048 * 1024 * 1024):
         self.temp_dir = Path(tempfile.gettempdir()) / 'wallpaperpuka_mlw'
         self.temp_dir.mkdir(exist_ok=True)
+        # Extracciones a medias (una carpeta por proceso); lo que sirve se mueve a la caché
+        self.work_dir = self.temp_dir / f"work_{os.getpid()}"
+        self.cache = ExtractionCache(self.temp_dir, max_cache_bytes)
     
-    def extract_video(self, mlw_path):
-        """Extraer video de archivo .mlw"""
+    def extract_video(self, mlw_path, progress=None, cancelled=None):
+        """Extraer video de archivo .mlw (o reutilizar la extracción en caché)
+        
+        progress(bytes copiados, total) se llama durante la copia; si
+        cancelled() devuelve True la extracción se abandona.
+        """
         mlw_path = Path(mlw_path)
         
-        # Método 1: Intentar como ZIP
-        video_path = self._extract_from_zip(mlw_path)
-        if video_path:
-            print(f"Video extraido (ZIP): {video_path}")
-            return video_path
+        try:
+            file_format = sniff_format(mlw_path)
+            
+            # Video renombrado: se abre en su sitio, sin copia ni caché
+            if file_format in IN_PLACE_FORMATS:
+                print(f"Video detectado ({file_format[1:]} renombrado): {mlw_path}")
+                return str(mlw_path)
+            
+            cached = self.cache.lookup(mlw_path)
+        except OSError as e:
+            print(f"Error al abrir {mlw_path}: {e}")
+            return None
+        if cached:
+            print(f"Video en caché: {cached}")
+            return cached
         
-        # Método 2: Es un video renombrado
-        video_path = self._try_as_video(mlw_path)
-        if video_path:
-            print(f"Video detectado (renombrado): {video_path}")
-            return video_path
+        self.work_dir.mkdir(exist_ok=True)
+        try:
+            video_path = self._extract(mlw_path, file_format, progress, cancelled)
+            if video_path:
+                return self.cache.store(mlw_path, video_path)
+        except CopyCancelled:
+            print(f"Extracción cancelada: {mlw_path}")
+            return None
+        except OSError as e:
+            print(f"Error al guardar en caché: {e}")
+        finally:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        
+        print(f"No se pudo extraer video de: {mlw_path}")
+        return None
+    
+    def _extract(self, mlw_path, file_format, progress=None, cancelled=None):
+        """Extraer según el formato detectado en la cabecera"""
+        # Paquete ZIP (también con datos antepuestos a la firma)
+        if file_format == '.zip' or (file_format is None and zipfile.is_zipfile(mlw_path)):
+            video_path = self._extract_from_zip(mlw_path, progress, cancelled)
+            if video_path:
+                print(f"Video extraido (ZIP): {video_path}")
+                return video_path
         
-        # Método 3: Buscar video embebido
-        video_path = self._extract_embedded_video(mlw_path)
+        # Contenedor propio: buscar video embebido
+        video_path = self._extract_embedded_video(mlw_path, progress, cancelled)
         if video_path:
             print(f"Video extraido (embebido): {video_path}")
             return video_path
         
-        print(f"No se pudo extraer video de: {mlw_path}")
         return None
     
-    def _extract_from_zip(self, mlw_path):
-        """Intentar extraer como archivo ZIP"""
+    def _extract_from_zip(self, mlw_path, progress=None, cancelled=None):
+        """Extraer solo el mejor video del ZIP, por bloques"""
         try:
             with zipfile.ZipFile(mlw_path, 'r') as zip_ref:
-                video_extensions = ['.mp4', '.avi', '.mov', '.webm', '.mkv']
-                
-                for file_info in zip_ref.filelist:
-                    file_ext = Path(file_info.filename).suffix.lower()
-                    if file_ext in video_extensions:
-                        extract_path = self.temp_dir / file_info.filename
-                        zip_ref.extract(file_info.filename, self.temp_dir)
-                        return str(extract_path)
+                found = best_zip_member(zip_ref)
+                if not found:
+                    return None
+                info, ext = found
+                output_path = self.work_dir / f"{mlw_path.stem}_zip{ext}"
                 
-                zip_ref.extractall(self.temp_dir)
-                for root, dirs, files in os.walk(self.temp_dir):
-                    for filename in files:
-                        file_path = Path(root) / filename
-                        if file_path.suffix.lower() in video_extensions:
-                            return str(file_path)
+                payload = zip_member_range(mlw_path, info, ext)
+                if payload:
+                    # Almacenado sin comprimir: copia directa del rango
+                    copy_payload(payload, output_path, progress=progress,
+                                 cancelled=cancelled)
+                else:
+                    with zip_ref.open(info) as src, open(output_path, 'wb') as dst:
+                        copy_stream(src, dst, info.file_size, progress,
+                                    cancelled=cancelled)
+                return str(output_path)
+        except CopyCancelled:
+            raise
         except Exception as e:
             print(f"Error ZIP: {e}")
         
         return None
     
-    def _try_as_video(self, mlw_path):
-        """Intentar usar directamente como video"""
-        try:
-            import cv2
-            
-            temp_video = self.temp_dir / f"{mlw_path.stem}.mp4"
-            shutil.copy2(mlw_path, temp_video)
-            
-            cap = cv2.VideoCapture(str(temp_video))
-            if cap.isOpened():
-                cap.release()
-                return str(temp_video)
-            
-            temp_video = self.temp_dir / f"{mlw_path.stem}.webm"
-            shutil.copy2(mlw_path, temp_video)
-            cap = cv2.VideoCapture(str(temp_video))
-            if cap.isOpened():
-                cap.release()
-                return str(temp_video)
-        except Exception as e:
-            print(f"Error video directo: {e}")
-        
-        return None
-    
-    def _extract_embedded_video(self, mlw_path):
+    def _extract_embedded_video(self, mlw_path, progress=None, cancelled=None):
         """Buscar video embebido en el archivo"""
         try:
-            with open(mlw_path, 'rb') as f:
-                data = f.read()
-            
-            mp4_start = data.find(b'ftyp')
-            if mp4_start > 0:
-                mp4_start -= 4
-                output_path = self.temp_dir / f"{mlw_path.stem}_extracted.mp4"
-                with open(output_path, 'wb') as out:
-                    out.write(data[mp4_start:])
-                return str(output_path)
-            
-            webm_signature = b'\x1A\x45\xDF\xA3'
-            webm_start = data.find(webm_signature)
-            if webm_start >= 0:
-                output_path = self.temp_dir / f"{mlw_path.stem}_extracted.webm"
-                with open(output_path, 'wb') as out:
-                    out.write(data[webm_start:])
+            payload = self.locate_embedded_video(mlw_path)
+            if payload:
+                output_path = self.work_dir / f"{mlw_path.stem}_extracted{payload.ext}"
+                copy_payload(payload, output_path, progress=progress,
+                             cancelled=cancelled)
                 return str(output_path)
         
+        except CopyCancelled:
+            raise
         except Exception as e:
             print(f"Error video embebido: {e}")
         
         return None
     
+    def locate_embedded_video(self, mlw_path):
+        """Rango de bytes del video embebido (sin copiarlo)"""
+        return find_embedded_video(mlw_path)
+    
     def cleanup(self):
-        """Limpiar archivos temporales"""
+        """Recortar la caché de extracciones a su tamaño máximo"""
         try:
-            if self.temp_dir.exists():
-                shutil.rmtree(self.temp_dir)
-            print("Archivos temporales limpiados")
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            removed = self.cache.evict()
+            if removed:
+                print(f"Extracciones expulsadas de la caché: {removed}")
         except Exception as e:
             print(f"Error al limpiar: {e}")
     